@@ -0,0 +1,190 @@
+import threading
+
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+from src.controllers.storage import StorageBackend
+from src.models.fx_rates import FxRates
+from src.models.money import SCALE, divide, to_fixed
+from src.parallel import run_tasks
+from src.settings import CONSOLIDATION_CHUNK_SIZE, CONSOLIDATION_WORKERS
+
+Summary = Dict
+
+# path of portfolio with its summary or message of error raised loading it
+Loaded = Tuple[Path, Optional[Summary], Optional[str]]
+
+
+def summarize_portfolio(path: Path, storage: StorageBackend) -> Summary:
+    """load portfolio stored in path and return its holdings:
+    amount and value (unit price * amount) of every asset
+    with its currency and balances of currencies"""
+
+    data = storage.load_holdings(path)
+    return {
+        "assets": {
+            code: (
+                asset["amount"],
+                asset["unit_price"] * asset["amount"],
+                asset["currency"],
+            )
+            for code, asset in data["assets"].items()
+        },
+        "currencies": {
+            currency: round(balance)
+            for currency, balance in data["currencies"].items()
+        },
+    }
+
+
+def summarize_chunk(
+    paths: List[Path], storage_class: Type[StorageBackend]
+) -> List[Loaded]:
+    """summarize portfolios stored in paths, run in worker processes"""
+
+    storage = storage_class()
+    loaded = []
+    for path in paths:
+        try:
+            loaded.append((path, summarize_portfolio(path, storage), None))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            loaded.append((path, None, str(e)))
+    return loaded
+
+
+def merge_summaries(summaries: List[Summary]) -> Dict:
+    """merge holdings of portfolios, amounts of assets are summed
+    per code and their values per code and currency"""
+
+    assets: Dict[str, Dict] = {}
+    currencies: Dict[str, int] = {}
+    for summary in summaries:
+        for code, (amount, value, currency) in summary["assets"].items():
+            asset = assets.setdefault(code, {"amount": 0, "values": {}})
+            asset["amount"] += amount
+            asset["values"][currency] = (
+                asset["values"].get(currency, 0) + value
+            )
+        for currency, balance in summary["currencies"].items():
+            currencies[currency] = currencies.get(currency, 0) + balance
+
+    return {"assets": assets, "currencies": currencies}
+
+
+def allocation(
+    consolidated: Dict, base: str, fx_rates: FxRates
+) -> Dict[str, int]:
+    """return value of every asset and currency balance
+    of consolidated holdings in base currency"""
+
+    # rates in fixed-point units, so values are converted exactly
+    rates = {
+        currency: to_fixed(fx_rates.rate(currency, base))
+        for currency in {
+            currency
+            for asset in consolidated["assets"].values()
+            for currency in asset["values"]
+        }
+        | set(consolidated["currencies"])
+    }
+
+    values = {
+        code: sum(
+            divide(value * rates[currency], SCALE)
+            for currency, value in asset["values"].items()
+        )
+        for code, asset in consolidated["assets"].items()
+    }
+    for currency, balance in consolidated["currencies"].items():
+        values[currency] = values.get(currency, 0) + divide(
+            balance * rates[currency], SCALE
+        )
+    return values
+
+
+class Consolidator:
+    """Holdings of many portfolios merged per asset and currency
+
+    Summaries of portfolios are kept with storage versions of their
+    files, so only new and modified portfolios are loaded again.
+    Those are loaded in a process pool, in chunks of portfolios
+    per task, and progress is reported as chunks complete.
+    Summaries loaded before an interruption are kept.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = CONSOLIDATION_WORKERS,
+        chunk_size: int = CONSOLIDATION_CHUNK_SIZE,
+    ) -> None:
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._summaries: Dict[Path, Tuple[Tuple, Summary]] = {}
+        self._lock = threading.Lock()
+
+    def _load(
+        self, paths: List[Path], storage: StorageBackend
+    ) -> Iterator[List[Loaded]]:
+        """yield summaries of portfolios in chunks as they are loaded"""
+
+        chunks = [
+            paths[i : i + self.chunk_size]
+            for i in range(0, len(paths), self.chunk_size)
+        ]
+        storage_class = type(storage)
+        yield from run_tasks(
+            summarize_chunk,
+            ((chunk, storage_class) for chunk in chunks),
+            self.workers,
+        )
+
+    def consolidate(
+        self,
+        portfolios: Dict[str, Path],
+        storage: StorageBackend,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict:
+        """return merged holdings of portfolios with their number and
+        errors of portfolios which couldn't be loaded, progress is
+        called with numbers of loaded and all portfolios to load"""
+
+        names = {Path(path): name for name, path in portfolios.items()}
+        versions = {path: storage.version(path) for path in names}
+        with self._lock:
+            for path in self._summaries.keys() - versions.keys():
+                del self._summaries[path]
+            stale = [
+                path
+                for path, version in versions.items()
+                if self._summaries.get(path, (None,))[0] != version
+            ]
+
+        errors = {}
+        done = 0
+        for loaded in self._load(stale, storage):
+            with self._lock:
+                for path, summary, error in loaded:
+                    if error is None:
+                        self._summaries[path] = (versions[path], summary)
+                    else:
+                        self._summaries.pop(path, None)
+                        errors[names[path]] = error
+            done += len(loaded)
+            if progress is not None:
+                progress(done, len(stale))
+
+        with self._lock:
+            summaries = [
+                self._summaries[path][1]
+                for path in versions
+                if path in self._summaries
+            ]
+
+        consolidated = merge_summaries(summaries)
+        consolidated["portfolios"] = len(summaries)
+        consolidated["errors"] = errors
+        return consolidated
+
+
+# summaries shared by every rerun of the application in this process
+CONSOLIDATOR = Consolidator()
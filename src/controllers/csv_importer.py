@@ -0,0 +1,237 @@
+import csv
+import io
+
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from time import perf_counter
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+from src.controllers.portfolio_controller import PortfolioController
+from src.models.transaction_index import record_date
+from src.parallel import run_tasks
+from src.settings import (
+    IMPORT_CHUNK_SIZE,
+    IMPORT_MAX_ERRORS,
+    IMPORT_WORKERS,
+    MAX_DECIMAL,
+)
+
+# transaction fields with default names of csv columns holding them
+DEFAULT_COLUMNS = {
+    "date": "date",
+    "type": "type",
+    "code": "code",
+    "unit_price": "unit_price",
+    "amount": "amount",
+    "currency": "currency",
+}
+
+# values of type column (in upper case) with types of transactions
+DEFAULT_TYPES = {
+    "BUY": "BUY",
+    "B": "BUY",
+    "SELL": "SELL",
+    "S": "SELL",
+}
+
+Row = Tuple[int, List[str]]
+
+
+def parse_row(
+    row: List[str],
+    positions: Dict[str, int],
+    types: Dict[str, str],
+    date_format: Optional[str] = None,
+) -> Dict:
+    """convert csv row to trade accepted by apply_transactions,
+    positions map transaction fields to indexes of row columns"""
+
+    try:
+        values = {field: row[i].strip() for field, i in positions.items()}
+    except IndexError:
+        raise ValueError("Missing columns!")
+
+    trade_type = types.get(values["type"].upper())
+    if trade_type is None:
+        raise ValueError(f"Unknown transaction type: {values['type']}!")
+
+    code, currency = values["code"].upper(), values["currency"].upper()
+    if not code.isalpha() or not currency.isalpha():
+        raise ValueError("Invalid code or currency!")
+
+    try:
+        unit_price = Decimal(values["unit_price"]) * 10**MAX_DECIMAL
+        amount = Decimal(values["amount"])
+    except InvalidOperation:
+        raise ValueError("Invalid unit price or amount!")
+    if unit_price != unit_price.to_integral_value() or unit_price < 0:
+        raise ValueError(f"Unit price with over {MAX_DECIMAL} decimals!")
+    if amount != amount.to_integral_value() or amount <= 0:
+        raise ValueError("Amount has to be a positive integer!")
+
+    trade = {
+        "type": trade_type,
+        "code": code,
+        "unit_price": int(unit_price),
+        "amount": int(amount),
+        "currency": currency,
+    }
+
+    if "date" in values:
+        try:
+            if date_format is None:
+                date = datetime.fromisoformat(values["date"])
+            else:
+                date = datetime.strptime(values["date"], date_format)
+        except ValueError:
+            raise ValueError(f"Invalid date: {values['date']}!")
+        trade["date"] = record_date(date)
+
+    return trade
+
+
+def parse_chunk(
+    rows: List[Row],
+    positions: Dict[str, int],
+    types: Dict[str, str],
+    date_format: Optional[str] = None,
+) -> Tuple[List[Row], List[Tuple[int, str]]]:
+    """parse rows of csv file, return trades and errors
+    with numbers of their lines, run in worker processes"""
+
+    trades, errors = [], []
+    for line, row in rows:
+        try:
+            trades.append(
+                (line, parse_row(row, positions, types, date_format))
+            )
+        except ValueError as e:
+            errors.append((line, str(e)))
+    return trades, errors
+
+
+class CsvImporter:
+    """Importer of trades from csv broker statements
+
+    Rows are read in chunks which are parsed in a process pool.
+    Only a few chunks are in flight at once, so memory used does not
+    depend on size of the file. Parsed chunks are applied to the
+    portfolio in order of the file, with one batch per chunk, and
+    the portfolio is saved once at the end. Rows which can't be parsed
+    or applied are reported with their line numbers.
+    """
+
+    def __init__(
+        self,
+        columns: Optional[Dict[str, str]] = None,
+        types: Optional[Dict[str, str]] = None,
+        date_format: Optional[str] = None,
+        delimiter: str = ",",
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        workers: Optional[int] = IMPORT_WORKERS,
+        max_errors: int = IMPORT_MAX_ERRORS,
+    ) -> None:
+        self.columns = {**DEFAULT_COLUMNS, **(columns or {})}
+        self.types = {
+            key.upper(): value
+            for key, value in (types or DEFAULT_TYPES).items()
+        }
+        self.date_format = date_format
+        self.delimiter = delimiter
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.max_errors = max_errors
+
+    def _positions(self, header: List[str]) -> Dict[str, int]:
+        """return indexes of columns holding transaction fields,
+        date column is optional"""
+
+        header = [name.strip() for name in header]
+        positions = {}
+        for field, name in self.columns.items():
+            if name in header:
+                positions[field] = header.index(name)
+            elif field != "date":
+                raise ValueError(f"Missing column {name} in the file!")
+        return positions
+
+    def _chunks(self, reader: Iterator[List[str]]) -> Iterator[List[Row]]:
+        chunk = []
+        for row in reader:
+            if not any(row):
+                continue
+            chunk.append((reader.line_num, row))
+            if len(chunk) == self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def import_file(
+        self, file: IO, portfolio_contr: PortfolioController
+    ) -> Dict:
+        """import trades from csv file opened in text or binary mode
+        to the portfolio, return report of the import"""
+
+        start = perf_counter()
+        if isinstance(file, (io.RawIOBase, io.BufferedIOBase)):
+            file = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+
+        reader = csv.reader(file, delimiter=self.delimiter)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError("File is empty!")
+        positions = self._positions(header)
+
+        report = {"imported": 0, "failed": 0, "errors": []}
+        parsed_chunks = run_tasks(
+            parse_chunk,
+            (
+                (chunk, positions, self.types, self.date_format)
+                for chunk in self._chunks(reader)
+            ),
+            self.workers,
+            ordered=True,
+        )
+        for parsed in parsed_chunks:
+            self._apply(parsed, portfolio_contr, report)
+
+        if report["imported"] > 0:
+            portfolio_contr._save_file_data()
+
+        report["seconds"] = perf_counter() - start
+        report["per_second"] = (
+            report["imported"] / report["seconds"]
+            if report["seconds"]
+            else 0.0
+        )
+        return report
+
+    def _apply(
+        self,
+        parsed: Tuple[List[Row], List[Tuple[int, str]]],
+        portfolio_contr: PortfolioController,
+        report: Dict,
+    ) -> None:
+        """apply parsed chunk to the portfolio, trades are applied one
+        by one if the chunk is rejected to find the invalid ones"""
+
+        trades, errors = parsed
+        try:
+            portfolio_contr.apply_transactions(
+                [trade for _, trade in trades], save=False
+            )
+            report["imported"] += len(trades)
+        except ValueError:
+            for line, trade in trades:
+                try:
+                    portfolio_contr.apply_transactions([trade], save=False)
+                    report["imported"] += 1
+                except ValueError as e:
+                    # drop position of the trade in the one-trade batch
+                    errors.append((line, str(e).split(": ", 1)[-1]))
+            errors.sort()
+
+        report["failed"] += len(errors)
+        free = self.max_errors - len(report["errors"])
+        report["errors"].extend(errors[:free])
@@ -1,14 +1,30 @@
 import json
 
+from bisect import bisect_left
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from streamlit.uploaded_file_manager import UploadedFile
 
+from src.controllers.manifest import Manifest
+from src.controllers.storage import (
+    StorageBackend,
+    empty_portfolio_data,
+    get_storage,
+)
+
 
 class FileHandler:
-    def __init__(self, data_path: Path, portfolios: Dict = {}) -> None:
+    def __init__(
+        self,
+        data_path: Path,
+        portfolios: Dict = {},
+        storage: Optional[StorageBackend] = None,
+    ) -> None:
         self.data_path = data_path
         self.portfolios = portfolios
+        self.storage = storage if storage is not None else get_storage()
+        self.manifest = Manifest(self.data_path)
+        self._manifest_loaded = False
 
     @property
     def data_path(self) -> None:
@@ -62,33 +78,87 @@ class FileHandler:
         return None
 
     def load_portfolios(self) -> None:
-        """Load portfolios from data_path directory"""
-
-        portfolio_paths = []
-        for file in self.data_path.iterdir():
-            if file.name.endswith(".json"):
-                portfolio_paths.append(file)
-
-        self.portfolios = {p.stem: p for p in portfolio_paths}
+        """Load portfolios from manifest of data_path directory,
+        rebuild the manifest if portfolio files were added or removed"""
+
+        self.load_manifest()
+        self.portfolios = {
+            name: Path(entry["path"])
+            for name, entry in self.manifest.entries.items()
+        }
+
+    def load_manifest(self) -> None:
+        """read manifest of data_path directory, rebuild it if it's stale"""
+
+        if self._manifest_loaded:
+            return
+
+        if not self.manifest.load() or self.manifest.is_stale():
+            self.manifest.rebuild(self.storage)
+        self._manifest_loaded = True
+
+    def get_portfolio_summary(self, name: str) -> Optional[Dict]:
+        """get summary of portfolio from the manifest"""
+
+        self.load_manifest()
+        return self.manifest.entries.get(name)
+
+    def update_portfolio_summary(self, name: str, transactions: int) -> None:
+        """update summary of portfolio in the manifest
+        if its number of transactions has changed"""
+
+        summary = self.get_portfolio_summary(name)
+        path = self.get_portfolio_path(name)
+        if path is None or (
+            summary is not None and summary["transactions"] == transactions
+        ):
+            return
+
+        self.manifest.update(name, path, self.storage, transactions)
+        self.manifest.save()
+
+    def search_portfolios(self, query: str, limit: int) -> List[str]:
+        """return at most limit names of portfolios containing query,
+        names starting with query are returned first"""
+
+        names = sorted(self.portfolios)
+        query = query.strip()
+        if query == "":
+            return names[:limit]
+
+        # names with query prefix are a contiguous range of sorted names
+        start = bisect_left(names, query)
+        matches = []
+        for name in names[start:]:
+            if not name.startswith(query) or len(matches) == limit:
+                break
+            matches.append(name)
+
+        lower_query = query.lower()
+        for name in names:
+            if len(matches) == limit:
+                break
+            if lower_query in name.lower() and not name.startswith(query):
+                matches.append(name)
+
+        return matches
 
     def create_empty_portfolio(self, name: str) -> None:
-        """Create a new portfolio file in /data/portfolios directory"""
+        """Create a new portfolio file in data_path directory"""
 
         self.check_file_name(name)
         if self.get_portfolio_path(name) is not None:
             raise FileExistsError("Portfolio with that name already exists!")
 
-        portfolio_path = f"{self.data_path}/{name}.json"
-        with open(portfolio_path, "w", encoding="utf-8") as file:
-            empty_portfolio = {
-                "assets": {},
-                "transactions": [],
-                "currencies": {},
-                "categories": {},
-            }
-            file.write(json.dumps(empty_portfolio))
+        # manifest is read before the directory is modified,
+        # so it's not considered stale
+        self.load_manifest()
+
+        portfolio_path = self.data_path / f"{name}{self.storage.SUFFIX}"
+        self.storage.write(portfolio_path, empty_portfolio_data())
 
         self.add_portfolio(name, portfolio_path)
+        self._update_manifest(name, portfolio_path, 0)
 
     def upload_portfolio(
         self, name: str, portfolio_file: UploadedFile
@@ -103,12 +173,18 @@ class FileHandler:
             raise FileExistsError("Portfolio with that name already exists!")
 
         data = json.load(portfolio_file)
+        if not isinstance(data, dict):
+            raise ValueError("Portfolio file should contain an object!")
 
-        portfolio_path = f"{self.data_path}/{name}.json"
-        with open(portfolio_path, "w") as file:
-            file.write(json.dumps(data))
+        self.load_manifest()
+
+        portfolio_path = self.data_path / f"{name}{self.storage.SUFFIX}"
+        self.storage.write(portfolio_path, data)
 
         self.add_portfolio(name, portfolio_path)
+        self._update_manifest(
+            name, portfolio_path, len(data.get("transactions", []))
+        )
 
     def remove_portfolio(self, name: str) -> None:
         """Remove portfolio file with name specified in argument"""
@@ -118,5 +194,18 @@ class FileHandler:
         if file_path is None or not file_path.exists():
             raise FileNotFoundError("Portfolio with that name doesn't exists!")
 
-        file_path.unlink()
-        del self.portfolios[name]
+        self.load_manifest()
+        self.storage.remove(file_path)
+        # portfolio could be already removed by the watcher
+        self.portfolios.pop(name, None)
+
+        self.manifest.remove(name)
+        self.manifest.save()
+
+    def _update_manifest(
+        self, name: str, path: Path, transactions: int
+    ) -> None:
+        """add summary of created portfolio to the manifest"""
+
+        self.manifest.update(name, path, self.storage, transactions)
+        self.manifest.save()
@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.models.portfolio import record_to_dict
+
+# numbers of records of journals counted in this process, kept by path
+# and valid for the size and mtime of the journal they were counted at,
+# so journals created again on every rerun do not read the whole file
+_COUNTED: Dict[Path, Tuple[Tuple[int, int], int]] = {}
+_COUNTED_LOCK = threading.Lock()
+
+
+class Journal:
+    """Append-only log of portfolio changes stored next to the portfolio
+    file. Every record is a single compact json line."""
+
+    SUFFIX = ".journal"
+
+    def __init__(self, portfolio_path: Path) -> None:
+        self.path = Path(portfolio_path).with_suffix(self.SUFFIX)
+
+    @property
+    def records(self) -> int:
+        """return number of records in the journal, counted only
+        if the journal changed since it was counted in this process"""
+
+        version = self._version()
+        if version is None:
+            return 0
+
+        with _COUNTED_LOCK:
+            counted = _COUNTED.get(self.path)
+        if counted is not None and counted[0] == version:
+            return counted[1]
+
+        with open(self.path, "rb") as file:
+            records = file.read().count(b"\n")
+        self._count(records)
+        return records
+
+    def _version(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _count(self, records: int) -> None:
+        """remember number of records in current version of the journal"""
+
+        version = self._version()
+        with _COUNTED_LOCK:
+            if version is None:
+                _COUNTED.pop(self.path, None)
+            else:
+                _COUNTED[self.path] = (version, records)
+
+    def append(self, record: Dict) -> None:
+        """append record to the journal and flush it to the disk"""
+
+        line = json.dumps(
+            record, separators=(",", ":"), default=record_to_dict
+        )
+        line += "\n"
+        records = self.records
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(line)
+            file.flush()
+            os.fsync(file.fileno())
+
+        self._count(records + 1)
+
+    def read(self) -> Iterator[Dict]:
+        """yield records from the journal
+
+        Torn final record (left by an interrupted write) is skipped
+        and cut off from the file, so next appends start on a clean line.
+        """
+
+        if not self.path.is_file():
+            return
+
+        records = 0
+        valid_size = 0
+        with open(self.path, "rb") as file:
+            lines = file.readlines()
+
+        for i, line in enumerate(lines):
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("Incomplete journal record")
+                record = json.loads(line)
+            except ValueError:
+                if i != len(lines) - 1:
+                    raise ValueError(
+                        f"Corrupted record in journal {self.path}!"
+                    )
+                self._truncate(valid_size)
+                break
+
+            valid_size += len(line)
+            records += 1
+            yield record
+
+        self._count(records)
+
+    def clear(self) -> None:
+        """remove all records from the journal"""
+
+        if self.path.exists():
+            self._truncate(0)
+        self._count(0)
+
+    def remove(self) -> None:
+        """remove journal file"""
+
+        if self.path.exists():
+            self.path.unlink()
+        self._count(0)
+
+    def _truncate(self, size: int) -> None:
+        with open(self.path, "r+b") as file:
+            file.truncate(size)
+            file.flush()
+            os.fsync(file.fileno())
+
+
+def apply_record(data: Dict, record: Dict) -> None:
+    """apply journal record to portfolio data dictionary
+
+    Dictionary sections hold new values of changed keys (None for removed
+    ones), "transactions" holds start index and appended records, which
+    makes replaying the record on already updated data harmless.
+    """
+
+    for section, changes in record.items():
+        if section == "transactions":
+            transactions: List = data.setdefault("transactions", [])
+            del transactions[changes["from"] :]
+            transactions.extend(changes["items"])
+            continue
+
+        values = data.setdefault(section, {})
+        for key, value in changes.items():
+            if value is None:
+                values.pop(key, None)
+            else:
+                values[key] = value
@@ -0,0 +1,137 @@
+import json
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from src.controllers.storage import StorageBackend
+
+# manifests parsed in this process, kept by path with the mtime and size
+# of the file they were read from, so they are parsed again only if the
+# file changed, not on every rerun
+_LOADED: Dict[Path, Tuple[Tuple[int, int], Dict[str, Dict], int]] = {}
+
+
+class Manifest:
+    """Index of portfolios in data_path with summary of every portfolio
+    (path, size, mtime, number of transactions and last modification
+    date), so listing portfolios doesn't require reading their files"""
+
+    FILE_NAME = "portfolios.manifest"
+
+    def __init__(self, data_path: Path) -> None:
+        self.data_path = Path(data_path)
+        self.path = self.data_path / self.FILE_NAME
+        self.entries: Dict[str, Dict] = {}
+        self.directory_mtime: Optional[int] = None
+
+    def load(self) -> bool:
+        """load manifest file, return False if it doesn't exist
+        or couldn't be read"""
+
+        try:
+            version = self._version()
+            loaded = _LOADED.get(self.path)
+            if loaded is None or loaded[0] != version:
+                with open(self.path, "r") as file:
+                    manifest = json.load(file)
+                loaded = _LOADED[self.path] = (
+                    version,
+                    dict(manifest["portfolios"]),
+                    manifest["directory_mtime"],
+                )
+        except (OSError, ValueError, KeyError, TypeError):
+            _LOADED.pop(self.path, None)
+            self.entries, self.directory_mtime = {}, None
+            return False
+
+        # summaries are replaced, not changed in place, by update
+        _, entries, self.directory_mtime = loaded
+        self.entries = dict(entries)
+        return True
+
+    def _version(self) -> Tuple[int, int]:
+        stat = self.path.stat()
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def is_stale(self) -> bool:
+        """check if files were added to or removed from data_path
+        after the manifest was saved"""
+
+        return self.directory_mtime != self.data_path.stat().st_mtime_ns
+
+    def save(self) -> None:
+        """write manifest file in data_path"""
+
+        # file is created before reading the directory mtime
+        # and then written in place, which doesn't change the mtime again
+        self.path.touch(exist_ok=True)
+        self.directory_mtime = self.data_path.stat().st_mtime_ns
+
+        with open(self.path, "w") as file:
+            file.write(
+                json.dumps(
+                    {
+                        "directory_mtime": self.directory_mtime,
+                        "portfolios": self.entries,
+                    }
+                )
+            )
+        _LOADED[self.path] = (
+            self._version(),
+            dict(self.entries),
+            self.directory_mtime,
+        )
+
+    def update(
+        self,
+        name: str,
+        path: Path,
+        storage: StorageBackend,
+        transactions: Optional[int] = None,
+    ) -> None:
+        """create or update summary of the portfolio, transactions are
+        counted from the file if their number is not given"""
+
+        version = [v for v in storage.version(path) if v is not None]
+        if transactions is None:
+            transactions = storage.count_transactions(path)
+
+        mtime = max(v[0] for v in version)
+        self.entries[name] = {
+            "path": str(path),
+            "size": sum(v[1] for v in version),
+            "mtime": mtime,
+            "transactions": transactions,
+            "last_modified": datetime.fromtimestamp(mtime / 1e9).strftime(
+                "%Y-%m-%dT%H:%M:%S"
+            ),
+        }
+
+    def remove(self, name: str) -> None:
+        """remove summary of the portfolio"""
+
+        self.entries.pop(name, None)
+
+    def rebuild(self, storage: StorageBackend) -> None:
+        """update manifest with portfolios in data_path, only portfolios
+        modified since they were summarized are read, save the manifest"""
+
+        entries, self.entries = self.entries, {}
+        for file in self.data_path.iterdir():
+            if not file.name.endswith(storage.SUFFIX):
+                continue
+
+            old = entries.get(file.stem)
+            version = [v for v in storage.version(file) if v is not None]
+            if (
+                old is not None
+                and old["path"] == str(file)
+                and old["mtime"] == max(v[0] for v in version)
+                and old["size"] == sum(v[1] for v in version)
+            ):
+                self.entries[file.stem] = old
+            else:
+                self.update(file.stem, file, storage)
+
+        self.save()
@@ -0,0 +1,128 @@
+import threading
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from src.models.portfolio import Portfolio
+from src.settings import PORTFOLIO_CACHE_BYTES, PORTFOLIO_CACHE_ENTRIES
+
+
+class PortfolioCache:
+    """Least recently used cache of loaded portfolios, shared by all
+    sessions of the process. Entries are keyed by portfolio path and
+    valid only for the storage version (mtime, size) they were loaded at.
+    Memory is bounded by number of entries and total size of their files.
+
+    When watched is set, portfolio files are observed by a watcher which
+    invalidates modified entries, so lookups may skip the version check.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = PORTFOLIO_CACHE_ENTRIES,
+        max_bytes: int = PORTFOLIO_CACHE_BYTES,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.watched = False
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> Dict:
+        """return counters of the cache"""
+
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def get(
+        self, path: Path, version: Optional[Tuple] = None
+    ) -> Optional[Portfolio]:
+        """return cached portfolio loaded from path if it is still
+        in given storage version and has no unsaved modifications,
+        version is not checked if it is None"""
+
+        path = Path(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                entry_version, portfolio_version, _, portfolio = entry
+                if (
+                    version is None or entry_version == version
+                ) and portfolio_version == portfolio.version:
+                    self._entries.move_to_end(path)
+                    self.hits += 1
+                    return portfolio
+
+                self._pop(path)
+
+            self.misses += 1
+            return None
+
+    def put(
+        self, path: Path, version: Tuple, portfolio: Portfolio, size: int
+    ) -> None:
+        """cache portfolio loaded from (or saved to) path in given
+        storage version, size is used as a weight of the entry"""
+
+        path = Path(path)
+        with self._lock:
+            self._pop(path)
+            if size > self.max_bytes:
+                return
+
+            self._entries[path] = (version, portfolio.version, size, portfolio)
+            self.size += size
+
+            while (
+                len(self._entries) > self.max_entries
+                or self.size > self.max_bytes
+            ):
+                _, (_, _, evicted_size, _) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, path: Path) -> None:
+        """remove portfolio loaded from path from the cache"""
+
+        with self._lock:
+            self._pop(Path(path))
+
+    def refresh(self, path: Path, version: Tuple) -> None:
+        """remove portfolio loaded from path from the cache
+        unless it was cached in given storage version"""
+
+        path = Path(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] != version:
+                self._pop(path)
+
+    def clear(self) -> None:
+        """remove all portfolios from the cache"""
+
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _pop(self, path: Path) -> None:
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self.size -= entry[2]
+
+
+# cache shared by every rerun of the application in this process
+PORTFOLIO_CACHE = PortfolioCache()
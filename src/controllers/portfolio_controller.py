@@ -1,23 +1,80 @@
-import json
-
+from functools import wraps
 from pathlib import PosixPath, Path
 from datetime import datetime
-
-from src.models.portfolio import Portfolio
+from time import perf_counter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+import pandas as pd
+
+from src.controllers.portfolio_cache import PortfolioCache
+from src.controllers.storage import (
+    StorageBackend,
+    empty_portfolio_data,
+    get_storage,
+)
+from src.models.allocation import rebalance
+from src.models.fx_rates import FxRates
+from src.models.lots import LOT_METHODS, Lot, RealizedGain
+from src.models.metrics import performance
+from src.models.money import SCALE, fixed
+from src.models.portfolio import Asset, Portfolio, Position, Transaction
+from src.models.price_history import PriceHistory
+from src.models.projection import project, return_model
+from src.models.risk import RiskModel, value_at_risk
+from src.models.transaction_columns import TransactionColumns
+from src.models.transaction_index import DateLike, date_key, record_date
+from src.models.valuation import holdings_tables
+from src.models.value_series import daily_values_by_code, total_values
+from src.settings import (
+    PROJECTION_CHUNK_PATHS,
+    PROJECTION_PATHS,
+    PROJECTION_PERCENTILES,
+    PROJECTION_STEPS_PER_YEAR,
+    PROJECTION_WORKERS,
+    RISK_FREE_RATE,
+    TRADING_DAYS,
+    TRANSACTIONS_PAGE_SIZE,
+    VAR_CONFIDENCE,
+    VOLATILITY_WINDOW,
+)
+
+
+def locked(method: Callable) -> Callable:
+    """run controller method holding the lock of its portfolio,
+    which may be shared by sessions through the portfolio cache"""
+
+    @wraps(method)
+    def run(self, *args, **kwargs):
+        with self._portfolio.lock:
+            return method(self, *args, **kwargs)
+
+    return run
 
 
 class PortfolioController:
-    def __init__(self, portfolio_path: Path, portfolio_name: str):
+    def __init__(
+        self,
+        portfolio_path: Path,
+        portfolio_name: str,
+        storage: Optional[StorageBackend] = None,
+        cache: Optional[PortfolioCache] = None,
+    ):
         self.path = portfolio_path
-        self._portfolio = Portfolio(
-            portfolio_name,
-            {
-                "assets": {},
-                "transactions": [],
-                "currencies": {},
-                "categories": {},
-            },
-        )
+        self.storage = storage if storage is not None else get_storage()
+        self.cache = cache
+        self._portfolio = Portfolio(portfolio_name, empty_portfolio_data())
+
+        self._reset_changes()
 
         if self.path.is_file():
             self._load_file_data()
@@ -37,17 +94,91 @@ class PortfolioController:
             raise ValueError("Invalid path type!")
 
     def _load_file_data(self) -> None:
-        """load data from file specified in controller path"""
+        """load data from file specified in controller path,
+        portfolio is taken from the cache if file was not modified"""
+
+        if self.cache is not None:
+            # watched cache is invalidated by filesystem events
+            version = None
+            if not self.cache.watched:
+                version = self.storage.version(self.path)
+
+            portfolio = self.cache.get(self.path, version)
+            if portfolio is not None:
+                self._portfolio = portfolio
+                self._reset_changes()
+                return
+
+        version = self.storage.version(self.path)
+        self._portfolio.data = self.storage.load(self.path)
+        self._reset_changes()
+
+        # portfolios saved before positions were tracked
+        if "positions" not in self._portfolio.data:
+            self.rebuild_positions()
+
+        # do not cache data if file was modified while being loaded
+        if self.storage.version(self.path) == version:
+            self._cache_portfolio(version)
+
+    @locked
+    def _save_file_data(self) -> None:
+        """save changes of current portfolio class data
+        to the storage file specified in controller path"""
 
-        with open(self.path, "r") as file:
-            self._portfolio.data = json.load(file)
+        self.storage.save(
+            self.path, self._portfolio.data, self._changes_record()
+        )
+        self._reset_changes()
+        self._cache_portfolio(self.storage.version(self.path))
 
-    def _save_file_data(self) -> None:
-        """save current portfolio class data
-        to json file specified in controller path"""
+    @locked
+    def checkpoint(self) -> None:
+        """write whole portfolio data to the storage file
+        specified in controller path"""
+
+        self.storage.write(self.path, self._portfolio.data)
+        self._reset_changes()
+        self._cache_portfolio(self.storage.version(self.path))
+
+    def _cache_portfolio(self, version: Tuple) -> None:
+        """put portfolio in the cache as saved in given storage version"""
+
+        if self.cache is None:
+            return
+
+        size = sum(v[1] for v in version if v is not None)
+        self.cache.put(self.path, version, self._portfolio, size)
+
+    def _mark_changed(self, section: str, key: str) -> None:
+        """mark key of portfolio data section as changed since last save"""
+
+        self._changes.setdefault(section, set()).add(key)
+        self._portfolio.version += 1
+        if section in ("assets", "categories"):
+            self._portfolio.update_allocation(key)
 
-        with open(self.path, "w") as file:
-            file.write(json.dumps(self._portfolio.data))
+    def _reset_changes(self) -> None:
+        self._changes = {}
+        self._saved_transactions = len(self._portfolio.transactions)
+
+    def _changes_record(self) -> Dict:
+        """create journal record with changes since last save"""
+
+        record = {}
+        data = self._portfolio.data
+        for section, keys in self._changes.items():
+            values = data.get(section, {})
+            record[section] = {key: values.get(key) for key in keys}
+
+        transactions = self._portfolio.transactions
+        if len(transactions) != self._saved_transactions:
+            record["transactions"] = {
+                "from": self._saved_transactions,
+                "items": transactions[self._saved_transactions :],
+            }
+
+        return record
 
     @property
     def portfolio_name(self) -> str:
@@ -67,23 +198,119 @@ class PortfolioController:
 
         return self._portfolio.assets
 
+    @property
+    def portfolio_version(self) -> int:
+        """return version of portfolio, changed by every modification"""
+
+        return self._portfolio.version
+
     @property
     def portfolio_transactions(self) -> dict:
         """return transactions dictionary from portfolio class"""
 
         return self._portfolio.transactions
 
+    @property
+    def transaction_columns(self) -> TransactionColumns:
+        """return columnar transaction history from portfolio class"""
+
+        return self._portfolio.transaction_columns
+
+    def transaction_positions(
+        self,
+        codes: Optional[List[str]] = None,
+        types: Optional[List[str]] = None,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+        sort: str = "date",
+        descending: bool = True,
+    ) -> np.ndarray:
+        """return positions of transactions filtered by codes, types
+        and dates in the indexes (see TransactionIndex.select) and sorted
+        by field (see TransactionColumns.sort), computed once per version
+        of the portfolio and query"""
+
+        columns = self._portfolio.transaction_columns
+        return self._portfolio.memoize(
+            "transaction_positions",
+            (
+                None if codes is None else tuple(codes),
+                None if types is None else tuple(types),
+                None if start is None else date_key(start),
+                None if end is None else date_key(end, upper=True),
+                sort,
+                descending,
+            ),
+            lambda: columns.sort(
+                np.array(
+                    self._portfolio.transaction_index.select(
+                        codes, None, types, start, end
+                    ),
+                    dtype=np.int64,
+                ),
+                sort,
+                descending,
+            ),
+        )
+
+    def transaction_page(
+        self,
+        positions: np.ndarray,
+        page: int = 0,
+        page_size: int = TRANSACTIONS_PAGE_SIZE,
+    ) -> pd.DataFrame:
+        """return frame of transactions on page of positions,
+        only rows of the page are taken from the columns"""
+
+        columns = self._portfolio.transaction_columns
+        rows = positions[page * page_size : (page + 1) * page_size]
+
+        def names(symbols, ids: np.ndarray) -> np.ndarray:
+            return np.array(symbols.names, dtype=object)[ids[rows]]
+
+        return pd.DataFrame(
+            {
+                "date": columns.dates[rows].astype("datetime64[s]"),
+                "type": names(columns.types, columns.type_ids),
+                "code": names(columns.codes, columns.code_ids),
+                "amount": columns.amounts[rows],
+                "unit_price": columns.unit_prices[rows],
+                "currency": names(columns.currencies, columns.currency_ids),
+            },
+            index=rows,
+        )
+
     @property
     def portfolio_currencies(self) -> dict:
         """return currencies dictionary from portfolio class"""
         return self._portfolio.currencies
 
+    @property
+    def portfolio_positions(self) -> Dict[str, Position]:
+        """return positions dictionary from portfolio class"""
+
+        return self._portfolio.positions
+
+    @property
+    def portfolio_categories(self) -> Dict[str, Dict[str, str]]:
+        """return categories of assets from portfolio class"""
+
+        return self._portfolio.categories
+
+    @property
+    def portfolio_targets(self) -> Dict[str, Dict[str, float]]:
+        """return target weights of categories from portfolio class"""
+
+        return self._portfolio.targets
+
+    @locked
     def add_asset(
-        self, code: str, unit_price: float, amount: float, currency: str
+        self, code: str, unit_price: int, amount: int, currency: str
     ) -> None:
         """Add asset in amount and currency specified in the arguments,
-        to the portfolio"""
+        to the portfolio, unit price is given in fixed-point units"""
 
+        unit_price, amount = fixed(unit_price), fixed(amount)
         if (
             code == ""
             or currency == ""
@@ -98,13 +325,15 @@ class PortfolioController:
             cur_amount = self._portfolio.assets[code]["amount"]
             amount += cur_amount
 
-        self._portfolio.assets[code] = {
-            "unit_price": unit_price,
-            "amount": amount,
-            "currency": f"{currency}",
-        }
+        self._portfolio.assets[code] = Asset(
+            unit_price=unit_price,
+            amount=amount,
+            currency=f"{currency}",
+        )
         self._portfolio.data["assets"] = self._portfolio.assets
+        self._mark_changed("assets", code)
 
+    @locked
     def remove_asset(self, code: str, amount: float) -> None:
         """remove specified amount of asset from portfolio"""
 
@@ -125,10 +354,14 @@ class PortfolioController:
             del self._portfolio.assets[code]
         else:
             self._portfolio.assets[code]["amount"] = curr_amount
+        self._mark_changed("assets", code)
 
-    def update_balance(self, value: float, currency: str) -> None:
-        """decrease balance of given currency in portfolio"""
+    @locked
+    def update_balance(self, value: int, currency: str) -> None:
+        """change balance of given currency in portfolio by value
+        given in fixed-point units"""
 
+        value = fixed(value)
         if currency is None or currency == "" or not currency.isalpha():
             raise ValueError("Invalid currency")
 
@@ -137,13 +370,17 @@ class PortfolioController:
             value += current_value
 
         self._portfolio.currencies[currency] = value
+        self._mark_changed("currencies", currency)
 
+    @locked
     def buy_asset(
-        self, code: str, unit_price: float, amount: float, currency: str
+        self, code: str, unit_price: int, amount: int, currency: str
     ) -> None:
         """add an asset to portfolio, create history record for
         the transaction and update currency balance of the portfolio"""
 
+        unit_price, amount = fixed(unit_price), fixed(amount)
+
         self.add_asset(
             code=code, amount=amount, unit_price=unit_price, currency=currency
         )
@@ -159,11 +396,24 @@ class PortfolioController:
         transaction_value = unit_price * amount
         self.update_balance(-transaction_value, currency)
 
+    @locked
     def sell_asset(
-        self, code: str, unit_price: float, amount: float, currency: str
+        self,
+        code: str,
+        unit_price: int,
+        amount: int,
+        currency: str,
+        method: Optional[str] = None,
+        lot: Optional[int] = None,
     ) -> None:
         """remove asset from portfolio, create history record for
-        the transaction and update currency balance of the portfolio"""
+        the transaction and update currency balance of the portfolio
+
+        Sold amount is matched with open lots of the asset using
+        the method ("FIFO" or "LIFO") or taken from the given lot.
+        """
+
+        unit_price, amount = fixed(unit_price), fixed(amount)
 
         if code in self._portfolio.assets:
             if amount > self._portfolio.assets[code]["amount"]:
@@ -172,6 +422,19 @@ class PortfolioController:
         if amount <= 0 or unit_price < 0 or currency == "":
             raise ValueError("Invalid input!")
 
+        extra = {}
+        if method is not None:
+            if method not in LOT_METHODS:
+                raise ValueError("Invalid lot matching method!")
+            extra["method"] = method
+        if lot is not None:
+            open_lot = self._portfolio.lots.open.get(lot)
+            if open_lot is None or open_lot.code != code:
+                raise ValueError("Lot with that id isn't open!")
+            if amount > open_lot.amount:
+                raise ValueError("Not enough assets in the lot to sell")
+            extra["lot"] = lot
+
         self.remove_asset(
             code=code,
             amount=amount,
@@ -183,32 +446,578 @@ class PortfolioController:
             unit_price=unit_price,
             currency=currency,
             type="SELL",
+            **extra,
         )
 
         transaction_value = unit_price * amount
         self.update_balance(transaction_value, currency)
 
+    @locked
     def add_transaction_record(
         self,
         type: str,
         code: str,
-        unit_price: float,
-        amount: float,
+        unit_price: int,
+        amount: int,
         currency: str,
+        **extra,
     ) -> None:
-        """add transaction record to portfolio transactions history"""
+        """add transaction record to portfolio transactions history,
+        extra fields are kept in the record"""
 
         current_date = datetime.now()
         # change date to string in ISO 8601 format
         date_string = current_date.strftime("%Y-%m-%dT%H:%M:%S")
 
-        transaction = {
-            "date": date_string,
-            "type": type,
-            "code": code,
-            "unit_price": unit_price,
-            "amount": amount,
-            "currency": currency,
+        transaction = Transaction(
+            date=date_string,
+            type=type,
+            code=code,
+            unit_price=unit_price,
+            amount=amount,
+            currency=currency,
+            **extra,
+        )
+
+        self._portfolio.append_transaction(transaction)
+        self._portfolio.version += 1
+        if code in self._portfolio.positions:
+            self._mark_changed("positions", code)
+
+    @locked
+    def set_categories(self, code: str, categories: Dict[str, str]) -> None:
+        """set categories of asset in dimensions (e.g. asset class,
+        sector or region), empty categories remove the asset's ones"""
+
+        if code == "" or not code.isalpha():
+            raise ValueError("Invalid input!")
+        categories = {
+            dimension.strip(): category.strip()
+            for dimension, category in categories.items()
+            if category.strip() != ""
+        }
+        if "" in categories:
+            raise ValueError("Dimension of category is empty!")
+
+        if categories:
+            self._portfolio.categories[code] = categories
+        else:
+            self._portfolio.categories.pop(code, None)
+        self._mark_changed("categories", code)
+
+    @locked
+    def set_targets(self, dimension: str, targets: Dict[str, float]) -> None:
+        """set target weights of categories of dimension, weights have
+        to sum to 1, empty targets remove the dimension's ones"""
+
+        targets = {
+            category: float(weight)
+            for category, weight in targets.items()
+            if weight != 0
+        }
+        if any(weight < 0 for weight in targets.values()):
+            raise ValueError("Target weights can't be negative!")
+        if targets and abs(sum(targets.values()) - 1) > 1e-9:
+            raise ValueError("Target weights have to sum to 100%!")
+
+        if targets:
+            self._portfolio.targets[dimension] = targets
+        else:
+            self._portfolio.targets.pop(dimension, None)
+        self._mark_changed("targets", dimension)
+
+    def category_allocation(
+        self,
+        dimension: str,
+        base: Optional[str] = None,
+        fx_rates: Optional[FxRates] = None,
+    ) -> Dict[str, int]:
+        """return value of assets in every category of dimension,
+        in base currency if it's given with exchange rates"""
+
+        return self._portfolio.allocation.by_category(
+            dimension, base, fx_rates
+        )
+
+    def rebalance(
+        self,
+        dimension: str,
+        base: Optional[str] = None,
+        fx_rates: Optional[FxRates] = None,
+        cash: int = 0,
+    ) -> Dict:
+        """return trades reaching target weights of categories
+        of dimension with cash (in base currency) invested,
+        trades can be applied with apply_transactions"""
+
+        targets = self._portfolio.targets.get(dimension)
+        if targets is None:
+            raise ValueError(f"No targets of {dimension}!")
+
+        return rebalance(
+            self._portfolio.assets,
+            self._portfolio.categories,
+            dimension,
+            targets,
+            base,
+            fx_rates,
+            fixed(cash),
+        )
+
+    def open_lots(self, code: str) -> List[Lot]:
+        """return open lots of asset in order of buying"""
+
+        return self._portfolio.lots.open_lots(code)
+
+    def realized_gains(self, code: Optional[str] = None) -> List[RealizedGain]:
+        """return realized gains of sells matched with lots,
+        of all assets or of the given one"""
+
+        gains = self._portfolio.lots.gains
+        if code is None:
+            return list(gains)
+        return [gain for gain in gains if gain.code == code]
+
+    def holdings_tables(
+        self,
+        base: Optional[str] = None,
+        fx_rates: Optional[FxRates] = None,
+        price_history: Optional[PriceHistory] = None,
+    ) -> Dict[str, Any]:
+        """return frames of assets and currency balances with values,
+        weights and profits and fixed-point total (see src.models.valuation.holdings_tables),
+        valued at last close prices if price history is given and
+        in base currency if it's given with exchange rates, computed
+        once per version of the portfolio, of the prices and of the rates"""
+
+        portfolio = self._portfolio
+
+        def compute() -> Dict[str, Any]:
+            return holdings_tables(
+                portfolio.assets,
+                portfolio.positions,
+                portfolio.currencies,
+                base,
+                fx_rates,
+                price_history,
+            )
+
+        return portfolio.memoize(
+            "holdings_tables",
+            (
+                base,
+                fx_rates,
+                None if fx_rates is None else fx_rates.version,
+                price_history,
+                None if price_history is None else price_history.version,
+            ),
+            compute,
+        )
+
+    def _values_by_code(
+        self,
+        price_history: PriceHistory,
+        base: Optional[str] = None,
+        fx_rates: Optional[FxRates] = None,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+    ) -> Tuple[Tuple, Tuple[pd.DataFrame, pd.DataFrame]]:
+        """return key of the arguments with daily values and flows
+        of every asset, computed once per version of the portfolio,
+        of the prices and of the rates"""
+
+        key = (
+            price_history,
+            price_history.version,
+            base,
+            fx_rates,
+            None if fx_rates is None else fx_rates.version,
+            start,
+            end,
+        )
+        portfolio = self._portfolio
+        values = portfolio.memoize(
+            "values_by_code",
+            key,
+            lambda: daily_values_by_code(
+                portfolio.transaction_columns,
+                price_history,
+                base,
+                fx_rates,
+                start,
+                end,
+            ),
+        )
+        return key, values
+
+    def value_series(
+        self,
+        price_history: PriceHistory,
+        base: Optional[str] = None,
+        fx_rates: Optional[FxRates] = None,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+    ) -> pd.DataFrame:
+        """return daily value of assets held and net value invested"""
+
+        key, values = self._values_by_code(
+            price_history, base, fx_rates, start, end
+        )
+        return self._portfolio.memoize(
+            "value_series", key, lambda: total_values(*values)
+        )
+
+    def performance_metrics(
+        self,
+        price_history: PriceHistory,
+        base: Optional[str] = None,
+        fx_rates: Optional[FxRates] = None,
+        risk_free: float = RISK_FREE_RATE,
+        window: int = VOLATILITY_WINDOW,
+    ) -> Dict:
+        """return time and money-weighted returns, maximum drawdown,
+        volatility and Sharpe ratio of every asset and of the portfolio
+        with rolling volatility of the portfolio, computed once
+        per version of the portfolio, of the prices and of the rates"""
+
+        key, values = self._values_by_code(price_history, base, fx_rates)
+        return self._portfolio.memoize(
+            "performance",
+            (key, risk_free, window),
+            lambda: performance(*values, risk_free, window),
+        )
+
+    def holding_values(
+        self,
+        price_history: PriceHistory,
+        base: Optional[str] = None,
+        fx_rates: Optional[FxRates] = None,
+    ) -> Tuple[List[str], np.ndarray, float]:
+        """return codes of assets with price history, their values
+        at last close prices and value of other assets and currency
+        balances, in fixed-point units of base currency if it's given
+        with exchange rates, other assets are valued at unit price"""
+
+        def rate(currency: str) -> float:
+            if base is None or fx_rates is None:
+                return 1.0
+            return fx_rates.rate(currency, base)
+
+        assets = self._portfolio.assets
+        codes = list(assets)
+        prices = price_history.last_prices(codes) * SCALE
+        modeled = ~np.isnan(prices)
+
+        values = np.array(
+            [
+                assets[code].amount * rate(assets[code].currency)
+                for code in codes
+            ]
+        )
+        other = sum(
+            assets[code].unit_price * values[i]
+            for i, code in enumerate(codes)
+            if not modeled[i]
+        ) + sum(
+            balance * rate(currency)
+            for currency, balance in self._portfolio.currencies.items()
+        )
+        return (
+            [code for i, code in enumerate(codes) if modeled[i]],
+            values[modeled] * prices[modeled],
+            other,
+        )
+
+    def projection(
+        self,
+        price_history: PriceHistory,
+        base: Optional[str] = None,
+        fx_rates: Optional[FxRates] = None,
+        years: int = 1,
+        paths: int = PROJECTION_PATHS,
+        workers: Optional[int] = PROJECTION_WORKERS,
+        seed: int = 0,
+    ) -> Iterator[Dict]:
+        """simulate value of the portfolio over years with correlated
+        returns of assets drawn from their price history, yield
+        percentile bands of value (in fixed-point units) refined as
+        paths are simulated, see src.models.projection.project"""
+
+        codes, values, other = self.holding_values(
+            price_history, base, fx_rates
+        )
+        if len(codes) == 0:
+            raise ValueError("No price history of held assets!")
+
+        mean, loadings = self._portfolio.memoize(
+            "return_model",
+            (price_history, price_history.version, tuple(codes)),
+            lambda: return_model(price_history.returns(codes)),
+        )
+        return project(
+            values,
+            other,
+            mean,
+            loadings,
+            steps=years * PROJECTION_STEPS_PER_YEAR,
+            step_days=TRADING_DAYS // PROJECTION_STEPS_PER_YEAR,
+            paths=paths,
+            chunk_paths=PROJECTION_CHUNK_PATHS,
+            workers=workers,
+            percentiles=PROJECTION_PERCENTILES,
+            seed=seed,
+        )
+
+    def risk(
+        self,
+        price_history: PriceHistory,
+        base: Optional[str] = None,
+        fx_rates: Optional[FxRates] = None,
+        confidence: float = VAR_CONFIDENCE,
+        horizon: int = 1,
+    ) -> Dict:
+        """return Value-at-Risk, expected shortfall and contribution
+        of every asset with price history (see src.models.risk),
+        losses are in fixed-point units of base currency, computed once
+        per version of the portfolio, of the prices and of the rates"""
+
+        def compute() -> Dict:
+            codes, values, _ = self.holding_values(
+                price_history, base, fx_rates
+            )
+            if len(codes) == 0:
+                raise ValueError("No price history of held assets!")
+
+            order = np.argsort(codes)
+            codes = [codes[i] for i in order]
+            risk = value_at_risk(
+                RiskModel.of(price_history, codes),
+                values[order],
+                confidence,
+                horizon,
+            )
+            risk["codes"] = codes
+            return risk
+
+        return self._portfolio.memoize(
+            "risk",
+            (
+                price_history,
+                price_history.version,
+                base,
+                fx_rates,
+                None if fx_rates is None else fx_rates.version,
+                confidence,
+                horizon,
+            ),
+            compute,
+        )
+
+    def as_of(self, date: DateLike) -> Dict:
+        """return assets and currency balances of the portfolio
+        resulting from transactions made until date (inclusive)"""
+
+        return self._portfolio.holdings_history.as_of(date)
+
+    @locked
+    def rebuild_positions(self) -> List[str]:
+        """rebuild positions of all assets from transaction history,
+        return codes of positions which were inconsistent with it"""
+
+        columns = self._portfolio.transaction_columns
+        rebuilt = {
+            code: Position(**position)
+            for code, position in columns.positions_by_code().items()
         }
 
-        self._portfolio.transactions.append(transaction)
+        positions = self._portfolio.positions
+        inconsistent = sorted(
+            code
+            for code in rebuilt.keys() | positions.keys()
+            if rebuilt.get(code) != positions.get(code)
+        )
+
+        self._portfolio.positions = rebuilt
+        for code in inconsistent:
+            self._mark_changed("positions", code)
+
+        return inconsistent
+
+    def _validate_batch(self, batch: List[Dict]) -> List[Transaction]:
+        """check every trade of batch against holdings resulting from
+        the preceding ones, return transaction records of the batch"""
+
+        current_date = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+        assets = self._portfolio.assets
+        amounts = {}
+        lots = {}
+        position = len(self._portfolio.transactions)
+        transactions = []
+
+        for i, trade in enumerate(batch):
+            try:
+                trade = dict(trade)
+                type = trade.pop("type")
+                code = trade.pop("code")
+                unit_price = trade.pop("unit_price")
+                amount = trade.pop("amount")
+                currency = trade.pop("currency")
+                date = trade.pop("date", None)
+            except (KeyError, TypeError) as e:
+                raise ValueError(f"Invalid trade {i}: missing field {e}!")
+
+            try:
+                unit_price, amount = fixed(unit_price), fixed(amount)
+            except ValueError:
+                raise ValueError(f"Invalid trade {i}: invalid input!")
+
+            if (
+                type not in ("BUY", "SELL")
+                or not isinstance(code, str)
+                or not isinstance(currency, str)
+                or not code.isalpha()
+                or not currency.isalpha()
+                or unit_price < 0
+                or amount <= 0
+            ):
+                raise ValueError(f"Invalid trade {i}: invalid input!")
+
+            if date is None:
+                date = current_date
+            else:
+                try:
+                    date = record_date(datetime.fromisoformat(str(date)))
+                except ValueError:
+                    raise ValueError(f"Invalid trade {i}: invalid date!")
+
+            held = amounts.get(code)
+            if held is None:
+                held = assets[code]["amount"] if code in assets else 0
+
+            if type == "BUY":
+                amounts[code] = held + amount
+                lots[position] = (code, amount)
+            else:
+                if amount > held:
+                    raise ValueError(
+                        f"Invalid trade {i}: not enough assets to sell!"
+                    )
+                amounts[code] = held - amount
+
+                method = trade.get("method")
+                if method is not None and method not in LOT_METHODS:
+                    raise ValueError(f"Invalid trade {i}: invalid method!")
+
+                lot = trade.get("lot")
+                if lot is not None:
+                    trade["lot"] = lot = int(lot)
+                    if lot not in lots:
+                        open_lot = self._portfolio.lots.open.get(lot)
+                        if open_lot is not None:
+                            lots[lot] = (open_lot.code, open_lot.amount)
+                    lot_code, lot_amount = lots.get(lot, (None, 0))
+                    if lot_code != code or amount > lot_amount:
+                        raise ValueError(
+                            f"Invalid trade {i}: not enough assets in lot!"
+                        )
+                    lots[lot] = (lot_code, lot_amount - amount)
+
+            transactions.append(
+                Transaction(
+                    date, type, code, unit_price, amount, currency, **trade
+                )
+            )
+            position += 1
+
+        return transactions
+
+    @locked
+    def apply_transactions(
+        self, batch: Iterable[Dict], save: bool = True
+    ) -> Dict:
+        """buy and sell assets listed in batch, trades have the fields
+        of transaction records, date is optional
+
+        The whole batch is validated before any change is made,
+        then asset amounts and currency balances are updated once
+        per code and currency, records are appended in bulk
+        and the portfolio is saved once.
+        Return number of applied transactions, time of applying them
+        and transactions per second.
+        """
+
+        start = perf_counter()
+        transactions = self._validate_batch(list(batch))
+
+        deltas, balances, last_buys = {}, {}, {}
+        for transaction in transactions:
+            code, currency = transaction.code, transaction.currency
+            value = transaction.unit_price * transaction.amount
+            if transaction.type == "BUY":
+                deltas[code] = deltas.get(code, 0) + transaction.amount
+                balances[currency] = balances.get(currency, 0) - value
+                last_buys[code] = transaction
+            else:
+                deltas[code] = deltas.get(code, 0) - transaction.amount
+                balances[currency] = balances.get(currency, 0) + value
+
+        assets = self._portfolio.assets
+        for code, delta in deltas.items():
+            amount = delta + (assets[code]["amount"] if code in assets else 0)
+            if amount == 0:
+                assets.pop(code, None)
+            elif code in last_buys:
+                # asset keeps price and currency of its last buy
+                assets[code] = Asset(
+                    unit_price=last_buys[code].unit_price,
+                    amount=amount,
+                    currency=last_buys[code].currency,
+                )
+            else:
+                assets[code]["amount"] = amount
+            self._mark_changed("assets", code)
+
+        currencies = self._portfolio.currencies
+        for currency, value in balances.items():
+            currencies[currency] = currencies.get(currency, 0) + value
+            self._mark_changed("currencies", currency)
+
+        self._portfolio.extend_transactions(transactions)
+        self._portfolio.version += 1
+        for code in deltas:
+            self._mark_changed("positions", code)
+
+        if save and transactions:
+            self._save_file_data()
+
+        seconds = perf_counter() - start
+        return {
+            "transactions": len(transactions),
+            "seconds": seconds,
+            "per_second": len(transactions) / seconds if seconds > 0 else 0.0,
+        }
+
+    def query_transactions(
+        self,
+        code: Optional[str] = None,
+        currency: Optional[str] = None,
+        type: Optional[str] = None,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+    ) -> Iterator[Transaction]:
+        """lazily yield transactions matching all given filters,
+        start and end dates are inclusive, in order of history
+
+        Transactions are looked up in the indexes of the portfolio,
+        see TransactionIndex.select.
+        """
+
+        transactions = self._portfolio.transactions
+        for position in self._portfolio.transaction_index.select(
+            None if code is None else (code,),
+            None if currency is None else (currency,),
+            None if type is None else (type,),
+            start,
+            end,
+        ):
+            yield transactions[position]
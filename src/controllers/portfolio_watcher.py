@@ -0,0 +1,150 @@
+import threading
+
+from pathlib import Path
+from typing import Dict, Optional
+
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+
+from src.controllers.portfolio_cache import PortfolioCache
+from src.controllers.storage import StorageBackend
+
+
+class PortfolioWatcher(FileSystemEventHandler):
+    """Keeps dictionary of portfolio names and paths in data_path
+    and the portfolio cache up to date with filesystem events,
+    so files changed by other processes are noticed without rescanning"""
+
+    def __init__(
+        self,
+        data_path: Path,
+        storage: StorageBackend,
+        cache: Optional[PortfolioCache] = None,
+    ) -> None:
+        super().__init__()
+        self.data_path = Path(data_path).resolve()
+        self.storage = storage
+        self.cache = cache
+        self.portfolios: Dict[str, Path] = {}
+        self._observer = None
+
+    @property
+    def running(self) -> bool:
+        return self._observer is not None and self._observer.is_alive()
+
+    def start(self) -> None:
+        """scan data_path once and start observing its events"""
+
+        if self.running:
+            return
+
+        self._observer = Observer()
+        self._observer.schedule(self, str(self.data_path), recursive=False)
+        self._observer.daemon = True
+        self._observer.start()
+
+        # scan after observer is started, so no file is missed
+        self.portfolios.update(
+            (file.stem, file)
+            for file in self.data_path.iterdir()
+            if file.name.endswith(self.storage.SUFFIX)
+        )
+
+        if self.cache is not None:
+            self.cache.watched = True
+
+    def stop(self) -> None:
+        """stop observing data_path"""
+
+        if self.cache is not None:
+            self.cache.watched = False
+
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+    def _portfolio_path(self, path: str) -> Optional[Path]:
+        """return path of portfolio which is held in the file,
+        None if file doesn't belong to any portfolio"""
+
+        path = Path(path)
+        if path.parent != self.data_path:
+            return None
+
+        if path.name.endswith(self.storage.SUFFIX):
+            return path
+
+        # file like journal or write-ahead log of portfolio
+        portfolio_path = path.with_name(path.name.split(".")[0])
+        portfolio_path = portfolio_path.with_suffix(self.storage.SUFFIX)
+        if path in self.storage.files(portfolio_path):
+            return portfolio_path
+        return None
+
+    def _added(self, path: str) -> None:
+        portfolio_path = self._portfolio_path(path)
+        if portfolio_path is None:
+            return
+
+        if portfolio_path == Path(path):
+            self.portfolios[portfolio_path.stem] = portfolio_path
+        self._modified(path)
+
+    def _removed(self, path: str) -> None:
+        portfolio_path = self._portfolio_path(path)
+        if portfolio_path is None:
+            return
+
+        if portfolio_path == Path(path):
+            self.portfolios.pop(portfolio_path.stem, None)
+            if self.cache is not None:
+                self.cache.invalidate(portfolio_path)
+        else:
+            self._modified(path)
+
+    def _modified(self, path: str) -> None:
+        portfolio_path = self._portfolio_path(path)
+        if portfolio_path is not None and self.cache is not None:
+            # writes of this process already updated the cache entry
+            self.cache.refresh(
+                portfolio_path, self.storage.version(portfolio_path)
+            )
+
+    def on_created(self, event: FileSystemEvent) -> None:
+        if not event.is_directory:
+            self._added(event.src_path)
+
+    def on_deleted(self, event: FileSystemEvent) -> None:
+        if not event.is_directory:
+            self._removed(event.src_path)
+
+    def on_modified(self, event: FileSystemEvent) -> None:
+        if not event.is_directory:
+            self._modified(event.src_path)
+
+    def on_moved(self, event: FileSystemEvent) -> None:
+        if not event.is_directory:
+            self._removed(event.src_path)
+            self._added(event.dest_path)
+
+
+_WATCHERS: Dict[Path, PortfolioWatcher] = {}
+_WATCHERS_LOCK = threading.Lock()
+
+
+def get_watcher(
+    data_path: Path,
+    storage: StorageBackend,
+    cache: Optional[PortfolioCache] = None,
+) -> PortfolioWatcher:
+    """return running watcher of data_path shared by the whole process"""
+
+    data_path = Path(data_path).resolve()
+    with _WATCHERS_LOCK:
+        watcher = _WATCHERS.get(data_path)
+        if watcher is None or not watcher.running:
+            watcher = PortfolioWatcher(data_path, storage, cache)
+            watcher.start()
+            _WATCHERS[data_path] = watcher
+        return watcher
@@ -0,0 +1,405 @@
+import json
+import os
+import sqlite3
+
+from abc import ABC, abstractmethod
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from src.controllers.journal import Journal, apply_record
+from src.models.portfolio import record_to_dict
+from src.settings import (
+    JOURNAL_CHECKPOINT_INTERVAL,
+    JOURNAL_RECORD_TRANSACTIONS,
+    JOURNALED_STORAGE,
+    STORAGE_BACKEND,
+)
+
+TRANSACTION_FIELDS = (
+    "date",
+    "type",
+    "code",
+    "unit_price",
+    "amount",
+    "currency",
+)
+
+
+def empty_portfolio_data() -> Dict:
+    """return data dictionary of portfolio without any records"""
+
+    return {
+        "assets": {},
+        "transactions": [],
+        "currencies": {},
+        "categories": {},
+    }
+
+
+class StorageBackend(ABC):
+    """Interface of portfolio storage, every portfolio is kept
+    in a single file with SUFFIX extension"""
+
+    SUFFIX = ""
+
+    @abstractmethod
+    def load(self, path: Path) -> Dict:
+        """load portfolio data dictionary from path"""
+
+    @abstractmethod
+    def write(self, path: Path, data: Dict) -> None:
+        """write whole portfolio data dictionary to path"""
+
+    @abstractmethod
+    def save(self, path: Path, data: Dict, changes: Dict) -> None:
+        """save changes of portfolio data, changes have format
+        of a journal record (see src.controllers.journal.apply_record)"""
+
+    @abstractmethod
+    def remove(self, path: Path) -> None:
+        """remove portfolio stored in path"""
+
+    def load_holdings(self, path: Path) -> Dict:
+        """load only assets and currencies of portfolio from path"""
+
+        data = self.load(path)
+        return {
+            "assets": data.get("assets", {}),
+            "currencies": data.get("currencies", {}),
+        }
+
+    def count_transactions(self, path: Path) -> int:
+        """return number of transactions of portfolio stored in path"""
+
+        return len(self.load(path).get("transactions", []))
+
+    def files(self, path: Path) -> List[Path]:
+        """return paths of all files holding portfolio stored in path"""
+
+        return [Path(path)]
+
+    def version(self, path: Path) -> Tuple:
+        """return (mtime, size) of every file holding portfolio,
+        changes whenever portfolio stored in path is modified"""
+
+        version = []
+        for file in self.files(path):
+            try:
+                stat = file.stat()
+                version.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                version.append(None)
+        return tuple(version)
+
+
+class JsonStorage(StorageBackend):
+    """Storage keeping portfolio as json file, optionally
+    with journal of changes saved after last full write"""
+
+    SUFFIX = ".json"
+
+    def __init__(
+        self,
+        journaled: bool = JOURNALED_STORAGE,
+        checkpoint_interval: int = JOURNAL_CHECKPOINT_INTERVAL,
+        record_transactions: int = JOURNAL_RECORD_TRANSACTIONS,
+    ) -> None:
+        self.journaled = journaled
+        self.checkpoint_interval = checkpoint_interval
+        self.record_transactions = record_transactions
+        self._journals = {}
+
+    def journal(self, path: Path) -> Journal:
+        """return journal of portfolio stored in path"""
+
+        path = Path(path)
+        if path not in self._journals:
+            self._journals[path] = Journal(path)
+        return self._journals[path]
+
+    def files(self, path: Path) -> List[Path]:
+        return [Path(path), self.journal(path).path]
+
+    def load(self, path: Path) -> Dict:
+        with open(path, "r") as file:
+            data = json.load(file)
+
+        # journal is replayed even if not journaled,
+        # so changes saved in the other mode are not lost
+        for record in self.journal(path).read():
+            apply_record(data, record)
+
+        return data
+
+    def write(self, path: Path, data: Dict) -> None:
+        path = Path(path)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as file:
+            file.write(json.dumps(data, default=record_to_dict))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+
+        self.journal(path).clear()
+
+    def save(self, path: Path, data: Dict, changes: Dict) -> None:
+        """append changes to the journal in journaled mode and write
+        whole data every checkpoint_interval records or instead
+        of records with more than record_transactions transactions
+        (e.g. imported statements), otherwise rewrite the whole file"""
+
+        transactions = changes.get("transactions", {}).get("items", ())
+        if not self.journaled or len(transactions) > self.record_transactions:
+            self.write(path, data)
+            return
+
+        journal = self.journal(path)
+        if changes:
+            journal.append(changes)
+
+        if journal.records >= self.checkpoint_interval:
+            self.write(path, data)
+
+    def remove(self, path: Path) -> None:
+        Path(path).unlink()
+        self.journal(path).remove()
+        del self._journals[Path(path)]
+
+
+class SqliteStorage(StorageBackend):
+    """Storage keeping portfolio as sqlite database in WAL mode
+    with assets, currencies and indexed transactions tables"""
+
+    SUFFIX = ".sqlite3"
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS assets (
+            code TEXT PRIMARY KEY,
+            unit_price INTEGER NOT NULL,
+            amount INTEGER NOT NULL,
+            currency TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS currencies (
+            currency TEXT PRIMARY KEY,
+            balance INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL,
+            type TEXT NOT NULL,
+            code TEXT NOT NULL,
+            unit_price INTEGER NOT NULL,
+            amount INTEGER NOT NULL,
+            currency TEXT NOT NULL,
+            extra TEXT
+        );
+        CREATE INDEX IF NOT EXISTS transactions_code
+            ON transactions (code);
+        CREATE INDEX IF NOT EXISTS transactions_date
+            ON transactions (date);
+        CREATE INDEX IF NOT EXISTS transactions_type
+            ON transactions (type);
+        CREATE TABLE IF NOT EXISTS sections (
+            section TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            PRIMARY KEY (section, key)
+        );
+    """
+
+    def files(self, path: Path) -> List[Path]:
+        return [Path(path), Path(f"{path}-wal")]
+
+    def _connect(self, path: Path) -> sqlite3.Connection:
+        connection = sqlite3.connect(path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(self._SCHEMA)
+        return connection
+
+    @staticmethod
+    def _transaction_row(index: int, transaction: Dict) -> tuple:
+        extra = {
+            k: v for k, v in transaction.items() if k not in TRANSACTION_FIELDS
+        }
+        try:
+            fields = [transaction[field] for field in TRANSACTION_FIELDS]
+        except KeyError as e:
+            raise ValueError(f"Transaction record without {e} field!")
+
+        return (index, *fields, json.dumps(extra) if extra else None)
+
+    @staticmethod
+    def _transaction_dict(row: tuple) -> Dict:
+        transaction = dict(zip(TRANSACTION_FIELDS, row[1:-1]))
+        if row[-1] is not None:
+            transaction.update(json.loads(row[-1]))
+        return transaction
+
+    def count_transactions(self, path: Path) -> int:
+        with closing(self._connect(path)) as connection:
+            return connection.execute(
+                "SELECT COUNT(*) FROM transactions"
+            ).fetchone()[0]
+
+    @staticmethod
+    def _read_holdings(connection: sqlite3.Connection, data: Dict) -> None:
+        for code, unit_price, amount, currency in connection.execute(
+            "SELECT code, unit_price, amount, currency FROM assets"
+        ):
+            data["assets"][code] = {
+                "unit_price": unit_price,
+                "amount": amount,
+                "currency": currency,
+            }
+
+        data["currencies"] = dict(
+            connection.execute("SELECT currency, balance FROM currencies")
+        )
+
+    def load_holdings(self, path: Path) -> Dict:
+        data = {"assets": {}, "currencies": {}}
+        with closing(self._connect(path)) as connection:
+            self._read_holdings(connection, data)
+        return data
+
+    def load(self, path: Path) -> Dict:
+        data = empty_portfolio_data()
+        with closing(self._connect(path)) as connection:
+            self._read_holdings(connection, data)
+
+            data["transactions"] = [
+                self._transaction_dict(row)
+                for row in connection.execute(
+                    "SELECT * FROM transactions ORDER BY id"
+                )
+            ]
+
+            for section, key, value in connection.execute(
+                "SELECT section, key, value FROM sections"
+            ):
+                data.setdefault(section, {})[key] = json.loads(value)
+
+        return data
+
+    def write(self, path: Path, data: Dict) -> None:
+        with closing(self._connect(path)) as connection:
+            with connection:
+                for table in ("assets", "currencies", "transactions"):
+                    connection.execute(f"DELETE FROM {table}")
+                connection.execute("DELETE FROM sections")
+
+                changes = {
+                    section: values
+                    for section, values in data.items()
+                    if isinstance(values, dict)
+                }
+                changes["transactions"] = {
+                    "from": 0,
+                    "items": data.get("transactions", []),
+                }
+                self._apply(connection, changes)
+
+    def save(self, path: Path, data: Dict, changes: Dict) -> None:
+        if not changes:
+            return
+
+        with closing(self._connect(path)) as connection:
+            with connection:
+                self._apply(connection, changes)
+
+    def _apply(self, connection: sqlite3.Connection, changes: Dict) -> None:
+        """apply journal-like record of changes to the database"""
+
+        for section, values in changes.items():
+            if section == "transactions":
+                connection.execute(
+                    "DELETE FROM transactions WHERE id >= ?",
+                    (values["from"],),
+                )
+                connection.executemany(
+                    "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        self._transaction_row(i, t)
+                        for i, t in enumerate(values["items"], values["from"])
+                    ),
+                )
+                continue
+
+            removed = [(k,) for k, v in values.items() if v is None]
+            changed = [(k, v) for k, v in values.items() if v is not None]
+
+            if section == "assets":
+                connection.executemany(
+                    "DELETE FROM assets WHERE code = ?", removed
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?)",
+                    (
+                        (k, v["unit_price"], v["amount"], v["currency"])
+                        for k, v in changed
+                    ),
+                )
+            elif section == "currencies":
+                connection.executemany(
+                    "DELETE FROM currencies WHERE currency = ?", removed
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO currencies VALUES (?, ?)",
+                    changed,
+                )
+            else:
+                connection.executemany(
+                    "DELETE FROM sections WHERE section = ? AND key = ?",
+                    ((section, k) for (k,) in removed),
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO sections VALUES (?, ?, ?)",
+                    (
+                        (section, k, json.dumps(v, default=record_to_dict))
+                        for k, v in changed
+                    ),
+                )
+
+    def remove(self, path: Path) -> None:
+        path = Path(path)
+        path.unlink()
+        for suffix in ("-wal", "-shm"):
+            Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+
+STORAGE_BACKENDS = {
+    "json": JsonStorage,
+    "sqlite": SqliteStorage,
+}
+
+
+def get_storage(name: str = STORAGE_BACKEND) -> StorageBackend:
+    """return storage backend registered under given name"""
+
+    if name not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend: {name}")
+    return STORAGE_BACKENDS[name]()
+
+
+def migrate_portfolios(
+    data_path: Path,
+    source: StorageBackend,
+    target: StorageBackend,
+    overwrite: bool = False,
+) -> List[str]:
+    """copy every portfolio in data_path from source to target storage,
+    each portfolio is written in one transaction,
+    return names of migrated portfolios"""
+
+    migrated = []
+    for path in sorted(Path(data_path).glob(f"*{source.SUFFIX}")):
+        target_path = path.with_suffix(target.SUFFIX)
+        if target_path.exists() and not overwrite:
+            continue
+
+        target.write(target_path, source.load(path))
+        migrated.append(path.stem)
+
+    return migrated
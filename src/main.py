@@ -2,11 +2,15 @@ import streamlit as st
 
 from src.controllers.portfolio_controller import PortfolioController
 from src.controllers.file_handler import FileHandler
+from src.controllers.portfolio_cache import PORTFOLIO_CACHE
+from src.controllers.portfolio_watcher import get_watcher
+from src.controllers.storage import get_storage
 from src.views.portfolio_menu import display_portfolio_page
 from src.views.file_operations import (
     display_create_portfolio,
     display_upload_portfolio,
 )
+from src.settings import PORTFOLIO_SEARCH_LIMIT, WATCH_DATA_PATH
 
 _DATA_PATH = "data/portfolios"
 
@@ -20,11 +24,16 @@ def load_main_page():
         initial_sidebar_state="auto",
     )
 
-    portfolio_handler = FileHandler(_DATA_PATH)
+    storage = get_storage()
+    portfolio_handler = FileHandler(_DATA_PATH, storage=storage)
     if not portfolio_handler.data_path.exists():
         portfolio_handler.create_data_dir()
 
-    portfolio_handler.load_portfolios()
+    if WATCH_DATA_PATH:
+        watcher = get_watcher(_DATA_PATH, storage, PORTFOLIO_CACHE)
+        portfolio_handler.portfolios = watcher.portfolios
+    else:
+        portfolio_handler.load_portfolios()
 
     if len(portfolio_handler.portfolios) == 0:
         st.warning(
@@ -34,13 +43,38 @@ def load_main_page():
         display_create_portfolio(file_handler=portfolio_handler)
         display_upload_portfolio(file_handler=portfolio_handler)
     else:
-        portfolios = portfolio_handler.portfolios
+        query = st.sidebar.text_input(label="Search portfolios")
+        options = portfolio_handler.search_portfolios(
+            query, PORTFOLIO_SEARCH_LIMIT
+        )
+        if len(options) == 0:
+            st.sidebar.warning("No portfolio matches the search.")
+            return
+
         chosen_portfolio_name = st.sidebar.selectbox(
-            label="""Select a portfolio to open""", options=portfolios.keys()
+            label="""Select a portfolio to open""", options=options
+        )
+
+        p_path = portfolio_handler.get_portfolio_path(chosen_portfolio_name)
+        portfolio = PortfolioController(
+            p_path,
+            chosen_portfolio_name,
+            storage=storage,
+            cache=PORTFOLIO_CACHE,
+        )
+
+        portfolio_handler.update_portfolio_summary(
+            chosen_portfolio_name, len(portfolio.portfolio_transactions)
+        )
+        summary = portfolio_handler.get_portfolio_summary(
+            chosen_portfolio_name
         )
+        if summary is not None:
+            st.sidebar.caption(
+                f"{summary['transactions']} transactions, "
+                + f"modified {summary['last_modified']}"
+            )
 
-        p_path = portfolios[chosen_portfolio_name]
-        portfolio = PortfolioController(p_path, chosen_portfolio_name)
         display_portfolio_page(portfolio, portfolio_handler)
 
 
@@ -0,0 +1,43 @@
+"""Migrate portfolios between storage backends
+
+usage: python -m src.migrate [--source json] [--target sqlite] [data_path]
+"""
+
+import argparse
+
+from src.controllers.storage import (
+    STORAGE_BACKENDS,
+    get_storage,
+    migrate_portfolios,
+)
+from src.settings import DATA_PATH
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Copy portfolios to another storage backend"
+    )
+    parser.add_argument("data_path", nargs="?", default=DATA_PATH)
+    parser.add_argument("--source", choices=STORAGE_BACKENDS, default="json")
+    parser.add_argument("--target", choices=STORAGE_BACKENDS, default="sqlite")
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="replace portfolios already existing in target storage",
+    )
+    args = parser.parse_args()
+
+    migrated = migrate_portfolios(
+        args.data_path,
+        get_storage(args.source),
+        get_storage(args.target),
+        overwrite=args.overwrite,
+    )
+
+    for name in migrated:
+        print(f"migrated {name}")
+    print(f"{len(migrated)} portfolios migrated")
+
+
+if __name__ == "__main__":
+    main()
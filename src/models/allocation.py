@@ -0,0 +1,210 @@
+import numpy as np
+
+from typing import Dict, List, Optional, Tuple
+
+from src.models.fx_rates import FxRates
+from src.models.portfolio import Asset
+
+# category of assets without category in a dimension
+UNCATEGORIZED = "Uncategorized"
+
+
+class CategoryAllocation:
+    """Value of assets (unit price * amount) per category
+    of every dimension (e.g. asset class, sector or region)
+
+    Values are kept per currency and updated incrementally, one asset
+    at a time, whenever the asset or its categories change.
+    """
+
+    def __init__(
+        self, assets: Dict[str, Asset], categories: Dict[str, Dict]
+    ) -> None:
+        self.values: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self.totals: Dict[str, int] = {}
+        self._entries: Dict[str, Tuple[int, str, Dict[str, str]]] = {}
+        for code, asset in assets.items():
+            self.update(code, asset, categories.get(code))
+
+    @property
+    def dimensions(self) -> List[str]:
+        return sorted(self.values)
+
+    def update(
+        self,
+        code: str,
+        asset: Optional[Asset],
+        categories: Optional[Dict[str, str]],
+    ) -> None:
+        """replace value of asset with its current one,
+        asset is None if it was removed"""
+
+        entry = self._entries.pop(code, None)
+        if entry is not None:
+            self._add(*entry, -1)
+
+        if asset is not None:
+            entry = (
+                asset.unit_price * asset.amount,
+                asset.currency,
+                dict(categories or {}),
+            )
+            self._entries[code] = entry
+            self._add(*entry, 1)
+
+    def _add(
+        self, value: int, currency: str, categories: Dict, sign: int
+    ) -> None:
+        _add_value(self.totals, currency, sign * value)
+        for dimension, category in categories.items():
+            values = self.values.setdefault(dimension, {})
+            currencies = values.setdefault(category, {})
+            _add_value(currencies, currency, sign * value)
+            if not currencies:
+                del values[category]
+            if not values:
+                del self.values[dimension]
+
+    def by_category(
+        self,
+        dimension: str,
+        base: Optional[str] = None,
+        fx_rates: Optional[FxRates] = None,
+    ) -> Dict[str, int]:
+        """return value of assets in every category of dimension and of
+        uncategorized ones, converted to base currency if it's given
+        with exchange rates, otherwise currencies are assumed equal"""
+
+        def convert(values: Dict[str, int]) -> int:
+            if base is None or fx_rates is None:
+                return sum(values.values())
+            return round(
+                sum(
+                    value * fx_rates.rate(currency, base)
+                    for currency, value in values.items()
+                )
+            )
+
+        allocation = {
+            category: convert(values)
+            for category, values in self.values.get(dimension, {}).items()
+        }
+        uncategorized = convert(self.totals) - sum(allocation.values())
+        if uncategorized != 0:
+            allocation[UNCATEGORIZED] = uncategorized
+        return allocation
+
+
+def _add_value(values: Dict[str, int], key: str, value: int) -> None:
+    """add value to values[key], removing the key when it becomes 0"""
+
+    total = values.get(key, 0) + value
+    if total == 0:
+        values.pop(key, None)
+    else:
+        values[key] = total
+
+
+def rebalance(
+    assets: Dict[str, Asset],
+    categories: Dict[str, Dict],
+    dimension: str,
+    targets: Dict[str, float],
+    base: Optional[str] = None,
+    fx_rates: Optional[FxRates] = None,
+    cash: int = 0,
+) -> Dict:
+    """return trades moving values of categories of dimension
+    to target weights of their total with cash added (in base currency)
+
+    Only the difference of every category from its target is traded,
+    which is the least value traded to reach the targets. Categories
+    above target sell their largest holdings first, so each needs as
+    few sells as possible. Categories below target buy more of their
+    largest holding. Uncategorized assets are not traded. Values which
+    can't be bought, as no asset of the category is held, are returned
+    as unallocated.
+    """
+
+    names = sorted(
+        set(targets)
+        | {
+            categories[code][dimension]
+            for code in assets
+            if dimension in categories.get(code, {})
+        }
+    )
+    ids = {name: i for i, name in enumerate(names)}
+    codes = [code for code in assets if dimension in categories.get(code, {})]
+
+    category_ids = np.array(
+        [ids[categories[code][dimension]] for code in codes], dtype=np.int64
+    )
+    amounts = np.array([assets[code].amount for code in codes], np.int64)
+    rates = np.array(
+        [
+            1.0
+            if base is None or fx_rates is None
+            else fx_rates.rate(assets[code].currency, base)
+            for code in codes
+        ]
+    )
+    prices = (
+        np.array([assets[code].unit_price for code in codes], np.float64)
+        * rates
+    )
+    values = prices * amounts
+
+    held = np.bincount(category_ids, values, len(names))
+    weights = np.array([targets.get(name, 0.0) for name in names])
+    deltas = weights * (held.sum() + cash) - held
+
+    # holdings sorted by category and from the largest value
+    order = np.lexsort((-values, category_ids))
+    sorted_ids = category_ids[order]
+    sorted_values = values[order]
+    firsts = np.ones(len(order), dtype=bool)
+    firsts[1:] = sorted_ids[1:] != sorted_ids[:-1]
+
+    # value of larger holdings of the same category before every one
+    before = np.cumsum(sorted_values) - sorted_values
+    group_starts = np.maximum.accumulate(np.where(firsts, before, 0))
+    before -= group_starts
+
+    need = -deltas[sorted_ids]
+    sold = np.clip(np.minimum(sorted_values, need - before), 0, None)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sells = np.where(
+            prices[order] > 0, np.rint(sold / prices[order]), 0
+        ).astype(np.int64)
+        sells = np.minimum(sells, amounts[order])
+        bought = np.where(firsts, np.clip(deltas[sorted_ids], 0, None), 0)
+        buys = np.where(
+            prices[order] > 0, np.floor(bought / prices[order]), 0
+        ).astype(np.int64)
+
+    trades = []
+    for position in np.flatnonzero((sells > 0) | (buys > 0)):
+        code = codes[order[position]]
+        asset = assets[code]
+        sell, buy = int(sells[position]), int(buys[position])
+        trades.append(
+            {
+                "type": "SELL" if sell > 0 else "BUY",
+                "code": code,
+                "unit_price": asset.unit_price,
+                "amount": sell if sell > 0 else buy,
+                "currency": asset.currency,
+            }
+        )
+
+    # sells first, so their proceeds pay for the buys
+    trades.sort(key=lambda trade: trade["type"] != "SELL")
+
+    present = np.bincount(category_ids, minlength=len(names)) > 0
+    unallocated = {
+        name: round(deltas[i])
+        for i, name in enumerate(names)
+        if not present[i] and deltas[i] > 0
+    }
+    return {"trades": trades, "unallocated": unallocated}
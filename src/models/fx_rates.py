@@ -0,0 +1,186 @@
+import csv
+import json
+
+import numpy as np
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.models.transaction_index import DateLike
+
+FxRow = Tuple[str, str, str, float]
+
+
+def day_number(date: DateLike) -> int:
+    """return date as number of days since epoch"""
+
+    return int(np.datetime64(str(date)[:10], "D").astype(np.int64))
+
+
+class FxRates:
+    """Historical exchange rates of currency pairs
+
+    Every row holds date, base and quote currency and rate,
+    i.e. price of one unit of base in quote currency. Rate at a date
+    is the last rate known on that day. Pairs without rates are
+    converted through their inverse or through a common currency.
+    """
+
+    def __init__(self, rows: Iterable[FxRow] = (), version=None) -> None:
+        pairs: Dict[Tuple[str, str], List[Tuple[int, float]]] = {}
+        for date, base, quote, rate in rows:
+            rate = float(rate)
+            if rate <= 0:
+                raise ValueError(f"Invalid rate of {base}/{quote}: {rate}!")
+            pairs.setdefault((base.upper(), quote.upper()), []).append(
+                (day_number(date), rate)
+            )
+
+        self._pairs: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {}
+        for pair, values in pairs.items():
+            values.sort()
+            days, rates = zip(*values)
+            self._pairs[pair] = (
+                np.array(days, dtype=np.int64),
+                np.array(rates, dtype=np.float64),
+            )
+
+        self.currencies = sorted({c for pair in self._pairs for c in pair})
+        self.version = version
+        self._cache: Dict[Tuple[str, str, Optional[int]], float] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "FxRates":
+        """load rates from csv file with date, base, quote and rate
+        columns or from json file with list of such objects"""
+
+        path = Path(path)
+        stat = path.stat()
+        with open(path, "r", encoding="utf-8-sig", newline="") as file:
+            if path.suffix.lower() == ".json":
+                records = json.load(file)
+            else:
+                records = csv.DictReader(file)
+            try:
+                rows = [
+                    (r["date"], r["base"], r["quote"], r["rate"])
+                    for r in records
+                ]
+            except (KeyError, TypeError) as e:
+                raise ValueError(f"Invalid exchange rates file: {e}!")
+
+        return cls(rows, version=(stat.st_mtime_ns, stat.st_size))
+
+    def _pair_rate(
+        self, base: str, quote: str, day: Optional[int]
+    ) -> Optional[float]:
+        """return rate of pair or of its inverse, None if not known"""
+
+        for pair, inverse in (((base, quote), False), ((quote, base), True)):
+            if pair not in self._pairs:
+                continue
+
+            days, rates = self._pairs[pair]
+            i = (
+                len(days)
+                if day is None
+                else np.searchsorted(days, day, "right")
+            )
+            if i == 0:
+                continue
+            rate = float(rates[i - 1])
+            return 1 / rate if inverse else rate
+        return None
+
+    def rate(
+        self, base: str, quote: str, date: Optional[DateLike] = None
+    ) -> float:
+        """return price of one unit of base in quote currency at date
+        (latest known rate if date is None)"""
+
+        base, quote = base.upper(), quote.upper()
+        if base == quote:
+            return 1.0
+
+        day = None if date is None else day_number(date)
+        key = (base, quote, day)
+        if key in self._cache:
+            return self._cache[key]
+
+        rate = self._pair_rate(base, quote, day)
+        if rate is None:
+            for currency in self.currencies:
+                first = self._pair_rate(base, currency, day)
+                second = self._pair_rate(currency, quote, day)
+                if first is not None and second is not None:
+                    rate = first * second
+                    break
+            else:
+                raise ValueError(f"No exchange rate of {base}/{quote}!")
+
+        self._cache[key] = rate
+        return rate
+
+    def _pair_series(
+        self, base: str, quote: str, days: np.ndarray
+    ) -> Optional[np.ndarray]:
+        """return rates of pair or of its inverse at days,
+        None if pair is not known"""
+
+        for pair, inverse in (((base, quote), False), ((quote, base), True)):
+            if pair not in self._pairs:
+                continue
+
+            pair_days, rates = self._pairs[pair]
+            i = np.searchsorted(pair_days, days, "right")
+            series = rates[np.maximum(i - 1, 0)]
+            return 1 / series if inverse else series
+        return None
+
+    def rate_series(
+        self, base: str, quote: str, days: np.ndarray
+    ) -> np.ndarray:
+        """return prices of one unit of base in quote currency at days
+        given as numbers of days since epoch, the earliest known rate
+        is used for days before it"""
+
+        base, quote = base.upper(), quote.upper()
+        if base == quote:
+            return np.ones(len(days))
+
+        series = self._pair_series(base, quote, days)
+        if series is None:
+            for currency in self.currencies:
+                first = self._pair_series(base, currency, days)
+                second = self._pair_series(currency, quote, days)
+                if first is not None and second is not None:
+                    return first * second
+            raise ValueError(f"No exchange rate of {base}/{quote}!")
+        return series
+
+    def rates(
+        self,
+        currencies: Iterable[str],
+        quote: str,
+        date: Optional[DateLike] = None,
+    ) -> np.ndarray:
+        """return array of rates of currencies in quote currency"""
+
+        return np.array(
+            [self.rate(currency, quote, date) for currency in currencies],
+            dtype=np.float64,
+        )
+
+
+_LOADED: Dict[Path, FxRates] = {}
+
+
+def get_fx_rates(path: Path) -> FxRates:
+    """return rates loaded from path, loaded again if file changed"""
+
+    path = Path(path)
+    stat = path.stat()
+    rates = _LOADED.get(path)
+    if rates is None or rates.version != (stat.st_mtime_ns, stat.st_size):
+        rates = _LOADED[path] = FxRates.load(path)
+    return rates
@@ -0,0 +1,202 @@
+import numpy as np
+
+from typing import Dict, Optional, Tuple
+
+from src.models.money_kernels import checked_multiply
+from src.models.portfolio import Asset
+from src.models.transaction_columns import TransactionColumns
+from src.models.transaction_index import DateLike, date_key
+
+
+class HoldingsHistory:
+    """Holdings implied by the transaction history at any point in time
+
+    Transactions are ordered by date and every interval-th of them
+    a checkpoint with amounts of assets, balances of currencies
+    and last trade of every asset is kept. Holdings at a date are
+    the last checkpoint before it plus sums of at most interval
+    transactions after the checkpoint.
+
+    Rows of checkpoints are indexed by ids of codes and currencies
+    of the columns and are shorter if symbols were added later.
+    """
+
+    def __init__(self, columns: TransactionColumns, interval: int) -> None:
+        if interval <= 0:
+            raise ValueError("Checkpoint interval has to be positive!")
+
+        self.columns = columns
+        self.interval = interval
+        self._build()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _build(self) -> None:
+        """create checkpoints of whole history in one vectorized pass"""
+
+        columns = self.columns
+        dates = columns.dates
+        self._size = len(columns)
+
+        # positions in date order, None when history is chronological
+        self._order = None
+        self._sorted_dates = dates
+        if np.any(dates[1:] < dates[:-1]):
+            self._order = np.argsort(dates, kind="stable")
+            self._sorted_dates = dates[self._order]
+
+        self._assets = [np.zeros(0, dtype=np.int64)]
+        self._cash = [np.zeros(0, dtype=np.int64)]
+        self._last = [np.zeros(0, dtype=np.int64)]
+
+        checkpoints = self._size // self.interval
+        if checkpoints == 0:
+            return
+
+        end = checkpoints * self.interval
+        positions, amounts, cash, last = self._deltas(0, end)
+        chunks = np.arange(end) // self.interval
+
+        for rows, keys, values, shape in (
+            (self._assets, columns.code_ids, amounts, len(columns.codes.ids)),
+            (
+                self._cash,
+                columns.currency_ids,
+                cash,
+                len(columns.currencies.ids),
+            ),
+        ):
+            matrix = np.zeros((checkpoints, shape), dtype=np.int64)
+            np.add.at(matrix, (chunks, keys[positions]), values)
+            rows.extend(np.cumsum(matrix, axis=0))
+
+        matrix = np.full(
+            (checkpoints, len(columns.codes.ids)), -1, dtype=np.int64
+        )
+        np.maximum.at(matrix, (chunks, columns.code_ids[positions]), last)
+        self._last.extend(np.maximum.accumulate(matrix, axis=0))
+
+    def _positions(self, start: int, end: int) -> np.ndarray:
+        """return positions of transactions from start to end in date order"""
+
+        if self._order is None:
+            return np.arange(start, end)
+        return self._order[start:end]
+
+    def _deltas(
+        self, start: int, end: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """return positions of transactions from start to end in date
+        order, changes of asset amounts and currency balances made
+        by them, and their indexes in date order (-1 if not a trade)"""
+
+        columns = self.columns
+        positions = self._positions(start, end)
+        type_ids = columns.type_ids[positions]
+        signs = (type_ids == columns.BUY).astype(np.int64) - (
+            type_ids == columns.SELL
+        )
+        amounts = signs * columns.amounts[positions]
+        cash = -checked_multiply(amounts, columns.unit_prices[positions])
+        last = np.where(signs != 0, np.arange(start, end), -1)
+        return positions, amounts, cash, last
+
+    def extend(self) -> None:
+        """add checkpoints for transactions appended to the columns,
+        rebuild them if appended transactions are not chronological"""
+
+        columns = self.columns
+        size = len(columns)
+        if size <= self._size:
+            if size < self._size:
+                self._build()
+            return
+
+        dates = columns.dates
+        if (
+            self._order is not None
+            or (self._size > 0 and dates[self._size] < dates[self._size - 1])
+            or np.any(dates[self._size + 1 :] < dates[self._size : -1])
+        ):
+            self._build()
+            return
+
+        self._sorted_dates = dates
+        while len(self._assets) * self.interval <= size:
+            start = (len(self._assets) - 1) * self.interval
+            assets, cash, last = self._tail(
+                len(self._assets) - 1, start + self.interval
+            )
+            self._assets.append(assets)
+            self._cash.append(cash)
+            self._last.append(last)
+        self._size = size
+
+    def _tail(
+        self, checkpoint: int, end: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """return holdings and last trades after end transactions
+        (in date order) computed from the checkpoint and transactions
+        after it"""
+
+        columns = self.columns
+        positions, amounts, cash, last = self._deltas(
+            checkpoint * self.interval, end
+        )
+
+        result = []
+        for rows, keys, values, size in (
+            (self._assets, columns.code_ids, amounts, len(columns.codes.ids)),
+            (
+                self._cash,
+                columns.currency_ids,
+                cash,
+                len(columns.currencies.ids),
+            ),
+        ):
+            row = np.zeros(size, dtype=np.int64)
+            row[: len(rows[checkpoint])] = rows[checkpoint]
+            ids, sums = TransactionColumns.sum_by(keys[positions], values)
+            row[ids] += sums
+            result.append(row)
+
+        row = np.full(len(columns.codes.ids), -1, dtype=np.int64)
+        row[: len(self._last[checkpoint])] = self._last[checkpoint]
+        np.maximum.at(row, columns.code_ids[positions], last)
+        result.append(row)
+
+        return tuple(result)
+
+    def count(self, date: Optional[DateLike] = None) -> int:
+        """return number of transactions made until date (inclusive)"""
+
+        if date is None:
+            return self._size
+
+        key = np.datetime64(date_key(date, upper=True), "s").astype(np.int64)
+        return int(np.searchsorted(self._sorted_dates, key, side="right"))
+
+    def as_of(self, date: Optional[DateLike] = None) -> Dict:
+        """return assets and currency balances held after transactions
+        made until date (inclusive), unit price of an asset is the price
+        of its last trade"""
+
+        end = self.count(date)
+        assets, cash, last = self._tail(end // self.interval, end)
+
+        columns = self.columns
+        codes, currencies = columns.codes.names, columns.currencies.names
+        holdings = {"assets": {}, "currencies": {}}
+        for code_id in np.flatnonzero(assets):
+            position = self._positions(last[code_id], last[code_id] + 1)[0]
+            holdings["assets"][codes[code_id]] = Asset(
+                unit_price=int(columns.unit_prices[position]),
+                amount=int(assets[code_id]),
+                currency=currencies[columns.currency_ids[position]],
+            )
+        for currency_id in np.flatnonzero(cash):
+            holdings["currencies"][currencies[currency_id]] = int(
+                cash[currency_id]
+            )
+        return holdings
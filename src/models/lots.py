@@ -0,0 +1,184 @@
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional
+
+from src.models.portfolio import Record, Transaction
+
+LOT_METHODS = ("FIFO", "LIFO")
+
+
+class Lot(Record):
+    """Open lot of an asset created by a buy transaction,
+    id of the lot is the position of the transaction in history"""
+
+    __slots__ = ("id", "code", "date", "unit_price", "amount", "currency")
+    FIELDS = __slots__
+
+    def __init__(
+        self,
+        id: int,
+        code: str,
+        date: str,
+        unit_price: int,
+        amount: int,
+        currency: str,
+    ) -> None:
+        self.id = id
+        self.code = code
+        self.date = date
+        self.unit_price = unit_price
+        self.amount = amount
+        self.currency = currency
+        self._extra = None
+
+
+class RealizedGain(Record):
+    """Slice of a sell transaction matched with one lot,
+    lot is None for amount sold without any open lot"""
+
+    __slots__ = ("sell", "lot", "code", "date", "amount", "cost", "proceeds")
+    FIELDS = __slots__
+
+    def __init__(
+        self,
+        sell: int,
+        lot: Optional[int],
+        code: str,
+        date: str,
+        amount: int,
+        cost: int,
+        proceeds: int,
+    ) -> None:
+        self.sell = sell
+        self.lot = lot
+        self.code = code
+        self.date = date
+        self.amount = amount
+        self.cost = cost
+        self.proceeds = proceeds
+        self._extra = None
+
+    @property
+    def gain(self) -> int:
+        return self.proceeds - self.cost
+
+
+class LotEngine:
+    """Open lots of every asset and realized gains of matched sells
+
+    Lots of an asset are kept in a deque in order of buying, so FIFO
+    and LIFO sells take lots from its ends. Lots sold as specific
+    lots are only marked as closed (amount 0) and dropped when they
+    reach an end of the deque, keeping every match amortized O(1).
+
+    Sell transactions are matched with the lot given in their "lot"
+    field, then with the method given in their "method" field,
+    or with the default method of the engine.
+    """
+
+    def __init__(self, transactions: Iterable = (), method: str = "FIFO"):
+        if method not in LOT_METHODS:
+            raise ValueError(f"Unknown lot matching method: {method}!")
+
+        self.method = method
+        self.lots: Dict[str, Deque[Lot]] = {}
+        self.open: Dict[int, Lot] = {}
+        self.gains: List[RealizedGain] = []
+        self._size = 0
+        self.extend(transactions)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def open_lots(self, code: str) -> List[Lot]:
+        """return open lots of asset in order of buying"""
+
+        return [lot for lot in self.lots.get(code, ()) if lot.amount > 0]
+
+    def append(self, transaction) -> None:
+        """apply transaction at the next position of history"""
+
+        self.extend((transaction,))
+
+    def extend(self, transactions: Iterable) -> None:
+        """replay transactions in order of history"""
+
+        lots, open_lots, sell = self.lots, self.open, self._sell
+        position = self._size
+        for transaction in map(Transaction.from_dict, transactions):
+            if transaction.type == "BUY":
+                lot = Lot(
+                    position,
+                    transaction.code,
+                    transaction.date,
+                    transaction.unit_price,
+                    transaction.amount,
+                    transaction.currency,
+                )
+                code_lots = lots.get(lot.code)
+                if code_lots is None:
+                    code_lots = lots[lot.code] = deque()
+                code_lots.append(lot)
+                open_lots[position] = lot
+            elif transaction.type == "SELL":
+                sell(position, transaction)
+            position += 1
+            self._size = position
+
+    def _sell(self, position: int, transaction: Transaction) -> None:
+        code = transaction.code
+        remaining = transaction.amount
+        lots = self.lots.get(code) or deque()
+        extra = transaction._extra or {}
+
+        lot_id = extra.get("lot")
+        if lot_id is not None:
+            lot = self.open.get(int(lot_id))
+            if lot is not None and lot.code == code:
+                remaining = self._match(position, transaction, lot, remaining)
+
+        method = extra.get("method") or self.method
+        take = lots.popleft if method == "FIFO" else lots.pop
+        end = 0 if method == "FIFO" else -1
+
+        while remaining > 0 and lots:
+            lot = lots[end]
+            if lot.amount > 0:
+                remaining = self._match(position, transaction, lot, remaining)
+            if lot.amount == 0:
+                take()
+
+        if remaining > 0:
+            self.gains.append(
+                RealizedGain(
+                    position,
+                    None,
+                    code,
+                    transaction.date,
+                    remaining,
+                    0,
+                    transaction.unit_price * remaining,
+                )
+            )
+
+    def _match(
+        self, position: int, transaction: Transaction, lot: Lot, amount: int
+    ) -> int:
+        """sell amount of asset from the lot, return amount left to sell"""
+
+        matched = min(amount, lot.amount)
+        lot.amount -= matched
+        if lot.amount == 0:
+            del self.open[lot.id]
+
+        self.gains.append(
+            RealizedGain(
+                position,
+                lot.id,
+                lot.code,
+                transaction.date,
+                matched,
+                lot.unit_price * matched,
+                transaction.unit_price * matched,
+            )
+        )
+        return amount - matched
@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+
+from typing import Dict
+
+# series of values are daily, including days without trading
+PERIODS_PER_YEAR = 365
+
+# bounds of annual rates searched for internal rate of return
+_XIRR_BOUNDS = (-0.9999, 1e6)
+
+
+def daily_returns(values: np.ndarray, flows: np.ndarray) -> np.ndarray:
+    """return daily returns of values (day x series) excluding flows
+    made on the day, flows are assumed to be made at close prices at
+    the end of the day, or at its start if nothing was held before,
+    return is 0 on days with nothing invested"""
+
+    values = np.asarray(values, dtype=np.float64)
+    flows = np.asarray(flows, dtype=np.float64)
+    previous = np.zeros_like(values)
+    previous[1:] = values[:-1]
+
+    invested = np.where(previous > 0, previous, np.clip(flows, 0, None))
+    gain = values - previous - flows
+    returns = np.zeros_like(values)
+    np.divide(gain, invested, out=returns, where=invested > 0)
+    return returns
+
+
+def time_weighted_return(returns: np.ndarray) -> np.ndarray:
+    """return total time-weighted return of daily returns"""
+
+    return np.prod(1 + np.asarray(returns), axis=0) - 1
+
+
+def max_drawdown(returns: np.ndarray) -> np.ndarray:
+    """return largest relative fall of value from its previous peak,
+    computed from daily returns (as negative number)"""
+
+    wealth = np.cumprod(1 + np.asarray(returns), axis=0)
+    peaks = np.maximum.accumulate(np.maximum(wealth, 1), axis=0)
+    if len(wealth) == 0:
+        return np.zeros(wealth.shape[1:])
+    return np.min(wealth / peaks - 1, axis=0)
+
+
+def volatility(
+    returns: np.ndarray, periods: int = PERIODS_PER_YEAR
+) -> np.ndarray:
+    """return annualized standard deviation of daily returns"""
+
+    returns = np.asarray(returns)
+    if len(returns) < 2:
+        return np.zeros(returns.shape[1:])
+    return np.std(returns, axis=0, ddof=1) * np.sqrt(periods)
+
+
+def rolling_volatility(
+    returns: pd.Series, window: int, periods: int = PERIODS_PER_YEAR
+) -> pd.Series:
+    """return annualized volatility of returns in rolling window of days"""
+
+    return returns.rolling(window).std() * np.sqrt(periods)
+
+
+def sharpe_ratio(
+    returns: np.ndarray,
+    risk_free: float = 0.0,
+    periods: int = PERIODS_PER_YEAR,
+) -> np.ndarray:
+    """return annualized Sharpe ratio of daily returns with annual
+    risk free rate, NaN for returns without volatility"""
+
+    returns = np.asarray(returns)
+    excess = returns - ((1 + risk_free) ** (1 / periods) - 1)
+    deviation = volatility(returns, periods)
+    mean = np.mean(excess, axis=0) * periods if len(returns) else 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(deviation > 0, mean / deviation, np.nan)
+
+
+def xirr(
+    flows: np.ndarray,
+    days: np.ndarray,
+    tolerance: float = 1e-10,
+    iterations: int = 50,
+) -> np.ndarray:
+    """return annual internal rates of return of cash flows (day x series)
+    paid on days given in days since the first one, solved for all
+    series at once, NaN for flows without both signs
+
+    Flows are kept as a sparse list of nonzero payments, so sums of
+    all series take one pass over them. Newton's method is run on all
+    series, the ones it does not converge for are solved by bisection
+    of the bounded rate range.
+    """
+
+    flows = np.asarray(flows, dtype=np.float64)
+    if flows.ndim == 1:
+        return xirr(flows[:, None], days, tolerance, iterations)[0]
+
+    solvable = (flows > 0).any(axis=0) & (flows < 0).any(axis=0)
+    flows = flows[:, solvable]
+    count = flows.shape[1]
+    rows, series = np.nonzero(flows)
+    payments = flows[rows, series]
+    years = np.asarray(days, dtype=np.float64)[rows] / 365.0
+    scale = np.bincount(series, np.abs(payments), count)
+
+    # rates are solved as log(1 + rate), in which NPV is smoother
+    low, high = np.log1p(_XIRR_BOUNDS)
+
+    def npv(logs: np.ndarray, series=series, payments=payments, years=years):
+        discounted = payments * np.exp(-years * logs[series])
+        return np.bincount(series, discounted, len(logs))
+
+    logs = np.zeros(count)
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        for _ in range(iterations):
+            discounted = payments * np.exp(-years * logs[series])
+            value = np.bincount(series, discounted, count)
+            slope = -np.bincount(series, years * discounted, count)
+            step = np.nan_to_num(np.clip(value / slope, -1, 1))
+            logs = np.clip(logs - step, low, high)
+            if not np.any(np.abs(step) > tolerance):
+                break
+        failed = ~(np.abs(npv(logs)) <= tolerance * scale)
+
+        # bisection keeps the root between bounds with NPV of both signs
+        if failed.any():
+            ids = np.flatnonzero(failed)
+            keep = failed[series]
+            remap = np.cumsum(failed) - 1
+            args = (remap[series[keep]], payments[keep], years[keep])
+            lower = np.full(len(ids), low)
+            upper = np.full(len(ids), high)
+            lower_value = npv(lower, *args)
+            for _ in range(60):
+                middle = (lower + upper) / 2
+                middle_value = npv(middle, *args)
+                same = np.sign(middle_value) == np.sign(lower_value)
+                lower = np.where(same, middle, lower)
+                lower_value = np.where(same, middle_value, lower_value)
+                upper = np.where(same, upper, middle)
+            logs[ids] = (lower + upper) / 2
+
+    rates = np.expm1(logs)
+    result = np.full(solvable.shape, np.nan)
+    result[solvable] = rates
+    return result
+
+
+def performance(
+    values: pd.DataFrame,
+    flows: pd.DataFrame,
+    risk_free: float = 0.0,
+    window: int = 30,
+) -> Dict:
+    """return performance metrics of daily values and flows
+    of every column and of their total
+
+    Money-weighted return treats flows as paid by the investor and
+    the last value as received at the end of the series.
+    """
+
+    columns = list(values.columns)
+    value_matrix = np.column_stack(
+        [values.to_numpy(dtype=np.float64), values.sum(axis=1).to_numpy()]
+    )
+    flow_matrix = np.column_stack(
+        [flows.to_numpy(dtype=np.float64), flows.sum(axis=1).to_numpy()]
+    )
+
+    returns = daily_returns(value_matrix, flow_matrix)
+    cash_flows = -flow_matrix
+    if len(cash_flows):
+        cash_flows[-1] += value_matrix[-1]
+    days = (values.index - values.index[0]).days if len(values) else []
+
+    metrics = pd.DataFrame(
+        {
+            "twr": time_weighted_return(returns),
+            "xirr": xirr(cash_flows, np.asarray(days)),
+            "max_drawdown": max_drawdown(returns),
+            "volatility": volatility(returns),
+            "sharpe": sharpe_ratio(returns, risk_free),
+        },
+        index=columns + ["total"],
+    )
+
+    total_returns = pd.Series(returns[:, -1], index=values.index)
+    return {
+        "assets": metrics.iloc[:-1],
+        "total": metrics.iloc[-1].to_dict(),
+        "rolling_volatility": rolling_volatility(total_returns, window),
+    }
@@ -0,0 +1,148 @@
+from decimal import ROUND_HALF_EVEN, Decimal, InvalidOperation
+from functools import total_ordering
+from typing import Any, Union
+
+from src.settings import MAX_DECIMAL
+
+# number of fixed-point units in one unit of currency
+SCALE = 10**MAX_DECIMAL
+
+_QUANTUM = Decimal(1).scaleb(-MAX_DECIMAL)
+
+
+def to_fixed(value: Union[str, int, float, Decimal]) -> int:
+    """convert decimal number to fixed-point units, rounding
+    half to even to MAX_DECIMAL places
+
+    Floats are converted through their shortest representation,
+    so 0.1 becomes exactly 0.1 and not the nearest binary fraction.
+    """
+
+    if isinstance(value, float):
+        value = repr(float(value))
+    try:
+        value = Decimal(value)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f"Invalid decimal number: {value}!")
+    if not value.is_finite():
+        raise ValueError(f"Invalid decimal number: {value}!")
+
+    return int(
+        value.quantize(_QUANTUM, rounding=ROUND_HALF_EVEN).scaleb(MAX_DECIMAL)
+    )
+
+
+def from_fixed(units: int) -> Decimal:
+    """convert fixed-point units to exact decimal number"""
+
+    return Decimal(int(units)).scaleb(-MAX_DECIMAL)
+
+
+def format_money(units: int) -> str:
+    """return fixed-point units as decimal number without
+    trailing zeros, e.g. 1.5 for 150000000 units"""
+
+    text = f"{from_fixed(units):f}"
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return text
+
+
+def fixed(value: Any) -> int:
+    """return value which should hold fixed-point units as int,
+    floats and decimals are accepted only without fraction"""
+
+    if isinstance(value, Money):
+        return value.units
+    if isinstance(value, bool):
+        raise ValueError("Invalid fixed-point value!")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, (float, Decimal)) and value == int(value):
+        return int(value)
+    raise ValueError("Money has to be given in integer fixed-point units!")
+
+
+def divide(numerator: int, denominator: int) -> int:
+    """divide integers with exact rounding half to even"""
+
+    if denominator == 0:
+        raise ZeroDivisionError("Division of money by zero!")
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+
+    quotient, remainder = divmod(numerator, denominator)
+    if 2 * remainder > denominator or (
+        2 * remainder == denominator and quotient % 2 == 1
+    ):
+        quotient += 1
+    return quotient
+
+
+@total_ordering
+class Money:
+    """Amount of money in fixed-point units of 10**-MAX_DECIMAL,
+    arithmetic on it is exact integer arithmetic"""
+
+    __slots__ = ("units",)
+
+    def __init__(self, units: int = 0) -> None:
+        self.units = fixed(units)
+
+    @classmethod
+    def from_decimal(cls, value: Union[str, int, float, Decimal]) -> "Money":
+        return cls(to_fixed(value))
+
+    def to_decimal(self) -> Decimal:
+        return from_fixed(self.units)
+
+    def __int__(self) -> int:
+        return self.units
+
+    def __add__(self, other: Any) -> "Money":
+        if isinstance(other, Money):
+            return Money(self.units + other.units)
+        return NotImplemented
+
+    def __sub__(self, other: Any) -> "Money":
+        if isinstance(other, Money):
+            return Money(self.units - other.units)
+        return NotImplemented
+
+    def __neg__(self) -> "Money":
+        return Money(-self.units)
+
+    def __mul__(self, amount: Any) -> "Money":
+        """multiply money by integer amount, e.g. unit price by amount"""
+
+        if isinstance(amount, int) and not isinstance(amount, bool):
+            return Money(self.units * amount)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __floordiv__(self, divisor: Any) -> "Money":
+        """divide money by integer with rounding half to even"""
+
+        if isinstance(divisor, int) and not isinstance(divisor, bool):
+            return Money(divide(self.units, divisor))
+        return NotImplemented
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Money):
+            return self.units == other.units
+        return NotImplemented
+
+    def __lt__(self, other: Any) -> bool:
+        if isinstance(other, Money):
+            return self.units < other.units
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.units)
+
+    def __str__(self) -> str:
+        return format_money(self.units)
+
+    def __repr__(self) -> str:
+        return f"Money({self})"
@@ -0,0 +1,116 @@
+import numpy as np
+
+from typing import Tuple
+
+from src.models.money import SCALE, divide
+
+_INT64_MAX = np.iinfo(np.int64).max
+
+# low halves of int64 values are below 2**32, so sums of up to
+# this many of them fit in int64
+_CHUNK = 2**30
+
+
+def checked_multiply(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """multiply int64 arrays elementwise, raise OverflowError
+    if any product does not fit in int64"""
+
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    product = a * b
+
+    # float estimate finds candidates, which are checked exactly
+    estimate = np.abs(a.astype(np.float64) * b.astype(np.float64))
+    candidates = np.flatnonzero(
+        np.broadcast_to(estimate >= 2.0**62, product.shape)
+    )
+    if len(candidates) > 0:
+        a_values = np.broadcast_to(a, product.shape).ravel()[candidates]
+        b_values = np.broadcast_to(b, product.shape).ravel()[candidates]
+        for x, y in zip(a_values.tolist(), b_values.tolist()):
+            if not -_INT64_MAX - 1 <= x * y <= _INT64_MAX:
+                raise OverflowError("Money value does not fit in int64!")
+    return product
+
+
+def _split(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """split int64 values to signed high and unsigned low 32 bits"""
+
+    values = np.asarray(values, dtype=np.int64)
+    return values >> 32, values & 0xFFFFFFFF
+
+
+def exact_sum(values: np.ndarray) -> int:
+    """return exact sum of int64 values as python int,
+    the sum does not wrap around even if it exceeds int64"""
+
+    high, low = _split(values)
+    total = int(high.sum()) << 32
+    for start in range(0, len(low), _CHUNK):
+        total += int(low[start : start + _CHUNK].sum())
+    return total
+
+
+def exact_reduceat(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """return sums of int64 values in groups beginning at starts
+    (see numpy.add.reduceat), raise OverflowError if any sum
+    does not fit in int64, values can have a column for every sum"""
+
+    if len(values) >= _CHUNK:
+        raise OverflowError("Too many values to sum exactly!")
+
+    high, low = _split(values)
+    high_sums = np.add.reduceat(high, starts)
+    low_sums = np.add.reduceat(low, starts)
+
+    # sum = high * 2**32 + low fits in int64 iff high part of the result
+    # (after carrying from low) fits in 32 signed bits
+    carry, low_sums = low_sums >> 32, low_sums & 0xFFFFFFFF
+    high_sums = high_sums + carry
+    if np.any(high_sums >= 2**31) or np.any(high_sums < -(2**31)):
+        raise OverflowError("Sum of money values does not fit in int64!")
+    return (high_sums << 32) | low_sums
+
+
+def round_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """divide int64 arrays with exact rounding half to even,
+    denominators have to be positive"""
+
+    quotient, remainder = np.divmod(
+        np.asarray(numerator, dtype=np.int64),
+        np.asarray(denominator, dtype=np.int64),
+    )
+    # compared with the other part of denominator to avoid overflow of 2*r
+    rest = denominator - remainder
+    up = (remainder > rest) | ((remainder == rest) & (quotient % 2 == 1))
+    return quotient + up
+
+
+def convert(units: np.ndarray, rates: np.ndarray) -> np.ndarray:
+    """convert fixed-point units to other currency at rates, rates are
+    rounded to fixed-point units and products are divided with exact
+    rounding half to even, raise OverflowError if any value
+    does not fit in int64"""
+
+    units = np.asarray(units, dtype=np.int64)
+    rate_units = np.rint(np.asarray(rates, dtype=np.float64) * SCALE)
+    units, rate_units = np.broadcast_arrays(units, rate_units.astype(np.int64))
+
+    # units * rate / SCALE is split to parts which fit in int64:
+    # units = q * SCALE + r and rate = h * SCALE + l, with 0 <= r, l < SCALE
+    q, r = np.divmod(units, SCALE)
+    h, l = np.divmod(rate_units, SCALE)
+    low, remainder = np.divmod(r * l, SCALE)
+
+    # values which could exceed int64 are computed as python ints
+    large = np.abs(units.astype(np.float64) * rate_units) >= 2.0**62 * SCALE
+    q = np.where(large, 0, q)
+    values = q * rate_units + r * h + low
+    rest = SCALE - remainder
+    values += (remainder > rest) | ((remainder == rest) & (values % 2 == 1))
+    for i in np.flatnonzero(large).tolist():
+        value = divide(int(units.flat[i]) * int(rate_units.flat[i]), SCALE)
+        if not -_INT64_MAX - 1 <= value <= _INT64_MAX:
+            raise OverflowError("Money value does not fit in int64!")
+        values.flat[i] = value
+    return values
@@ -1,10 +1,254 @@
-from typing import List, Dict
+import sys
+import threading
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Tuple
+
+from src.models.money import divide
+from src.models.transaction_index import TransactionIndex
+from src.settings import HOLDINGS_CHECKPOINT_INTERVAL, LOT_MATCHING_METHOD
+
+if TYPE_CHECKING:
+    from src.models.allocation import CategoryAllocation
+    from src.models.holdings_history import HoldingsHistory
+    from src.models.lots import LotEngine
+    from src.models.transaction_columns import TransactionColumns
+
+
+class Record:
+    """Compact record with fixed fields kept in __slots__,
+    fields are also accessible like keys of a dictionary,
+    fields without a slot are kept in the extra dictionary"""
+
+    __slots__ = ("_extra",)
+    FIELDS: Tuple[str, ...] = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS or (
+            self._extra is not None and key in self._extra
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.FIELDS) + (len(self._extra) if self._extra else 0)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (Record, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[str]:
+        if self._extra:
+            return [*self.FIELDS, *self._extra]
+        return list(self.FIELDS)
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self) -> Dict:
+        return dict(self.items())
+
+
+class Asset(Record):
+    """Asset held in the portfolio, code of the asset is the key
+    of portfolio assets dictionary"""
+
+    __slots__ = ("unit_price", "amount", "currency")
+    FIELDS = __slots__
+
+    def __init__(
+        self, unit_price: int, amount: int, currency: str, **extra
+    ) -> None:
+        self.unit_price = unit_price
+        self.amount = amount
+        self.currency = sys.intern(currency)
+        self._extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Asset":
+        if isinstance(data, cls):
+            return data
+        try:
+            return cls(**data)
+        except TypeError:
+            raise ValueError(f"Invalid asset record: {data}")
+
+
+class Transaction(Record):
+    """Record of transaction from portfolio history"""
+
+    __slots__ = ("date", "type", "code", "unit_price", "amount", "currency")
+    FIELDS = __slots__
+
+    def __init__(
+        self,
+        date: str,
+        type: str,
+        code: str,
+        unit_price: int,
+        amount: int,
+        currency: str,
+        **extra,
+    ) -> None:
+        self.date = date
+        self.type = sys.intern(type)
+        self.code = sys.intern(code)
+        self.unit_price = unit_price
+        self.amount = amount
+        self.currency = sys.intern(currency)
+        self._extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Transaction":
+        if isinstance(data, cls):
+            return data
+        try:
+            return cls(**data)
+        except TypeError:
+            raise ValueError(f"Invalid transaction record: {data}")
+
+
+class Position(Record):
+    """Aggregates of buy and sell transactions of one asset, code
+    of the asset is the key of portfolio positions dictionary
+
+    Only sums are stored, so the position is updated in O(1) per trade
+    and can be rebuilt from the transaction history with group sums.
+    Cost is the average cost of all bought units.
+    """
+
+    __slots__ = (
+        "currency",
+        "bought_amount",
+        "bought_cost",
+        "sold_amount",
+        "sold_proceeds",
+        "trades",
+    )
+    FIELDS = __slots__
+
+    def __init__(
+        self,
+        currency: str,
+        bought_amount: int = 0,
+        bought_cost: int = 0,
+        sold_amount: int = 0,
+        sold_proceeds: int = 0,
+        trades: int = 0,
+        **extra,
+    ) -> None:
+        self.currency = sys.intern(currency)
+        self.bought_amount = bought_amount
+        self.bought_cost = bought_cost
+        self.sold_amount = sold_amount
+        self.sold_proceeds = sold_proceeds
+        self.trades = trades
+        self._extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Position":
+        if isinstance(data, cls):
+            return data
+        try:
+            return cls(**data)
+        except TypeError:
+            raise ValueError(f"Invalid position record: {data}")
+
+    @property
+    def amount(self) -> int:
+        """amount of asset currently held"""
+
+        return self.bought_amount - self.sold_amount
+
+    @property
+    def average_cost(self) -> float:
+        """average unit price of bought asset"""
+
+        if self.bought_amount == 0:
+            return 0.0
+        return self.bought_cost / self.bought_amount
+
+    @property
+    def total_cost(self) -> int:
+        """cost of currently held amount of asset"""
+
+        if self.bought_amount == 0:
+            return 0
+        return divide(self.bought_cost * self.amount, self.bought_amount)
+
+    @property
+    def realized(self) -> int:
+        """profit (or loss) of sold amount of asset"""
+
+        if self.bought_amount == 0:
+            return self.sold_proceeds
+        sold_cost = divide(
+            self.bought_cost * self.sold_amount, self.bought_amount
+        )
+        return self.sold_proceeds - sold_cost
+
+    def apply(self, transaction: Transaction) -> None:
+        """update aggregates with buy or sell transaction"""
+
+        value = transaction.unit_price * transaction.amount
+        if transaction.type == "BUY":
+            self.bought_amount += transaction.amount
+            self.bought_cost += value
+        elif transaction.type == "SELL":
+            self.sold_amount += transaction.amount
+            self.sold_proceeds += value
+        else:
+            return
+        self.trades += 1
+
+
+def record_to_dict(obj: Any) -> Dict:
+    """convert record to dictionary, used as default function
+    of json encoder at the storage boundary"""
+
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
 
 
 class Portfolio:
+    """Data of portfolio with derived structures built on first use
+
+    Portfolios are shared by sessions through the cache of loaded
+    portfolios, so their mutations, lazy builds and memoized values
+    are done holding the lock of the portfolio.
+    """
+
     def __init__(self, name: str, data: Dict) -> None:
         self._name = name
-        self._data = data
+        self._lock = threading.RLock()
+        self.data = data
+        self._version = 0
 
     @property
     def name(self) -> str:
@@ -14,29 +258,75 @@ class Portfolio:
     def name(self, name: str) -> None:
         self._name = name
 
+    @property
+    def lock(self) -> threading.RLock:
+        return self._lock
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @version.setter
+    def version(self, version: int) -> None:
+        self._version = version
+
     @property
     def data(self) -> Dict:
         return self._data
 
     @data.setter
     def data(self, data: Dict) -> None:
+        # plain dictionaries from the storage are converted to records
+        if "assets" in data:
+            data["assets"] = {
+                sys.intern(code): Asset.from_dict(asset)
+                for code, asset in data["assets"].items()
+            }
+        if "transactions" in data:
+            data["transactions"] = list(
+                map(Transaction.from_dict, data["transactions"])
+            )
+        if "currencies" in data:
+            # balances saved as floats by older versions
+            data["currencies"] = {
+                currency: round(balance)
+                if isinstance(balance, float)
+                else balance
+                for currency, balance in data["currencies"].items()
+            }
+        if "positions" in data:
+            data["positions"] = {
+                sys.intern(code): Position.from_dict(position)
+                for code, position in data["positions"].items()
+            }
         self._data = data
+        self._columns = None
+        self._index = None
+        self._lots = None
+        self._history = None
+        self._allocation = None
+        self._memo = {}
 
     @property
-    def assets(self) -> Dict:
+    def assets(self) -> Dict[str, Asset]:
         return self.data["assets"]
 
     @assets.setter
     def assets(self, assets: Dict) -> None:
         self.data["assets"] = assets
+        self._allocation = None
 
     @property
-    def transactions(self) -> List[Dict]:
+    def transactions(self) -> List[Transaction]:
         return self.data["transactions"]
 
     @transactions.setter
     def transactions(self, transactions: List[Dict]) -> None:
         self.data["transactions"] = transactions
+        self._columns = None
+        self._index = None
+        self._lots = None
+        self._history = None
 
     @property
     def currencies(self) -> Dict:
@@ -45,3 +335,157 @@ class Portfolio:
     @currencies.setter
     def currencies(self, currencies: Dict) -> None:
         self.data["currencies"] = currencies
+
+    @property
+    def positions(self) -> Dict[str, Position]:
+        return self.data.setdefault("positions", {})
+
+    @positions.setter
+    def positions(self, positions: Dict) -> None:
+        self.data["positions"] = positions
+
+    @property
+    def categories(self) -> Dict[str, Dict[str, str]]:
+        """categories of assets in every dimension, keyed by code"""
+
+        return self.data.setdefault("categories", {})
+
+    @property
+    def targets(self) -> Dict[str, Dict[str, float]]:
+        """target weights of categories, keyed by dimension"""
+
+        return self.data.setdefault("targets", {})
+
+    @property
+    def allocation(self) -> "CategoryAllocation":
+        """values of assets per category, built on first use
+        and updated with update_allocation"""
+
+        from src.models.allocation import CategoryAllocation
+
+        with self._lock:
+            if self._allocation is None:
+                self._allocation = CategoryAllocation(
+                    self.assets, self.categories
+                )
+            return self._allocation
+
+    def update_allocation(self, code: str) -> None:
+        """update values per category with current asset
+        and categories of code, if they were already built"""
+
+        if self._allocation is not None:
+            self._allocation.update(
+                code, self.assets.get(code), self.categories.get(code)
+            )
+
+    @property
+    def transaction_columns(self) -> "TransactionColumns":
+        """columnar representation of transactions, built on first use"""
+
+        # imported here so the model module does not depend on numpy,
+        # the application imports numpy at start through the controller
+        from src.models.transaction_columns import TransactionColumns
+
+        with self._lock:
+            transactions = self.transactions
+            columns = self._columns
+            if columns is None or len(columns) > len(transactions):
+                columns = self._columns = TransactionColumns(transactions)
+            elif len(columns) < len(transactions):
+                columns.extend(transactions[len(columns) :])
+            return columns
+
+    @property
+    def transaction_index(self) -> TransactionIndex:
+        """secondary indexes of transactions, built on first use"""
+
+        with self._lock:
+            transactions = self.transactions
+            index = self._index
+            if index is None or len(index) > len(transactions):
+                index = self._index = TransactionIndex(transactions)
+            elif len(index) < len(transactions):
+                index.extend(transactions[len(index) :])
+            return index
+
+    @property
+    def lots(self) -> "LotEngine":
+        """open lots and realized gains, replayed from transactions
+        on first use"""
+
+        from src.models.lots import LotEngine
+
+        with self._lock:
+            transactions = self.transactions
+            lots = self._lots
+            if lots is None or len(lots) > len(transactions):
+                lots = self._lots = LotEngine(
+                    transactions, LOT_MATCHING_METHOD
+                )
+            elif len(lots) < len(transactions):
+                lots.extend(transactions[len(lots) :])
+            return lots
+
+    @property
+    def holdings_history(self) -> "HoldingsHistory":
+        """checkpoints of past holdings, built on first use
+        and extended with transactions appended since last use"""
+
+        from src.models.holdings_history import HoldingsHistory
+
+        with self._lock:
+            columns = self.transaction_columns
+            history = self._history
+            if history is None or history.columns is not columns:
+                history = self._history = HoldingsHistory(
+                    columns, HOLDINGS_CHECKPOINT_INTERVAL
+                )
+            else:
+                history.extend()
+            return history
+
+    def memoize(self, name: str, key: Any, compute: Callable[[], Any]):
+        """return value computed for key in current version
+        of the portfolio, compute it if it wasn't computed yet"""
+
+        with self._lock:
+            memo = self._memo.get(name)
+            if memo is not None and memo[0] == self.version and memo[1] == key:
+                return memo[2]
+
+            value = compute()
+            self._memo[name] = (self.version, key, value)
+            return value
+
+    def append_transaction(self, transaction: Transaction) -> None:
+        """add transaction at the end of history, update position
+        of its asset and add it to the columns, indexes and lots
+        if they were already built"""
+
+        self.extend_transactions((transaction,))
+
+    def extend_transactions(self, transactions: List[Transaction]) -> None:
+        """add transactions at the end of history in bulk,
+        see append_transaction"""
+
+        with self._lock:
+            self.transactions.extend(transactions)
+
+            positions = self.positions
+            for transaction in transactions:
+                if transaction.type not in ("BUY", "SELL"):
+                    continue
+                position = positions.get(transaction.code)
+                if position is None:
+                    position = positions[transaction.code] = Position(
+                        transaction.currency
+                    )
+                position.apply(transaction)
+
+            if self._columns is not None:
+                self._columns.extend(transactions)
+            if self._index is not None:
+                self._index.extend(transactions)
+            if self._lots is not None:
+                self._lots.extend(transactions)
@@ -0,0 +1,156 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+PRICE_COLUMNS = ("date", "code", "close")
+
+# number of keys of which values are kept per name of memoized value
+_MEMO_KEYS = 2
+
+
+class PriceHistory:
+    """Daily close prices of assets in units of their currencies
+
+    Prices are kept in long format (date, code, close) on disk,
+    as parquet or csv file, and as a wide frame with a column
+    of prices of every code in memory.
+    """
+
+    def __init__(
+        self, frame: Optional[pd.DataFrame] = None, version=None
+    ) -> None:
+        if frame is None:
+            frame = pd.DataFrame(columns=PRICE_COLUMNS)
+
+        missing = set(PRICE_COLUMNS) - set(frame.columns)
+        if missing:
+            raise ValueError(f"Missing price columns: {sorted(missing)}!")
+
+        frame = pd.DataFrame(
+            {
+                "date": pd.to_datetime(frame["date"]).dt.normalize(),
+                "code": frame["code"].astype(str).str.upper(),
+                "close": pd.to_numeric(frame["close"]).astype(np.float64),
+            }
+        )
+        self.frame = frame.drop_duplicates(
+            ["date", "code"], keep="last"
+        ).reset_index(drop=True)
+        self.wide = self.frame.pivot(
+            index="date", columns="code", values="close"
+        ).sort_index()
+        self.version = version
+        self._memo: Dict[str, "OrderedDict[Any, Any]"] = {}
+        # history of a file is shared by sessions of the application
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def codes(self) -> List[str]:
+        return list(self.wide.columns)
+
+    @classmethod
+    def load(cls, path: Path) -> "PriceHistory":
+        """load prices from parquet or csv file"""
+
+        path = Path(path)
+        stat = path.stat()
+        if path.suffix.lower() == ".parquet":
+            frame = pd.read_parquet(path, columns=list(PRICE_COLUMNS))
+        else:
+            frame = pd.read_csv(path, usecols=list(PRICE_COLUMNS))
+        return cls(frame, version=(stat.st_mtime_ns, stat.st_size))
+
+    def save(self, path: Path) -> None:
+        """write prices to parquet or csv file"""
+
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        if path.suffix.lower() == ".parquet":
+            self.frame.to_parquet(tmp_path, index=False)
+        else:
+            self.frame.to_csv(tmp_path, index=False, date_format="%Y-%m-%d")
+        tmp_path.replace(path)
+
+    def update(self, frame: pd.DataFrame) -> "PriceHistory":
+        """return history with prices of frame added,
+        replacing prices of the same code and date"""
+
+        return PriceHistory(pd.concat([self.frame, PriceHistory(frame).frame]))
+
+    def prices(self, codes: List[str], days: pd.DatetimeIndex) -> np.ndarray:
+        """return matrix of prices with row for every day and column
+        for every code, last known price is used on days without one,
+        NaN before first price and for codes without prices"""
+
+        wide = self.wide.reindex(columns=codes)
+        if len(wide) == 0:
+            return np.full((len(days), len(codes)), np.nan)
+
+        # prices known before the first day carry over to it
+        wide = wide.reindex(wide.index.union(days)).ffill()
+        return wide.reindex(days).to_numpy(dtype=np.float64)
+
+    def memoize(self, name: str, key: Any, compute: Callable[[], Any]):
+        """return value computed for name and key, compute it if it
+        wasn't computed yet, values stay valid as prices don't change,
+        only values of the latest keys used are kept for every name"""
+
+        with self._lock:
+            memo = self._memo.setdefault(name, OrderedDict())
+            if key in memo:
+                memo.move_to_end(key)
+                return memo[key]
+
+        value = compute()
+        with self._lock:
+            memo[key] = value
+            while len(memo) > _MEMO_KEYS:
+                memo.popitem(last=False)
+        return value
+
+    def last_prices(self, codes: List[str]) -> np.ndarray:
+        """return last known price of every code, NaN if it has none"""
+
+        last = self.memoize(
+            "last_prices", None, lambda: self.wide.ffill().iloc[-1:]
+        )
+        if len(last) == 0:
+            return np.full(len(codes), np.nan)
+        return last.reindex(columns=codes).to_numpy(dtype=np.float64)[0]
+
+    def returns(self, codes: List[str]) -> np.ndarray:
+        """return matrix of daily log returns with row for every day
+        since all codes have prices and column for every code"""
+
+        def compute() -> np.ndarray:
+            wide = self.wide.reindex(columns=codes).ffill().dropna()
+            return np.diff(np.log(wide.to_numpy(dtype=np.float64)), axis=0)
+
+        return self.memoize("returns", tuple(codes), compute)
+
+
+_LOADED: Dict[Path, PriceHistory] = {}
+
+
+def get_price_history(path: Path) -> PriceHistory:
+    """return prices loaded from path, loaded again if file changed,
+    empty history if the file does not exist"""
+
+    path = Path(path)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return PriceHistory()
+
+    history = _LOADED.get(path)
+    if history is None or history.version != (stat.st_mtime_ns, stat.st_size):
+        history = _LOADED[path] = PriceHistory.load(path)
+    return history
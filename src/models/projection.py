@@ -0,0 +1,206 @@
+import numpy as np
+
+from time import perf_counter
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+from src.parallel import run_tasks
+
+# share of variance of returns kept by factors of the return model
+VARIANCE_KEPT = 0.999
+
+# bins of log of value of assets relative to the starting one, in which
+# values of every step are counted instead of keeping the paths
+_BINS = 4096
+_LOG_RANGE = (np.log(1e-4), np.log(1e4))
+
+
+def return_model(
+    returns: np.ndarray, variance_kept: float = VARIANCE_KEPT
+) -> Tuple[np.ndarray, np.ndarray]:
+    """return mean daily log return of every asset and factor loadings
+    (asset x factor) of returns (day x asset), such that covariance
+    of returns is approximately loadings @ loadings.T
+
+    Only the largest principal components are kept, so the cost of
+    drawing correlated returns grows with number of factors, which is
+    usually much lower than number of assets.
+    """
+
+    if len(returns) < 2:
+        raise ValueError("Not enough price history to model returns!")
+
+    mean = returns.mean(axis=0)
+    covariance = np.atleast_2d(np.cov(returns, rowvar=False))
+    variances, vectors = np.linalg.eigh(covariance)
+    variances = np.clip(variances[::-1], 0, None)
+    vectors = vectors[:, ::-1]
+
+    total = variances.sum()
+    if total == 0:
+        return mean, np.zeros((len(mean), 1))
+    kept = int(np.searchsorted(np.cumsum(variances) / total, variance_kept))
+    kept = min(kept + 1, len(variances))
+    return mean, vectors[:, :kept] * np.sqrt(variances[:kept])
+
+
+def simulate_paths(
+    values: np.ndarray,
+    mean: np.ndarray,
+    loadings: np.ndarray,
+    steps: int,
+    step_days: int,
+    paths: int,
+    seed: np.random.SeedSequence,
+) -> Dict[str, np.ndarray]:
+    """simulate value of assets of paths starting with their values,
+    with normal log returns of assets over every step of step_days days,
+    run in worker processes
+
+    Only a histogram (step x bin) of values of every step with their
+    minimum and maximum is returned, so memory and the result sent
+    back from a worker do not grow with number of paths. Cash is the
+    same in every path, so it's added to percentiles (see project).
+    """
+
+    # single precision halves the cost and is plenty for projections
+    rng = np.random.default_rng(seed)
+    drift = (step_days * mean).astype(np.float32)
+    scale = (np.sqrt(step_days) * loadings.T).astype(np.float32)
+    weights = values.astype(np.float32)
+    levels = np.zeros((paths, len(values)), dtype=np.float32)
+    start = values.sum()
+
+    counts = np.zeros((steps + 1, _BINS), dtype=np.int64)
+    lows = np.empty(steps + 1)
+    highs = np.empty(steps + 1)
+    counts[0, value_bins(np.array([start]), start)[0]] = paths
+    lows[0] = highs[0] = start
+
+    for step in range(1, steps + 1):
+        shocks = rng.standard_normal((paths, scale.shape[0]), np.float32)
+        levels += drift
+        levels += shocks @ scale
+        totals = np.exp(levels) @ weights
+        counts[step] = np.bincount(value_bins(totals, start), minlength=_BINS)
+        lows[step], highs[step] = totals.min(), totals.max()
+    return {"counts": counts, "lows": lows, "highs": highs}
+
+
+def value_bins(totals: np.ndarray, start: float) -> np.ndarray:
+    """return bin of every positive value relative to positive start,
+    values out of range fall in edge bins"""
+
+    low, high = _LOG_RANGE
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logs = np.log(np.asarray(totals, dtype=np.float64) / start)
+    bins = np.floor((logs - low) * (_BINS / (high - low)))
+    return np.clip(np.nan_to_num(bins, nan=0.0), 0, _BINS - 1).astype(np.int64)
+
+
+def histogram_percentiles(
+    counts: np.ndarray,
+    lows: np.ndarray,
+    highs: np.ndarray,
+    start: float,
+    percentiles: Sequence[float],
+) -> Dict[float, np.ndarray]:
+    """return percentiles of values of every step from their histogram,
+    interpolated linearly in log of value inside bins and clipped
+    to the minimum and maximum of the step"""
+
+    low, high = _LOG_RANGE
+    width = (high - low) / _BINS
+    cumulative = np.cumsum(counts, axis=1)
+    total = cumulative[:, -1]
+    previous = cumulative - counts
+
+    bands = {}
+    for percentile in percentiles:
+        rank = total * percentile / 100
+        # first bin in which cumulative count reaches the rank
+        bins = np.minimum((cumulative < rank[:, None]).sum(axis=1), _BINS - 1)
+        rows = np.arange(len(bins))
+        inside = counts[rows, bins]
+        fraction = np.divide(
+            rank - previous[rows, bins],
+            inside,
+            out=np.zeros(len(bins)),
+            where=inside > 0,
+        )
+        value = start * np.exp(low + (bins + fraction) * width)
+        bands[percentile] = np.clip(value, lows, highs)
+    return bands
+
+
+def project(
+    values: np.ndarray,
+    cash: float,
+    mean: np.ndarray,
+    loadings: np.ndarray,
+    steps: int,
+    step_days: int,
+    paths: int,
+    chunk_paths: int,
+    workers: Optional[int] = None,
+    percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+    seed: int = 0,
+    update_seconds: float = 0.5,
+) -> Iterator[Dict]:
+    """simulate paths of portfolio value in chunks of chunk_paths paths
+    run in a process pool, yield percentile bands of value at every step
+    computed from the paths simulated so far, at most once
+    in update_seconds and once all paths are done
+
+    Chunks reduce their paths to histograms of values of assets of every
+    step (see simulate_paths), which are summed as chunks complete,
+    so memory does not depend on number of paths. Cash is added
+    to percentiles of values of assets, so it may be negative. Chunks have their own seeds
+    spawned from seed, so results do not depend on number of workers
+    or order in which chunks complete.
+    """
+
+    sizes = [
+        min(chunk_paths, paths - start)
+        for start in range(0, paths, chunk_paths)
+    ]
+    start = values.sum()
+    if start <= 0:
+        raise ValueError("No value of assets to project!")
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = (values, mean, loadings, steps, step_days)
+
+    counts = np.zeros((steps + 1, _BINS), dtype=np.int64)
+    lows = np.full(steps + 1, np.inf)
+    highs = np.full(steps + 1, -np.inf)
+    done = 0
+    last_update = perf_counter()
+
+    def bands() -> Dict:
+        return {
+            "paths": done,
+            "steps": np.arange(steps + 1) * step_days,
+            "bands": {
+                percentile: band + cash
+                for percentile, band in histogram_percentiles(
+                    counts, lows, highs, start, percentiles
+                ).items()
+            },
+        }
+
+    def add(summary: Dict[str, np.ndarray]) -> None:
+        nonlocal done
+        counts[...] += summary["counts"]
+        np.minimum(lows, summary["lows"], out=lows)
+        np.maximum(highs, summary["highs"], out=highs)
+        done += int(summary["counts"][0].sum())
+
+    for summary in run_tasks(
+        simulate_paths,
+        ((*args, size, chunk_seed) for size, chunk_seed in zip(sizes, seeds)),
+        workers,
+    ):
+        add(summary)
+        if done < paths and perf_counter() - last_update >= update_seconds:
+            last_update = perf_counter()
+            yield bands()
+    yield bands()
@@ -0,0 +1,76 @@
+import numpy as np
+
+from statistics import NormalDist
+from typing import Dict, List
+
+from src.models.price_history import PriceHistory
+
+
+class RiskModel:
+    """Daily simple returns of assets (day x asset) with their mean
+    and covariance, on days since all assets have prices"""
+
+    def __init__(self, returns: np.ndarray) -> None:
+        if len(returns) < 2:
+            raise ValueError("Not enough price history to measure risk!")
+
+        self.returns = returns
+        self.mean = returns.mean(axis=0)
+        self.covariance = np.atleast_2d(np.cov(returns, rowvar=False))
+
+    @classmethod
+    def of(cls, price_history: PriceHistory, codes: List[str]) -> "RiskModel":
+        """return model of codes computed once per price history"""
+
+        return price_history.memoize(
+            "risk_model",
+            tuple(codes),
+            lambda: cls(np.expm1(price_history.returns(codes))),
+        )
+
+
+def value_at_risk(
+    model: RiskModel,
+    values: np.ndarray,
+    confidence: float = 0.99,
+    horizon: int = 1,
+) -> Dict:
+    """return historical and parametric (normal) Value-at-Risk and
+    expected shortfall of holdings with values of assets of the model
+    and contribution of every asset to the parametric VaR
+
+    Losses are positive numbers in units of values. Losses over horizon
+    days are scaled from daily ones by square root of the horizon.
+    Contributions are Euler allocations of VaR without the mean return,
+    they sum to it and come from one covariance-values product.
+    """
+
+    scale = np.sqrt(horizon)
+    tail = 1 - confidence
+
+    # historical profits and losses of current holdings
+    losses = -(model.returns @ values)
+    historical_var = np.quantile(losses, confidence)
+    historical_es = losses[losses >= historical_var].mean()
+
+    normal = NormalDist()
+    z = normal.inv_cdf(confidence)
+    mean = model.mean @ values
+    covariance_values = model.covariance @ values
+    deviation = np.sqrt(max(values @ covariance_values, 0.0))
+
+    if deviation > 0:
+        contributions = z * scale * values * covariance_values / deviation
+    else:
+        contributions = np.zeros(len(values))
+
+    return {
+        "value": values.sum(),
+        "historical_var": scale * historical_var,
+        "historical_es": scale * historical_es,
+        "parametric_var": z * deviation * scale - mean * horizon,
+        "parametric_es": deviation * normal.pdf(z) / tail * scale
+        - mean * horizon,
+        "volatility": scale * deviation,
+        "contributions": contributions,
+    }
@@ -0,0 +1,284 @@
+import numpy as np
+
+from typing import Dict, Iterable, List, Tuple
+
+from src.models.money_kernels import checked_multiply, exact_reduceat
+
+# initial capacity of the column arrays, doubled when exceeded
+_INITIAL_CAPACITY = 1024
+
+_COLUMNS = (
+    ("dates", np.int64),
+    ("code_ids", np.int32),
+    ("currency_ids", np.int32),
+    ("type_ids", np.int8),
+    ("unit_prices", np.int64),
+    ("amounts", np.int64),
+)
+
+
+# fields by which rows of transactions can be sorted
+SORT_FIELDS = ("date", "type", "code", "amount", "unit_price", "currency")
+
+
+class _Symbols:
+    """Table of interned strings with their integer ids"""
+
+    def __init__(self, symbols: Iterable[str] = ()) -> None:
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        for symbol in symbols:
+            self.id(symbol)
+
+    def id(self, symbol: str) -> int:
+        symbol_id = self.ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self.ids[symbol] = len(self.names)
+            self.names.append(symbol)
+        return symbol_id
+
+    def rank(self) -> np.ndarray:
+        """return position of every id in alphabetical order of names"""
+
+        ranks = np.empty(len(self.names), dtype=np.int64)
+        ranks[np.argsort(self.names, kind="stable")] = np.arange(
+            len(self.names)
+        )
+        return ranks
+
+
+class TransactionColumns:
+    """Columnar representation of the transaction history
+
+    Every field is kept in a numpy array: dates as epoch seconds,
+    codes, currencies and types as ids of interned strings,
+    unit prices and amounts as int64 fixed-point numbers
+    (prices are already scaled by 10**MAX_DECIMAL in the portfolio).
+    """
+
+    BUY, SELL = 0, 1
+
+    def __init__(self, transactions: Iterable = ()) -> None:
+        self.codes = _Symbols()
+        self.currencies = _Symbols()
+        self.types = _Symbols(("BUY", "SELL"))
+        self._size = 0
+        self._arrays = {
+            name: np.empty(_INITIAL_CAPACITY, dtype=dtype)
+            for name, dtype in _COLUMNS
+        }
+        self.extend(transactions)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _column(self, name: str) -> np.ndarray:
+        return self._arrays[name][: self._size]
+
+    @property
+    def dates(self) -> np.ndarray:
+        return self._column("dates")
+
+    @property
+    def code_ids(self) -> np.ndarray:
+        return self._column("code_ids")
+
+    @property
+    def currency_ids(self) -> np.ndarray:
+        return self._column("currency_ids")
+
+    @property
+    def type_ids(self) -> np.ndarray:
+        return self._column("type_ids")
+
+    @property
+    def unit_prices(self) -> np.ndarray:
+        return self._column("unit_prices")
+
+    @property
+    def amounts(self) -> np.ndarray:
+        return self._column("amounts")
+
+    def _reserve(self, size: int) -> None:
+        """grow arrays to fit at least size rows"""
+
+        capacity = len(self._arrays["dates"])
+        if size <= capacity:
+            return
+
+        while capacity < size:
+            capacity *= 2
+
+        for name, array in self._arrays.items():
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[: self._size] = array[: self._size]
+            self._arrays[name] = grown
+
+    def append(self, transaction) -> None:
+        """add one transaction record at the end of the columns"""
+
+        self.extend((transaction,))
+
+    def extend(self, transactions: Iterable) -> None:
+        """add transaction records at the end of the columns"""
+
+        transactions = list(transactions)
+        if len(transactions) == 0:
+            return
+
+        code_id, currency_id = self.codes.id, self.currencies.id
+        type_id = self.types.id
+        rows = {
+            "dates": np.array(
+                [t["date"] for t in transactions], dtype="datetime64[s]"
+            ).astype(np.int64),
+            "code_ids": [code_id(t["code"]) for t in transactions],
+            "currency_ids": [currency_id(t["currency"]) for t in transactions],
+            "type_ids": [type_id(t["type"]) for t in transactions],
+            "unit_prices": [round(t["unit_price"]) for t in transactions],
+            "amounts": [round(t["amount"]) for t in transactions],
+        }
+
+        start, end = self._size, self._size + len(transactions)
+        self._reserve(end)
+        for name, values in rows.items():
+            self._arrays[name][start:end] = values
+        self._size = end
+
+    def sort(
+        self, positions: np.ndarray, by: str = "date", descending: bool = False
+    ) -> np.ndarray:
+        """return positions of transactions sorted by field (see
+        SORT_FIELDS), ties are kept in order of history,
+        reversed if order is descending"""
+
+        if by not in SORT_FIELDS:
+            raise ValueError("Invalid sort field!")
+
+        symbols = {
+            "type": (self.types, self.type_ids),
+            "code": (self.codes, self.code_ids),
+            "currency": (self.currencies, self.currency_ids),
+        }
+        if by in symbols:
+            names, ids = symbols[by]
+            keys = names.rank()[ids[positions]]
+        else:
+            keys = getattr(self, by + "s")[positions]
+
+        order = positions[np.argsort(keys, kind="stable")]
+        return order[::-1] if descending else order
+
+    def values(self) -> np.ndarray:
+        """return value (unit price * amount) of every transaction,
+        raise OverflowError if any value does not fit in int64"""
+
+        return checked_multiply(self.unit_prices, self.amounts)
+
+    def signs(self) -> np.ndarray:
+        """return 1 for buys, -1 for sells and 0 for other transactions"""
+
+        type_ids = self.type_ids
+        return (type_ids == self.BUY).astype(np.int64) - (
+            type_ids == self.SELL
+        ).astype(np.int64)
+
+    def months(self) -> np.ndarray:
+        """return month of every transaction as numpy datetime64[M]"""
+
+        return self.dates.astype("datetime64[s]").astype("datetime64[M]")
+
+    @staticmethod
+    def group(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """return order sorting keys (stable) and start of every group
+        of equal keys in the sorted order"""
+
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(
+            np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1]))
+        )
+        return order, starts
+
+    @classmethod
+    def sum_by(
+        cls, keys: np.ndarray, values: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """return unique keys and exact int64 sums of values per key,
+        values can have a column for every sum, raise OverflowError
+        if any sum does not fit in int64"""
+
+        if len(keys) == 0:
+            return keys[:0], values[:0]
+
+        order, starts = cls.group(keys)
+        return keys[order][starts], exact_reduceat(values[order], starts)
+
+    def holdings_by_code(self) -> Dict[str, int]:
+        """return amount of every asset bought minus amount sold"""
+
+        ids, sums = self.sum_by(self.code_ids, self.signs() * self.amounts)
+        return {self.codes.names[i]: int(s) for i, s in zip(ids, sums)}
+
+    def value_by_code(self) -> Dict[str, int]:
+        """return total traded value of every asset"""
+
+        ids, sums = self.sum_by(self.code_ids, self.values())
+        return {self.codes.names[i]: int(s) for i, s in zip(ids, sums)}
+
+    def cash_flow_by_currency(self) -> Dict[str, int]:
+        """return sum of sells minus sum of buys in every currency"""
+
+        ids, sums = self.sum_by(
+            self.currency_ids, -self.signs() * self.values()
+        )
+        return {self.currencies.names[i]: int(s) for i, s in zip(ids, sums)}
+
+    def value_by_month(self) -> Dict[str, int]:
+        """return total traded value in every month"""
+
+        months, sums = self.sum_by(self.months(), self.values())
+        return {str(m): int(s) for m, s in zip(months, sums)}
+
+    def positions_by_code(self) -> Dict[str, Dict]:
+        """return position aggregates of every traded asset
+        (see src.models.portfolio.Position), computed in one pass"""
+
+        traded = np.flatnonzero(self.type_ids <= self.SELL)
+        if len(traded) == 0:
+            return {}
+
+        code_ids = self.code_ids[traded]
+        amounts = self.amounts[traded]
+        values = checked_multiply(amounts, self.unit_prices[traded])
+        buys = self.type_ids[traded] == self.BUY
+        sells = ~buys
+
+        columns = np.stack(
+            (
+                amounts * buys,
+                values * buys,
+                amounts * sells,
+                values * sells,
+                np.ones(len(traded), dtype=np.int64),
+            ),
+            axis=1,
+        )
+        order, starts = self.group(code_ids)
+        sums = exact_reduceat(columns[order], starts)
+        # currency of the first transaction of every asset
+        currency_ids = self.currency_ids[traded][order][starts]
+
+        return {
+            self.codes.names[code_id]: {
+                "currency": self.currencies.names[currency_id],
+                "bought_amount": int(row[0]),
+                "bought_cost": int(row[1]),
+                "sold_amount": int(row[2]),
+                "sold_proceeds": int(row[3]),
+                "trades": int(row[4]),
+            }
+            for code_id, currency_id, row in zip(
+                code_ids[order][starts], currency_ids, sums
+            )
+        }
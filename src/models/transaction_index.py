@@ -0,0 +1,179 @@
+import heapq
+
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timezone
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+DateLike = Union[str, date, datetime]
+
+
+def date_key(value: DateLike, upper: bool = False) -> str:
+    """convert date to ISO 8601 string comparable with transaction dates,
+    dates without time cover the whole day"""
+
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%dT%H:%M:%S")
+    if isinstance(value, date):
+        value = value.isoformat()
+    if len(value) == 10:
+        return value + ("T23:59:59" if upper else "T00:00:00")
+    return value
+
+
+def record_date(value: datetime) -> str:
+    """return datetime as ISO 8601 string of transaction records,
+    dates with UTC offset are converted to UTC first"""
+
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec="seconds")
+
+
+class TransactionIndex:
+    """Secondary indexes of transaction history, positions of transactions
+    are kept per code, currency and type, and sorted by date
+
+    Transactions older than the last indexed one (e.g. imported history)
+    are buffered and merged into the date index on the next query,
+    so importing them costs one sort instead of an insert per record.
+    """
+
+    def __init__(self, transactions: Iterable = ()) -> None:
+        self.by_code: Dict[str, List[int]] = {}
+        self.by_currency: Dict[str, List[int]] = {}
+        self.by_type: Dict[str, List[int]] = {}
+        self._dates: List[str] = []
+        self._date_positions: List[int] = []
+        self._pending: List[Tuple[str, int]] = []
+        self._position_dates: List[str] = []
+        self._size = 0
+        self.extend(transactions)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def dates(self) -> List[str]:
+        """sorted dates of all transactions"""
+
+        self._merge()
+        return self._dates
+
+    @property
+    def date_positions(self) -> List[int]:
+        """positions of transactions in order of dates"""
+
+        self._merge()
+        return self._date_positions
+
+    def append(self, transaction) -> None:
+        """add transaction at the next position of history to the indexes"""
+
+        position = self._size
+        self.by_code.setdefault(transaction["code"], []).append(position)
+        self.by_currency.setdefault(transaction["currency"], []).append(
+            position
+        )
+        self.by_type.setdefault(transaction["type"], []).append(position)
+
+        transaction_date = transaction["date"]
+        self._position_dates.append(transaction_date)
+        if not self._dates or self._dates[-1] <= transaction_date:
+            self._dates.append(transaction_date)
+            self._date_positions.append(position)
+        else:
+            # history is not chronological (e.g. imported older records)
+            self._pending.append((transaction_date, position))
+
+        self._size += 1
+
+    def extend(self, transactions: Iterable) -> None:
+        for transaction in transactions:
+            self.append(transaction)
+
+    def _merge(self) -> None:
+        """merge buffered transactions into the date index"""
+
+        if not self._pending:
+            return
+
+        self._pending.sort()
+        merged = list(
+            heapq.merge(zip(self._dates, self._date_positions), self._pending)
+        )
+        self._dates = [transaction_date for transaction_date, _ in merged]
+        self._date_positions = [position for _, position in merged]
+        self._pending = []
+
+    def select(
+        self,
+        codes: Optional[Iterable[str]] = None,
+        currencies: Optional[Iterable[str]] = None,
+        types: Optional[Iterable[str]] = None,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+    ) -> List[int]:
+        """return positions of transactions of any of codes, currencies
+        and types made between start and end (inclusive) in order
+        of history, filters which are None are not applied
+
+        Positions matching the most selective filter are intersected
+        with the other ones by binary search, or checked for dates,
+        so a query costs about the size of its smallest filter.
+        """
+
+        groups = []
+        for index, keys in (
+            (self.by_code, codes),
+            (self.by_currency, currencies),
+            (self.by_type, types),
+        ):
+            if keys is not None:
+                lists = [index[key] for key in set(keys) if key in index]
+                if len(lists) == 1:
+                    groups.append(lists[0])
+                else:
+                    groups.append(sorted(chain.from_iterable(lists)))
+
+        start_key = None if start is None else date_key(start)
+        end_key = None if end is None else date_key(end, upper=True)
+        if start_key is not None or end_key is not None:
+            dates = self.dates
+            low = 0 if start_key is None else bisect_left(dates, start_key)
+            high = (
+                len(dates) if end_key is None else bisect_right(dates, end_key)
+            )
+            if not groups or high - low < min(map(len, groups)):
+                groups.append(sorted(self._date_positions[low:high]))
+                start_key = end_key = None
+
+        if not groups:
+            return list(range(self._size))
+
+        groups.sort(key=len)
+        selected = groups[0]
+        for group in groups[1:]:
+            selected = _intersect(selected, group)
+
+        # dates are checked on candidates if they're not the smallest group
+        if start_key is not None or end_key is not None:
+            position_dates = self._position_dates
+            selected = [
+                position
+                for position in selected
+                if (start_key is None or position_dates[position] >= start_key)
+                and (end_key is None or position_dates[position] <= end_key)
+            ]
+        return list(selected)
+
+
+def _intersect(small: List[int], large: List[int]) -> List[int]:
+    """return positions of sorted list small which are in sorted large"""
+
+    found = []
+    for position in small:
+        i = bisect_left(large, position)
+        if i < len(large) and large[i] == position:
+            found.append(position)
+    return found
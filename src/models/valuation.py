@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+from typing import Any, Dict, Optional
+
+from src.models.fx_rates import FxRates
+from src.models.money import SCALE, divide
+from src.models.money_kernels import checked_multiply, convert, exact_sum
+from src.models.portfolio import Asset, Position
+from src.models.price_history import PriceHistory
+
+
+def holdings_tables(
+    assets: Dict[str, Asset],
+    positions: Dict[str, Position],
+    currencies: Dict[str, int],
+    base: Optional[str] = None,
+    fx_rates: Optional[FxRates] = None,
+    price_history: Optional[PriceHistory] = None,
+) -> Dict[str, Any]:
+    """return frames of assets and of currency balances with market
+    value, weight in value of all holdings and profit of held amount
+    over its average cost, in decimal numbers, and fixed-point total
+
+    Columns are computed from arrays of all holdings at once, values
+    with integer kernels of fixed-point units and converted to decimal
+    numbers only in the frames. Assets are valued at their last close
+    price in price history, or at their unit price if they have none.
+    Values are converted to base currency if it's given with exchange
+    rates, otherwise currencies are assumed equal. Weights are shares
+    of values in gross value of holdings (sum of absolute values),
+    so a negative balance has negative weight and does not inflate
+    weights of the other holdings. Cost is the average cost of bought units times held amount,
+    so it follows amounts changed without transactions. Profit of assets
+    without bought units (added without transactions) is NaN.
+    """
+
+    codes = list(assets)
+    amounts = np.array([assets[code].amount for code in codes], np.int64)
+    prices = np.array([assets[code].unit_price for code in codes], np.int64)
+    if price_history is not None and len(price_history) > 0:
+        closes = price_history.last_prices(codes) * SCALE
+        known = ~np.isnan(closes)
+        prices[known] = np.rint(closes[known]).astype(np.int64)
+    market_values = checked_multiply(prices, amounts)
+
+    costed = np.array(
+        [
+            code in positions and positions[code].bought_amount > 0
+            for code in codes
+        ],
+        dtype=bool,
+    )
+    costs = np.array(
+        [
+            divide(
+                positions[code].bought_cost * assets[code].amount,
+                positions[code].bought_amount,
+            )
+            if costed[i]
+            else 0
+            for i, code in enumerate(codes)
+        ],
+        dtype=np.int64,
+    )
+    asset_currencies = [assets[code].currency for code in codes]
+    balances = list(currencies)
+    balance_values = np.array([currencies[c] for c in balances], np.int64)
+
+    if base is None or fx_rates is None:
+        values, base_balances = market_values, balance_values
+    else:
+        symbols = sorted(set(asset_currencies) | set(balances))
+        rates = dict(zip(symbols, fx_rates.rates(symbols, base)))
+        values = convert(
+            market_values, np.array([rates[c] for c in asset_currencies])
+        )
+        base_balances = convert(
+            balance_values, np.array([rates[c] for c in balances])
+        )
+    total = exact_sum(values) + exact_sum(base_balances)
+    gross = exact_sum(np.abs(values)) + exact_sum(np.abs(base_balances))
+    scale = 1 / gross if gross != 0 else np.nan
+    profits = np.where(costed, market_values - costs, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = profits / np.where(costed, costs, np.nan)
+
+    asset_frame = pd.DataFrame(
+        {
+            "amount": amounts,
+            "unit_price": prices / SCALE,
+            "currency": asset_currencies,
+            "market_value": market_values / SCALE,
+            "cost": np.where(costed, costs, np.nan) / SCALE,
+            "profit": profits / SCALE,
+            "return": returns,
+            "weight": values * scale,
+        },
+        index=pd.Index(codes, name="code"),
+    )
+    currency_frame = pd.DataFrame(
+        {"balance": balance_values / SCALE, "weight": base_balances * scale},
+        index=pd.Index(balances, name="currency"),
+    )
+    if base is not None and fx_rates is not None:
+        value_column = f"value ({base})"
+        asset_frame.insert(4, value_column, values / SCALE)
+        currency_frame.insert(1, value_column, base_balances / SCALE)
+    return {
+        "assets": asset_frame,
+        "currencies": currency_frame,
+        "total": total,
+    }
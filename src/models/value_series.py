@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+from typing import Optional, Tuple
+
+from src.models.fx_rates import FxRates, day_number
+from src.models.money import SCALE
+from src.models.price_history import PriceHistory
+from src.models.transaction_columns import TransactionColumns
+from src.models.transaction_index import DateLike
+
+_SECONDS_PER_DAY = 86400
+
+
+def total_values(values: pd.DataFrame, flows: pd.DataFrame) -> pd.DataFrame:
+    """return frame of total value and flow on every day
+    from frames of values and flows of every code"""
+
+    return pd.DataFrame(
+        {"value": values.sum(axis=1), "flow": flows.sum(axis=1)},
+        index=values.index,
+    )
+
+
+def daily_values_by_code(
+    columns: TransactionColumns,
+    price_history: PriceHistory,
+    base: Optional[str] = None,
+    fx_rates: Optional[FxRates] = None,
+    start: Optional[DateLike] = None,
+    end: Optional[DateLike] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """return frames of daily market value of every asset held and of net
+    value invested in it, with a row for every day and column for every code
+
+    Holdings are cumulative sums of a (day x code) matrix of trades.
+    Assets are valued at close prices of the price history, or at
+    their last trade price before the first close price. Values are
+    converted to base currency if it's given with exchange rates,
+    otherwise currencies of assets are assumed to be equal.
+    """
+
+    if len(columns) == 0 and start is None:
+        empty = pd.DataFrame(index=pd.DatetimeIndex([], name="date"))
+        return empty, empty.copy()
+
+    trade_days = columns.dates // _SECONDS_PER_DAY
+    first = trade_days.min() if start is None else day_number(start)
+    if end is not None:
+        last = day_number(end)
+    else:
+        last = trade_days.max() if len(trade_days) else first
+        if len(price_history):
+            last = max(last, day_number(price_history.wide.index[-1]))
+
+    days = pd.date_range(
+        pd.Timestamp(first, unit="D"),
+        pd.Timestamp(last, unit="D"),
+        name="date",
+    )
+    codes = columns.codes.names
+    n_days, n_codes = len(days), len(codes)
+
+    # trades before the first day go to its opening holdings,
+    # trades after the last day are left out
+    signs = columns.signs()
+    rows = np.clip(trade_days - first, 0, None)
+    inside = (rows < n_days) & (signs != 0)
+    rows, code_ids = rows[inside], columns.code_ids[inside]
+    amounts = (signs * columns.amounts)[inside]
+    unit_prices = columns.unit_prices[inside] / SCALE
+
+    holdings = np.zeros((n_days, n_codes), dtype=np.float64)
+    np.add.at(holdings, (rows, code_ids), amounts)
+    holdings = np.cumsum(holdings, axis=0)
+
+    # last trade prices carried forward until a close price is known
+    trade_prices = np.full((n_days, n_codes), np.nan)
+    trade_prices[rows, code_ids] = unit_prices
+    trade_prices = pd.DataFrame(trade_prices).ffill().to_numpy()
+    prices = price_history.prices(codes, days)
+    prices = np.where(np.isnan(prices), trade_prices, prices)
+
+    rates = np.ones((n_days, n_codes))
+    flow_rates = np.ones(len(rows))
+    if base is not None and fx_rates is not None:
+        # currency of every code is the currency of its first trade
+        code_currencies = np.zeros(n_codes, dtype=np.int64)
+        code_currencies[columns.code_ids[::-1]] = columns.currency_ids[::-1]
+        day_numbers = np.arange(first, first + n_days)
+        currency_rates = np.column_stack(
+            [
+                fx_rates.rate_series(currency, base, day_numbers)
+                for currency in columns.currencies.names
+            ]
+            or [np.ones(n_days)]
+        )
+        rates = currency_rates[:, code_currencies]
+        flow_rates = rates[rows, code_ids]
+
+    values = holdings * prices * rates
+    values[np.isnan(values)] = 0
+    flows = np.zeros((n_days, n_codes))
+    np.add.at(flows, (rows, code_ids), amounts * unit_prices * flow_rates)
+
+    return (
+        pd.DataFrame(values, index=days, columns=codes),
+        pd.DataFrame(flows, index=days, columns=codes),
+    )
@@ -0,0 +1,65 @@
+import os
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor
+from concurrent.futures import wait
+from itertools import chain, islice
+from typing import Any, Callable, Deque, Iterable, Iterator, Optional, Tuple
+
+# tasks submitted to the pool per worker ahead of the yielded results
+TASKS_AHEAD = 2
+
+
+def run_tasks(
+    function: Callable,
+    tasks: Iterable[Tuple],
+    workers: Optional[int] = None,
+    ordered: bool = False,
+) -> Iterator[Any]:
+    """yield results of function called with arguments of every task,
+    in order of tasks if ordered, otherwise as they complete
+
+    Tasks run in a pool of worker processes (as many as CPUs if workers
+    is None), or in the calling process if workers is 0 or there is
+    only one task. Only a few tasks per worker are submitted at once,
+    so tasks may be read lazily, and tasks which didn't start are
+    cancelled when the generator is closed (e.g. interrupted rerun).
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    tasks = iter(tasks)
+    first = list(islice(tasks, max(workers, 2)))
+    tasks = chain(first, tasks)
+
+    if workers == 0 or len(first) <= 1:
+        for arguments in tasks:
+            yield function(*arguments)
+        return
+
+    workers = min(workers, len(first))
+    executor = ProcessPoolExecutor(workers)
+    pending: Deque[Future] = deque()
+    try:
+        for arguments in tasks:
+            pending.append(executor.submit(function, *arguments))
+            if len(pending) >= TASKS_AHEAD * workers:
+                yield from _completed(pending, ordered)
+        while pending:
+            yield from _completed(pending, ordered)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _completed(pending: Deque[Future], ordered: bool) -> Iterator[Any]:
+    """remove completed futures from pending and yield their results,
+    the first one if ordered or any completed ones otherwise"""
+
+    if ordered:
+        yield pending.popleft().result()
+        return
+
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        pending.remove(future)
+        yield future.result()
@@ -6,3 +6,107 @@ MAX_DECIMAL = 8
 
 # PATH TO DIRECTORY FOR STORING PORTFOLIOS
 DATA_PATH = "data/portfolios"
+
+# STORAGE BACKEND OF PORTFOLIO FILES ("json" OR "sqlite")
+STORAGE_BACKEND = "json"
+
+# SAVE CHANGES TO APPEND-ONLY JOURNAL INSTEAD OF REWRITING WHOLE FILE
+JOURNALED_STORAGE = True
+
+# NUMBER OF JOURNAL RECORDS AFTER WHICH WHOLE PORTFOLIO IS WRITTEN TO FILE
+JOURNAL_CHECKPOINT_INTERVAL = 1000
+
+# LARGEST NUMBER OF TRANSACTIONS SAVED IN ONE JOURNAL RECORD,
+# WHOLE PORTFOLIO IS WRITTEN TO FILE INSTEAD OF LARGER RECORDS
+JOURNAL_RECORD_TRANSACTIONS = 10000
+
+# MAXIMUM NUMBER OF LOADED PORTFOLIOS KEPT IN MEMORY
+PORTFOLIO_CACHE_ENTRIES = 16
+
+# MAXIMUM TOTAL SIZE IN BYTES OF FILES OF PORTFOLIOS KEPT IN MEMORY
+PORTFOLIO_CACHE_BYTES = 256 * 1024**2
+
+# KEEP LIST OF PORTFOLIOS AND CACHE UP TO DATE WITH FILESYSTEM EVENTS
+# INSTEAD OF SCANNING DATA_PATH ON EVERY RERUN
+WATCH_DATA_PATH = True
+
+# MAXIMUM NUMBER OF PORTFOLIOS LISTED IN PORTFOLIO SELECTION
+PORTFOLIO_SEARCH_LIMIT = 50
+
+# DEFAULT METHOD OF MATCHING SOLD ASSETS WITH LOTS ("FIFO" OR "LIFO")
+LOT_MATCHING_METHOD = "FIFO"
+
+# NUMBER OF TRANSACTIONS BETWEEN CHECKPOINTS OF PAST HOLDINGS
+HOLDINGS_CHECKPOINT_INTERVAL = 1000
+
+# NUMBER OF CSV ROWS PARSED AND APPLIED TO PORTFOLIO AT ONCE DURING IMPORT
+IMPORT_CHUNK_SIZE = 5000
+
+# NUMBER OF PROCESSES PARSING IMPORTED CSV FILES
+# (None USES NUMBER OF CPUS, 0 PARSES FILES IN THE MAIN PROCESS)
+IMPORT_WORKERS = None
+
+# MAXIMUM NUMBER OF INVALID ROWS LISTED IN IMPORT REPORT
+IMPORT_MAX_ERRORS = 1000
+
+# PATH TO CSV OR JSON FILE WITH HISTORICAL EXCHANGE RATES
+# (date, base, quote AND rate OF EVERY CURRENCY PAIR)
+FX_RATES_PATH = "data/fx_rates.csv"
+
+# DEFAULT CURRENCY IN WHICH PORTFOLIO VALUE IS SHOWN
+BASE_CURRENCY = "USD"
+
+# PATH TO PARQUET OR CSV FILE WITH DAILY CLOSE PRICES OF ASSETS
+# (date, code AND close COLUMNS)
+PRICE_HISTORY_PATH = "data/prices.parquet"
+
+# ANNUAL RISK FREE RATE USED IN SHARPE RATIO
+RISK_FREE_RATE = 0.0
+
+# NUMBER OF DAYS IN WINDOW OF ROLLING VOLATILITY
+VOLATILITY_WINDOW = 30
+
+# NUMBER OF PROCESSES LOADING PORTFOLIOS OF CONSOLIDATED VIEW
+# (None USES NUMBER OF CPUS, 0 LOADS THEM IN THE MAIN PROCESS)
+CONSOLIDATION_WORKERS = None
+
+# NUMBER OF PORTFOLIOS LOADED BY ONE TASK OF CONSOLIDATED VIEW
+CONSOLIDATION_CHUNK_SIZE = 16
+
+# DIMENSIONS IN WHICH ASSETS ARE CATEGORIZED
+CATEGORY_DIMENSIONS = ("asset class", "sector", "region")
+
+# NUMBER OF TRADING DAYS IN A YEAR OF PRICE HISTORY
+TRADING_DAYS = 252
+
+# DEFAULT NUMBER OF SIMULATED PATHS OF PORTFOLIO VALUE PROJECTION
+PROJECTION_PATHS = 100000
+
+# NUMBER OF PATHS SIMULATED BY ONE TASK OF PROJECTION
+PROJECTION_CHUNK_PATHS = 20000
+
+# NUMBER OF PROCESSES SIMULATING PATHS OF PROJECTION
+# (None USES NUMBER OF CPUS, 0 SIMULATES THEM IN THE MAIN PROCESS)
+PROJECTION_WORKERS = None
+
+# NUMBER OF STEPS OF PROJECTED PATHS IN A YEAR
+PROJECTION_STEPS_PER_YEAR = 12
+
+# PERCENTILES OF PROJECTED PORTFOLIO VALUE SHOWN AS BANDS
+PROJECTION_PERCENTILES = (5, 25, 50, 75, 95)
+
+# DEFAULT CONFIDENCE LEVEL OF VALUE-AT-RISK AND EXPECTED SHORTFALL
+VAR_CONFIDENCE = 0.99
+
+# NUMBER OF TRANSACTIONS SHOWN ON ONE PAGE OF TRANSACTION HISTORY
+TRANSACTIONS_PAGE_SIZE = 50
+
+# BACKEND RENDERING CHARTS ("altair" SPECS OR "matplotlib" IMAGES)
+CHART_BACKEND = "altair"
+
+# NUMBER OF RENDERED CHARTS KEPT IN MEMORY
+CHART_CACHE_SIZE = 64
+
+# LONGEST TIME OF IMPORTS AT START OF THE APPLICATION IN SECONDS,
+# NOT COUNTING STREAMLIT AND LIBRARIES IMPORTED BY IT
+IMPORT_TIME_BUDGET = 0.4
@@ -0,0 +1,144 @@
+import streamlit as st
+
+from src.models.money import format_money, to_fixed
+from src.settings import CATEGORY_DIMENSIONS, MAX_DECIMAL
+from src.views.charts import draw_pie_chart
+from src.views.display_data import select_base_currency
+
+
+def display_categories(**kwargs):
+    """display form setting categories of an asset
+    and allocation of assets per category"""
+
+    portfolio_contr = kwargs["portfolio_contr"]
+    dimension = st.selectbox(
+        label="Select dimension", options=CATEGORY_DIMENSIONS
+    )
+
+    with st.form(key="set_categories"):
+        code = st.selectbox(
+            label="Select asset",
+            options=sorted(portfolio_contr.portfolio_assets),
+        )
+        category = st.text_input(label=f"Input {dimension}:", key="category")
+
+        if st.form_submit_button("Set category"):
+            categories = {
+                **portfolio_contr.portfolio_categories.get(code, {}),
+                dimension: category,
+            }
+            try:
+                portfolio_contr.set_categories(code, categories)
+                portfolio_contr._save_file_data()
+                st.success("Category set")
+            except (FileNotFoundError, ValueError) as e:
+                st.error(e)
+
+    base, fx_rates = select_base_currency()
+    try:
+        allocation = portfolio_contr.category_allocation(
+            dimension, base, fx_rates
+        )
+    except ValueError as e:
+        st.error(e)
+        return
+
+    st.markdown(f"## Allocation by {dimension}")
+    targets = portfolio_contr.portfolio_targets.get(dimension, {})
+    total = sum(allocation.values())
+    for category, value in sorted(allocation.items()):
+        line = f"{category} : {format_money(value)}"
+        if total > 0:
+            line += f" ({value / total:.2%}"
+            if category in targets:
+                line += f", target {targets[category]:.2%}"
+            line += ")"
+        st.markdown(line)
+
+    positive = {key: value for key, value in allocation.items() if value > 0}
+    if len(positive) > 0:
+        draw_pie_chart(
+            list(positive),
+            list(positive.values()),
+            portfolio_contr.portfolio_version,
+        )
+
+
+def display_rebalance(**kwargs):
+    """display form setting target weights of categories
+    and trades reaching them"""
+
+    portfolio_contr = kwargs["portfolio_contr"]
+    dimension = st.selectbox(
+        label="Select dimension", options=CATEGORY_DIMENSIONS
+    )
+    targets = portfolio_contr.portfolio_targets.get(dimension, {})
+    categories = sorted(
+        set(targets)
+        | {
+            tags[dimension]
+            for tags in portfolio_contr.portfolio_categories.values()
+            if dimension in tags
+        }
+    )
+
+    with st.form(key="set_targets"):
+        weights = {
+            category: st.number_input(
+                label=f"Target weight of {category} (%):",
+                key=f"target_{category}",
+                min_value=0.0,
+                max_value=100.0,
+                value=100 * targets.get(category, 0.0),
+            )
+            / 100
+            for category in categories
+        }
+        if st.form_submit_button("Set targets"):
+            try:
+                portfolio_contr.set_targets(dimension, weights)
+                portfolio_contr._save_file_data()
+                st.success("Targets set")
+            except (FileNotFoundError, ValueError) as e:
+                st.error(e)
+
+    if dimension not in portfolio_contr.portfolio_targets:
+        return
+
+    base, fx_rates = select_base_currency()
+    cash = to_fixed(
+        st.number_input(
+            label="Cash to invest:",
+            key="cash",
+            min_value=0.0,
+            max_value=1e16,
+            format=f"%.{MAX_DECIMAL}f",
+        )
+    )
+    try:
+        rebalancing = portfolio_contr.rebalance(
+            dimension, base, fx_rates, cash
+        )
+    except ValueError as e:
+        st.error(e)
+        return
+
+    st.markdown("## Trades")
+    st.markdown("Type, code, amount, unit price, currency")
+    for trade in rebalancing["trades"]:
+        st.markdown(
+            f"{trade['type']},{trade['code']},{trade['amount']},"
+            + f"{format_money(trade['unit_price'])},{trade['currency']}"
+        )
+    for category, value in rebalancing["unallocated"].items():
+        st.warning(
+            f"No asset of {category} is held to buy "
+            + f"{format_money(value)} of it"
+        )
+
+    if rebalancing["trades"] and st.button("Apply trades"):
+        try:
+            portfolio_contr.apply_transactions(rebalancing["trades"])
+            st.success("Trades applied")
+        except (FileNotFoundError, ValueError) as e:
+            st.error(e)
@@ -1,6 +1,8 @@
 import streamlit as st
 
-from src.settings import MAX_DECIMAL
+from src.models.lots import LOT_METHODS
+from src.models.money import to_fixed
+from src.settings import LOT_MATCHING_METHOD, MAX_DECIMAL
 
 
 def display_add_asset(**kwargs):
@@ -20,7 +22,7 @@ def display_add_asset(**kwargs):
             step=1,
         )
 
-        unit_price = int(
+        unit_price = to_fixed(
             st.number_input(
                 label="Input unit price:",
                 key="unit_price",
@@ -28,7 +30,6 @@ def display_add_asset(**kwargs):
                 max_value=1e16,
                 format=f"%.{MAX_DECIMAL}f",
             )
-            * 10**MAX_DECIMAL
         )
         currency = st.text_input(label="Input currency:", key="currency")
 
@@ -89,7 +90,7 @@ def display_buy_asset(**kwargs):
             step=1,
         )
 
-        unit_price = int(
+        unit_price = to_fixed(
             st.number_input(
                 label="Input unit price:",
                 key="unit_price",
@@ -98,7 +99,6 @@ def display_buy_asset(**kwargs):
                 step=0.01,
                 format=f"%.{MAX_DECIMAL}f",
             )
-            * 10**MAX_DECIMAL
         )
 
         currency = st.text_input(label="Input currency:", key="currency")
@@ -134,7 +134,7 @@ def display_sell_asset(**kwargs):
             step=1,
         )
 
-        unit_price = int(
+        unit_price = to_fixed(
             st.number_input(
                 label="Input unit price:",
                 key="unit_price",
@@ -143,11 +143,18 @@ def display_sell_asset(**kwargs):
                 step=0.01,
                 format=f"%.{MAX_DECIMAL}f",
             )
-            * 10**MAX_DECIMAL
         )
 
         currency = st.text_input(label="Input currency:", key="currency")
 
+        method = st.selectbox(
+            label="Select lot matching method:",
+            options=LOT_METHODS,
+            index=LOT_METHODS.index(LOT_MATCHING_METHOD),
+            key="method",
+        )
+        lot = st.text_input(label="Input id of lot to sell (optional):")
+
         if st.form_submit_button("Sell asset"):
             try:
                 portfolio_contr.sell_asset(
@@ -155,6 +162,8 @@ def display_sell_asset(**kwargs):
                     amount=amount,
                     unit_price=unit_price,
                     currency=currency,
+                    method=method,
+                    lot=int(lot) if lot != "" else None,
                 )
                 portfolio_contr._save_file_data()
                 st.success("Sold asset")
@@ -169,7 +178,7 @@ def display_add_currency(**kwargs):
     with st.form(key="add_currency"):
         currency = st.text_input(label="Input currency:", key="currency")
 
-        amount = (
+        amount = to_fixed(
             st.number_input(
                 label="Input amount of currency to add:",
                 key="amount",
@@ -178,7 +187,6 @@ def display_add_currency(**kwargs):
                 step=0.01,
                 format=f"%.{MAX_DECIMAL}f",
             )
-            * 10**MAX_DECIMAL
         )
 
         if st.form_submit_button("Add currency"):
@@ -197,7 +205,7 @@ def display_remove_currency(**kwargs):
     with st.form(key="add_currency"):
         currency = st.text_input(label="Input currency:", key="currency")
 
-        amount = (
+        amount = to_fixed(
             st.number_input(
                 label="Input amount of currency to sell:",
                 key="amount",
@@ -206,7 +214,6 @@ def display_remove_currency(**kwargs):
                 step=0.01,
                 format=f"%.{MAX_DECIMAL}f",
             )
-            * 10**MAX_DECIMAL
         )
 
         if st.form_submit_button("Remove currency"):
@@ -0,0 +1,128 @@
+import hashlib
+import io
+import threading
+
+import streamlit as st
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional, Sequence
+
+from src.settings import CHART_BACKEND, CHART_CACHE_SIZE
+
+# backends rendering charts: PNG images or Vega-Lite specs
+BACKENDS = ("matplotlib", "altair")
+
+
+def data_hash(*columns: Sequence) -> str:
+    """return digest of values of columns of chart data"""
+
+    digest = hashlib.blake2b(digest_size=16)
+    for column in columns:
+        digest.update(repr([str(value) for value in column]).encode())
+    return digest.hexdigest()
+
+
+class ChartCache:
+    """Rendered charts kept by key of portfolio version, type of chart,
+    backend and hash of data, least recently used ones are dropped
+    when there are more than max_size of them
+
+    Charts are kept as PNG images or Vega-Lite specs, so figures
+    are closed right after they're rendered and nothing but
+    the rendered chart stays in memory.
+    """
+
+    def __init__(self, max_size: int = CHART_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self._charts: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._charts)
+
+    def get(self, key: Hashable, render: Callable[[], Any]) -> Any:
+        """return chart rendered for key, render it if it's not kept"""
+
+        with self._lock:
+            if key in self._charts:
+                self._charts.move_to_end(key)
+                return self._charts[key]
+
+        chart = render()
+        with self._lock:
+            self._charts[key] = chart
+            while len(self._charts) > self.max_size:
+                self._charts.popitem(last=False)
+        return chart
+
+
+def render_pie_png(labels: List[str], values: List[float]) -> bytes:
+    """return PNG image of pie chart, the figure is closed after"""
+
+    # matplotlib is imported only when images are rendered
+    import matplotlib.pyplot as plt
+
+    figure, axes = plt.subplots()
+    try:
+        axes.pie(values, labels=labels, autopct="%1.1f%%", startangle=90)
+        # equal aspect ratio ensures that pie is drawn as a circle
+        axes.axis("equal")
+        image = io.BytesIO()
+        figure.savefig(image, format="png", bbox_inches="tight")
+        return image.getvalue()
+    finally:
+        plt.close(figure)
+
+
+def render_pie_spec(labels: List[str], values: List[float]) -> dict:
+    """return Vega-Lite spec of pie chart"""
+
+    import altair as alt
+
+    # records are inlined as they are, without conversion of a frame
+    total = sum(values)
+    data = alt.Data(
+        values=[
+            {"label": label, "value": value, "share": value / total}
+            for label, value in zip(labels, values)
+        ]
+    )
+    return (
+        alt.Chart(data)
+        .mark_arc()
+        .encode(
+            theta=alt.Theta("value:Q", stack=True),
+            color=alt.Color("label:N", sort=None, title=None),
+            tooltip=["label:N", alt.Tooltip("share:Q", format=".1%")],
+        )
+        .to_dict()
+    )
+
+
+_PIE_RENDERERS = {"matplotlib": render_pie_png, "altair": render_pie_spec}
+
+# charts shared by every rerun of the application in this process
+CHARTS = ChartCache()
+
+
+def draw_pie_chart(
+    codes: List[str],
+    values: List[int],
+    version: Optional[Hashable] = None,
+    backend: str = CHART_BACKEND,
+) -> None:
+    """draws pie chart with codes as labels and given values,
+    rendered once per version of portfolio and data"""
+
+    if backend not in BACKENDS:
+        raise ValueError("Invalid chart backend!")
+
+    values = [float(value) for value in values]
+    chart = CHARTS.get(
+        (version, "pie", backend, data_hash(codes, values)),
+        lambda: _PIE_RENDERERS[backend](list(codes), values),
+    )
+    if backend == "altair":
+        st.vega_lite_chart(chart, use_container_width=True)
+    else:
+        st.image(chart)
@@ -1,60 +1,92 @@
 import streamlit as st
 import json
-import matplotlib.pyplot as plt
+import pandas as pd
 
-from typing import Dict, List
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
 
-from src.settings import MAX_DECIMAL
+from src.controllers.consolidation import CONSOLIDATOR, allocation
+from src.models.fx_rates import FxRates, get_fx_rates
+from src.models.money import Money, format_money
+from src.models.price_history import get_price_history
+from src.models.transaction_columns import SORT_FIELDS
+from src.settings import (
+    BASE_CURRENCY,
+    FX_RATES_PATH,
+    MAX_DECIMAL,
+    PRICE_HISTORY_PATH,
+    PROJECTION_PATHS,
+    TRANSACTIONS_PAGE_SIZE,
+    VAR_CONFIDENCE,
+    VOLATILITY_WINDOW,
+)
+from src.views.charts import draw_pie_chart
 
 
-def draw_pie_chart(codes: List[str], values: List[int]) -> None:
-    """draws pie chart with codes as labels and given values"""
+def display_currencies(
+    currencies: pd.DataFrame, version: Optional[int] = None
+) -> None:
+    """display table of currency balances and pie chart of currencies
+    whose value is positive, compared by their weights"""
 
-    fig1, ax1 = plt.figure(), plt.axes()
+    st.markdown("## Currencies")
+    st.dataframe(currencies)
 
-    ax1.pie(
-        values,
-        labels=codes,
-        autopct="%1.1f%%",
-        startangle=90,
-    )
-    ax1.axis(
-        "equal"
-    )  # Equal aspect ratio ensures that pie is drawn as a circle.
+    positive = currencies["weight"][currencies["weight"] > 0]
+    if len(positive) > 0:
+        draw_pie_chart(list(positive.index), positive.tolist(), version)
 
-    st.pyplot(fig1)
 
+def select_base_currency() -> Tuple[Optional[str], Optional[FxRates]]:
+    """display selection of base currency of values,
+    return it with exchange rates or Nones if rates are not available"""
 
-def display_currencies(currencies: Dict) -> None:
-    """display list of currencies and current amounts
-    Create pie chart of currencies whose amount is positive"""
+    try:
+        fx_rates = get_fx_rates(Path(FX_RATES_PATH))
+    except FileNotFoundError:
+        st.info(f"Add exchange rates to {FX_RATES_PATH} to convert values")
+        return None, None
+    except ValueError as e:
+        st.error(e)
+        return None, None
 
-    st.markdown("## Currencies")
+    options = fx_rates.currencies
+    base = st.sidebar.selectbox(
+        label="Base currency",
+        options=options,
+        index=options.index(BASE_CURRENCY) if BASE_CURRENCY in options else 0,
+    )
+    if base is None:
+        return None, None
+    return base, fx_rates
 
-    positive_currencies_values = []
-    positive_currencies_codes = []
 
-    for c in currencies:
-        st.markdown(f"{c} : {currencies[c] / (10**MAX_DECIMAL)}")
+def valued_holdings(portfolio_contr) -> Dict[str, Any]:
+    """display selection of base currency and total value of portfolio,
+    return tables of holdings valued at last close prices, in base
+    currency if rates are available"""
 
-        if currencies[c] > 0:
-            positive_currencies_values.append(currencies[c])
-            positive_currencies_codes.append(c)
+    price_history = get_price_history(Path(PRICE_HISTORY_PATH))
+    base, fx_rates = select_base_currency()
+    if base is None:
+        return portfolio_contr.holdings_tables(price_history=price_history)
 
-    if len(positive_currencies_values) > 0:
-        draw_pie_chart(positive_currencies_codes, positive_currencies_values)
+    try:
+        tables = portfolio_contr.holdings_tables(base, fx_rates, price_history)
+    except ValueError as e:
+        st.error(e)
+        return portfolio_contr.holdings_tables(price_history=price_history)
 
+    st.markdown(f"Total value: {Money(tables['total'])} {base}")
+    return tables
 
-def display_assets(assets: Dict) -> None:
-    """display list of assets with values per unit"""
 
-    st.markdown("## Assets")
-    for asset in assets:
-        unit_price = assets[asset]["unit_price"] / (10**MAX_DECIMAL)
-        currency = assets[asset]["currency"]
-        amount = assets[asset]["amount"]
+def display_assets(assets: pd.DataFrame) -> None:
+    """display table of assets with unit prices, market values,
+    weights and profits, sortable by every column"""
 
-        st.markdown(f"{amount} {asset}: {unit_price} {currency} per {asset}")
+    st.markdown("## Assets")
+    st.dataframe(assets)
 
 
 def display_portfolio_assets(**kwargs) -> None:
@@ -62,44 +94,327 @@ def display_portfolio_assets(**kwargs) -> None:
 
     portfolio_contr = kwargs["portfolio_contr"]
     try:
-        assets = portfolio_contr.portfolio_assets
+        tables = valued_holdings(portfolio_contr)
     except json.JSONDecodeError:
         st.error("Couldn't load file!")
-    display_assets(assets)
+        return
+    display_assets(tables["assets"])
 
 
 def display_portfolio_currencies(**kwargs) -> None:
-    """display assets from portfolio given in argument"""
+    """display currencies from portfolio given in argument"""
 
     portfolio_contr = kwargs["portfolio_contr"]
     try:
-        currencies = portfolio_contr.portfolio_currencies
+        tables = valued_holdings(portfolio_contr)
     except json.JSONDecodeError:
         st.error("Couldn't load file!")
-    display_currencies(currencies)
+        return
+    display_currencies(tables["currencies"], portfolio_contr.portfolio_version)
 
 
 def display_transaction_history(**kwargs):
-    """display transaction history from portfolio"""
+    """display page of transaction history from portfolio
+    filtered and sorted by chosen fields"""
 
     portfolio_contr = kwargs["portfolio_contr"]
     try:
-        transactions = portfolio_contr.portfolio_transactions
+        columns = portfolio_contr.transaction_columns
     except json.JSONDecodeError:
         st.error("Couldn't load file!")
+        return
 
     st.markdown("### Transaction records")
-    st.markdown("Type, Date, Ticker, amount, unit price, currency")
-
-    for t in reversed(transactions):
-        date = t["date"]
-        transaction_type = t["type"]
-        code = t["code"]
-        unit_price = t["unit_price"] / (10**MAX_DECIMAL)
-        amount = t["amount"]
-        currency = t["currency"]
-
-        st.markdown(
-            f"{transaction_type},{date},{code},"
-            + f"{amount},{unit_price},{currency}"
+    codes = st.multiselect(
+        label="Tickers", options=sorted(columns.codes.names)
+    )
+    types = st.multiselect(label="Types", options=sorted(columns.types.names))
+    start, end = None, None
+    if st.checkbox("Filter by date") and len(columns) > 0:
+        first, last = pd.to_datetime(
+            [columns.dates.min(), columns.dates.max()], unit="s"
+        ).date
+        start = st.date_input(label="From", value=first)
+        end = st.date_input(label="To", value=last)
+    sort = st.selectbox(label="Sort by", options=SORT_FIELDS)
+    descending = st.checkbox("Descending", value=True)
+
+    positions = portfolio_contr.transaction_positions(
+        codes or None, types or None, start, end, sort, descending
+    )
+    pages = max(1, -(-len(positions) // TRANSACTIONS_PAGE_SIZE))
+    page = st.number_input(
+        label=f"Page (of {pages}):", min_value=1, max_value=pages, value=1
+    )
+    frame = portfolio_contr.transaction_page(positions, page - 1)
+
+    st.markdown(f"{len(positions)} transactions")
+    frame["unit_price"] = frame["unit_price"].map(format_money)
+    st.table(frame)
+
+
+def display_lots(**kwargs):
+    """display open lots and realized gains of chosen asset"""
+
+    portfolio_contr = kwargs["portfolio_contr"]
+    code = st.selectbox(
+        label="Select asset",
+        options=sorted(portfolio_contr.portfolio_positions),
+    )
+    if code is None:
+        return
+
+    lots = portfolio_contr.open_lots(code)
+    st.markdown("### Open lots")
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "date": [lot.date for lot in lots],
+                "amount": [lot.amount for lot in lots],
+                "unit_price": [
+                    lot.unit_price / 10**MAX_DECIMAL for lot in lots
+                ],
+                "currency": [lot.currency for lot in lots],
+            },
+            index=pd.Index([lot.id for lot in lots], name="lot"),
         )
+    )
+
+    gains = portfolio_contr.realized_gains(code)
+    st.markdown("### Realized gains")
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "date": [gain.date for gain in gains],
+                "lot": [gain.lot for gain in gains],
+                "amount": [gain.amount for gain in gains],
+                "cost": [gain.cost / 10**MAX_DECIMAL for gain in gains],
+                "proceeds": [
+                    gain.proceeds / 10**MAX_DECIMAL for gain in gains
+                ],
+                "gain": [gain.gain / 10**MAX_DECIMAL for gain in gains],
+            }
+        )
+    )
+
+
+def display_value_series(**kwargs):
+    """display chart of daily value of the portfolio and upload
+    of close prices merged into the price history"""
+
+    portfolio_contr = kwargs["portfolio_contr"]
+    path = Path(PRICE_HISTORY_PATH)
+
+    uploaded = st.file_uploader(
+        "Add close prices (csv with date, code and close columns)",
+        type=["csv"],
+    )
+    if uploaded is not None and st.button("Add prices"):
+        try:
+            history = get_price_history(path).update(pd.read_csv(uploaded))
+        except (ValueError, KeyError) as e:
+            st.error(e)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            history.save(path)
+            st.success(f"Prices saved to {PRICE_HISTORY_PATH}")
+
+    price_history = get_price_history(path)
+    base, fx_rates = select_base_currency()
+    try:
+        series = portfolio_contr.value_series(price_history, base, fx_rates)
+    except ValueError as e:
+        st.error(e)
+        return
+
+    if len(series) == 0:
+        st.markdown("No transactions yet")
+        return
+
+    st.line_chart(series["value"])
+    st.markdown("Net value invested")
+    st.line_chart(series["flow"].cumsum())
+
+
+def display_performance(**kwargs):
+    """display return and risk metrics of the portfolio and its assets"""
+
+    portfolio_contr = kwargs["portfolio_contr"]
+    price_history = get_price_history(Path(PRICE_HISTORY_PATH))
+    base, fx_rates = select_base_currency()
+
+    try:
+        metrics = portfolio_contr.performance_metrics(
+            price_history, base, fx_rates
+        )
+    except ValueError as e:
+        st.error(e)
+        return
+
+    total = metrics["total"]
+    st.markdown(
+        f"Time-weighted return: {total['twr']:.2%}, "
+        + f"money-weighted return: {total['xirr']:.2%} a year"
+    )
+    st.markdown(
+        f"Maximum drawdown: {total['max_drawdown']:.2%}, "
+        + f"volatility: {total['volatility']:.2%}, "
+        + f"Sharpe ratio: {total['sharpe']:.2f}"
+    )
+    st.markdown(f"### Rolling volatility ({VOLATILITY_WINDOW} days)")
+    st.line_chart(metrics["rolling_volatility"])
+    st.markdown("### Assets")
+    st.dataframe(metrics["assets"])
+
+
+def display_consolidated(**kwargs):
+    """display holdings of all portfolios merged together
+    with their allocation in base currency"""
+
+    file_handler = kwargs["file_handler"]
+    bar = st.progress(0)
+
+    def progress(done: int, total: int) -> None:
+        bar.progress(done / total)
+
+    consolidated = CONSOLIDATOR.consolidate(
+        file_handler.portfolios, file_handler.storage, progress
+    )
+    bar.empty()
+
+    st.markdown(f"Holdings of {consolidated['portfolios']} portfolios")
+    for name, error in consolidated["errors"].items():
+        st.error(f"Couldn't load portfolio {name}: {error}")
+
+    # values of assets in every currency they're held in
+    assets = pd.DataFrame.from_dict(
+        {
+            code: {
+                "amount": asset["amount"],
+                **{
+                    currency: value / 10**MAX_DECIMAL
+                    for currency, value in asset["values"].items()
+                },
+            }
+            for code, asset in consolidated["assets"].items()
+        },
+        orient="index",
+    ).sort_index()
+    st.markdown("## Assets")
+    st.dataframe(assets)
+
+    currencies = pd.DataFrame(
+        {
+            "balance": [
+                balance / 10**MAX_DECIMAL
+                for balance in consolidated["currencies"].values()
+            ]
+        },
+        index=list(consolidated["currencies"]),
+    ).sort_index()
+    st.markdown("## Currencies")
+    st.dataframe(currencies)
+
+    base, fx_rates = select_base_currency()
+    if base is None:
+        return
+
+    try:
+        values = allocation(consolidated, base, fx_rates)
+    except ValueError as e:
+        st.error(e)
+        return
+
+    st.markdown(f"Total value: {Money(sum(values.values()))} {base}")
+    positive = {key: value for key, value in values.items() if value > 0}
+    if len(positive) > 0:
+        draw_pie_chart(list(positive), list(positive.values()))
+
+
+def display_projection(**kwargs):
+    """display percentile bands of simulated future value
+    of the portfolio, refined as paths are simulated"""
+
+    portfolio_contr = kwargs["portfolio_contr"]
+    price_history = get_price_history(Path(PRICE_HISTORY_PATH))
+    base, fx_rates = select_base_currency()
+
+    with st.form(key="projection"):
+        years = st.number_input(
+            label="Years:", key="years", min_value=1, max_value=50, value=5
+        )
+        paths = st.number_input(
+            label="Simulated paths:",
+            key="paths",
+            min_value=1000,
+            max_value=10**7,
+            value=PROJECTION_PATHS,
+            step=1000,
+        )
+        if not st.form_submit_button("Project"):
+            return
+
+    try:
+        updates = portfolio_contr.projection(
+            price_history, base, fx_rates, years, paths
+        )
+    except ValueError as e:
+        st.error(e)
+        return
+
+    caption, chart = st.empty(), st.empty()
+    for update in updates:
+        caption.markdown(f"{update['paths']} of {paths} paths simulated")
+        chart.line_chart(
+            pd.DataFrame(
+                {
+                    f"{percentile}th percentile": band / 10**MAX_DECIMAL
+                    for percentile, band in update["bands"].items()
+                },
+                index=pd.Index(update["steps"], name="trading days"),
+            )
+        )
+
+
+def display_risk(**kwargs):
+    """display Value-at-Risk and expected shortfall of the portfolio
+    with contribution of every asset to the risk"""
+
+    portfolio_contr = kwargs["portfolio_contr"]
+    price_history = get_price_history(Path(PRICE_HISTORY_PATH))
+    base, fx_rates = select_base_currency()
+    confidence = st.select_slider(
+        label="Confidence",
+        options=(0.9, 0.95, 0.975, 0.99, 0.995),
+        value=VAR_CONFIDENCE,
+    )
+    horizon = st.number_input(
+        label="Horizon (trading days):", min_value=1, max_value=250, value=1
+    )
+
+    try:
+        risk = portfolio_contr.risk(
+            price_history, base, fx_rates, confidence, horizon
+        )
+    except ValueError as e:
+        st.error(e)
+        return
+
+    def money(value: float) -> str:
+        return format_money(round(value))
+
+    st.markdown(f"Value of assets with price history: {money(risk['value'])}")
+    st.markdown(
+        f"Historical VaR: {money(risk['historical_var'])}, "
+        + f"expected shortfall: {money(risk['historical_es'])}"
+    )
+    st.markdown(
+        f"Parametric VaR: {money(risk['parametric_var'])}, "
+        + f"expected shortfall: {money(risk['parametric_es'])}"
+    )
+
+    st.markdown("### Contributions to parametric VaR")
+    contributions = pd.Series(
+        risk["contributions"] / 10**MAX_DECIMAL, index=risk["codes"]
+    ).sort_values(ascending=False)
+    st.bar_chart(contributions)
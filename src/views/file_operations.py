@@ -1,6 +1,9 @@
 import streamlit as st
 
-from json import JSONDecodeError
+from json import JSONDecodeError, dumps
+
+from src.controllers.csv_importer import DEFAULT_COLUMNS, CsvImporter
+from src.models.portfolio import record_to_dict
 
 
 def display_create_portfolio(**kwargs):
@@ -23,21 +26,17 @@ def display_create_portfolio(**kwargs):
 def display_download_portfolio(**kwargs):
     """display download button for downloading portfolio"""
 
-    file_handler = kwargs["file_handler"]
-    name = kwargs["portfolio_contr"].portfolio_name
-
-    try:
-        portfolio_path = file_handler.get_portfolio_path(name)
-    except FileNotFoundError as e:
-        st.error(e)
-
-    with open(portfolio_path, "r") as file:
-        st.download_button(
-            label="Download portfolio",
-            data=file,
-            file_name=f"{name}.json",
-            mime="application/json",
-        )
+    portfolio_contr = kwargs["portfolio_contr"]
+    name = portfolio_contr.portfolio_name
+
+    # portfolio file may not contain changes from the journal yet,
+    # so current data is serialized instead
+    st.download_button(
+        label="Download portfolio",
+        data=dumps(portfolio_contr.portfolio_data, default=record_to_dict),
+        file_name=f"{name}.json",
+        mime="application/json",
+    )
 
 
 def display_upload_portfolio(**kwargs):
@@ -81,3 +80,50 @@ def display_remove_portfolio(**kwargs):
                 st.experimental_rerun()
             except (FileNotFoundError, ValueError) as e:
                 st.error(e)
+
+
+def display_import_csv(**kwargs):
+    """display form for importing trades from csv broker statement"""
+
+    portfolio_contr = kwargs["portfolio_contr"]
+    with st.form(key="Import csv", clear_on_submit=True):
+        uploaded_file = st.file_uploader(
+            label="Upload broker statement in csv format",
+            type=["csv"],
+            accept_multiple_files=False,
+        )
+
+        with st.expander("Columns of the file"):
+            columns = {
+                field: st.text_input(f"Column with {field}:", value=name)
+                for field, name in DEFAULT_COLUMNS.items()
+            }
+            delimiter = st.text_input("Delimiter:", value=",", max_chars=1)
+            date_format = st.text_input(
+                "Date format (empty for ISO 8601):", value=""
+            )
+
+        if st.form_submit_button("Import"):
+            if uploaded_file is None:
+                st.error("File is empty!")
+                return
+            try:
+                importer = CsvImporter(
+                    columns=columns,
+                    date_format=date_format or None,
+                    delimiter=delimiter or ",",
+                )
+                report = importer.import_file(uploaded_file, portfolio_contr)
+            except (UnicodeDecodeError, ValueError) as e:
+                st.error(e)
+                return
+
+            st.success(
+                f"Imported {report['imported']} transactions "
+                + f"({report['per_second']:.0f} per second)"
+            )
+            if report["failed"] > 0:
+                st.warning(f"{report['failed']} rows couldn't be imported")
+                st.markdown("Line, error")
+                for line, error in report["errors"]:
+                    st.markdown(f"{line}, {error}")
@@ -1,44 +1,46 @@
+import importlib
 import streamlit as st
 
-from src.views.assets_operations import (
-    display_add_asset,
-    display_add_currency,
-    display_buy_asset,
-    display_remove_asset,
-    display_remove_currency,
-    display_sell_asset,
-)
-
-from src.views.display_data import (
-    display_portfolio_assets,
-    display_portfolio_currencies,
-    display_transaction_history,
-)
-from src.views.file_operations import (
-    display_create_portfolio,
-    display_download_portfolio,
-    display_remove_portfolio,
-    display_upload_portfolio,
-)
-
+from typing import Callable
 
+# module of src.views and function of every operation, modules
+# are imported on first use of one of their operations
 OPERATIONS = {
-    "Display assets": display_portfolio_assets,
-    "Display currencies": display_portfolio_currencies,
-    "Show transaction history": display_transaction_history,
-    "Buy asset": display_buy_asset,
-    "Sell asset": display_sell_asset,
-    "Add currency": display_add_currency,
-    "Remove currency": display_remove_currency,
-    "Add asset": display_add_asset,
-    "Remove asset": display_remove_asset,
-    "Download portfolio": display_download_portfolio,
-    "Create new portfolio": display_create_portfolio,
-    "Upload portfolio": display_upload_portfolio,
-    "Remove portfolio": display_remove_portfolio,
+    "Display assets": ("display_data", "display_portfolio_assets"),
+    "Display currencies": ("display_data", "display_portfolio_currencies"),
+    "Show transaction history": (
+        "display_data",
+        "display_transaction_history",
+    ),
+    "Show lots and realized gains": ("display_data", "display_lots"),
+    "Show portfolio value": ("display_data", "display_value_series"),
+    "Show performance": ("display_data", "display_performance"),
+    "Projection": ("display_data", "display_projection"),
+    "Show risk": ("display_data", "display_risk"),
+    "Show all portfolios": ("display_data", "display_consolidated"),
+    "Categories and allocation": ("allocation", "display_categories"),
+    "Target allocation and rebalancing": ("allocation", "display_rebalance"),
+    "Buy asset": ("assets_operations", "display_buy_asset"),
+    "Sell asset": ("assets_operations", "display_sell_asset"),
+    "Add currency": ("assets_operations", "display_add_currency"),
+    "Remove currency": ("assets_operations", "display_remove_currency"),
+    "Add asset": ("assets_operations", "display_add_asset"),
+    "Remove asset": ("assets_operations", "display_remove_asset"),
+    "Import csv statement": ("file_operations", "display_import_csv"),
+    "Download portfolio": ("file_operations", "display_download_portfolio"),
+    "Create new portfolio": ("file_operations", "display_create_portfolio"),
+    "Upload portfolio": ("file_operations", "display_upload_portfolio"),
+    "Remove portfolio": ("file_operations", "display_remove_portfolio"),
 }
 
 
+def get_operation(operation: str) -> Callable:
+    """return view function of operation, importing its module"""
+
+    module, function = OPERATIONS[operation]
+    return getattr(importlib.import_module(f"src.views.{module}"), function)
+
+
 def display_sidebar_menu(portfolio_contr, file_handler):
     """display the sidebar with options and executes chosen one"""
 
@@ -47,7 +49,7 @@ def display_sidebar_menu(portfolio_contr, file_handler):
     )
 
     if operation in OPERATIONS:
-        OPERATIONS[operation](
+        get_operation(operation)(
             portfolio_contr=portfolio_contr, file_handler=file_handler
         )
 
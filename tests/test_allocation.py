@@ -0,0 +1,184 @@
+import unittest
+
+from pathlib import Path
+
+from src.controllers.file_handler import FileHandler
+from src.controllers.portfolio_controller import PortfolioController
+from src.controllers.storage import JsonStorage
+from src.models.allocation import UNCATEGORIZED, CategoryAllocation
+from src.models.fx_rates import FxRates
+from src.models.money import to_fixed
+from tests.utility import rm_tree
+
+TESTING_PATH = Path("tests/test_data")
+
+
+class TestAllocation(unittest.TestCase):
+    def setUp(self) -> None:
+        TESTING_PATH.mkdir(exist_ok=True)
+        self.storage = JsonStorage(journaled=True)
+        file_handler = FileHandler(
+            TESTING_PATH, portfolios={}, storage=self.storage
+        )
+        file_handler.create_empty_portfolio("test")
+        self.test_file_path = file_handler.get_portfolio_path("test")
+        self.portfolio_controller = PortfolioController(
+            self.test_file_path, "test", storage=self.storage
+        )
+
+        self.portfolio_controller.update_balance(to_fixed(1000), "USD")
+        for code, amount, category in (
+            ("AAA", 60, "stocks"),
+            ("BBB", 30, "stocks"),
+            ("CCC", 10, "bonds"),
+        ):
+            self.portfolio_controller.add_asset(
+                code, to_fixed(1), amount, "USD"
+            )
+            self.portfolio_controller.set_categories(
+                code, {"asset class": category}
+            )
+        return super().setUp()
+
+    def rebuilt(self) -> CategoryAllocation:
+        return CategoryAllocation(
+            self.portfolio_controller.portfolio_assets,
+            self.portfolio_controller.portfolio_categories,
+        )
+
+    def test_incremental_allocation(self) -> None:
+        """trade and categorize assets after allocation was computed
+
+        should keep allocation equal to the one computed from scratch
+        """
+
+        self.assertEqual(
+            {"stocks": to_fixed(90), "bonds": to_fixed(10)},
+            self.portfolio_controller.category_allocation("asset class"),
+        )
+
+        self.portfolio_controller.buy_asset("CCC", to_fixed(2), 5, "USD")
+        self.portfolio_controller.sell_asset("BBB", to_fixed(1), 30, "USD")
+        self.portfolio_controller.add_asset("DDD", to_fixed(3), 1, "USD")
+        self.portfolio_controller.set_categories(
+            "AAA", {"asset class": "stocks", "region": "EU"}
+        )
+        self.portfolio_controller.apply_transactions(
+            [
+                {
+                    "type": "SELL",
+                    "code": "AAA",
+                    "unit_price": to_fixed(1),
+                    "amount": 10,
+                    "currency": "USD",
+                }
+            ],
+            save=False,
+        )
+
+        for dimension in ("asset class", "region"):
+            self.assertEqual(
+                self.rebuilt().by_category(dimension),
+                self.portfolio_controller.category_allocation(dimension),
+            )
+        self.assertEqual(
+            {
+                "stocks": to_fixed(50),
+                "bonds": to_fixed(30),
+                UNCATEGORIZED: to_fixed(3),
+            },
+            self.portfolio_controller.category_allocation("asset class"),
+        )
+        self.assertEqual(
+            {"EU": to_fixed(50), UNCATEGORIZED: to_fixed(33)},
+            self.portfolio_controller.category_allocation("region"),
+        )
+
+    def test_allocation_in_base_currency(self) -> None:
+        """compute allocation of assets in many currencies
+
+        should convert values to base currency
+        """
+
+        self.portfolio_controller.add_asset("EEE", to_fixed(1), 10, "EUR")
+        self.portfolio_controller.set_categories(
+            "EEE", {"asset class": "bonds"}
+        )
+        fx_rates = FxRates([("2022-01-01", "EUR", "USD", 2.0)])
+
+        self.assertEqual(
+            {"stocks": to_fixed(90), "bonds": to_fixed(30)},
+            self.portfolio_controller.category_allocation(
+                "asset class", "USD", fx_rates
+            ),
+        )
+
+    def test_targets(self) -> None:
+        """set valid and invalid target weights and save them
+
+        should keep valid targets and categories in saved portfolio
+        """
+
+        self.assertRaises(
+            ValueError,
+            self.portfolio_controller.set_targets,
+            "asset class",
+            {"stocks": 0.5, "bonds": 0.4},
+        )
+        self.assertRaises(
+            ValueError,
+            self.portfolio_controller.set_targets,
+            "asset class",
+            {"stocks": 1.5, "bonds": -0.5},
+        )
+
+        self.portfolio_controller.set_targets(
+            "asset class", {"stocks": 0.5, "bonds": 0.5}
+        )
+        self.portfolio_controller._save_file_data()
+
+        loaded = self.storage.load(self.test_file_path)
+        self.assertEqual(
+            {"stocks": 0.5, "bonds": 0.5}, loaded["targets"]["asset class"]
+        )
+        self.assertEqual({"asset class": "bonds"}, loaded["categories"]["CCC"])
+
+    def test_rebalance(self) -> None:
+        """rebalance assets to targets with cash invested
+
+        should sell largest holdings of categories above targets,
+        buy categories below them and reach the targets
+        """
+
+        self.portfolio_controller.set_targets(
+            "asset class", {"stocks": 0.5, "bonds": 0.3, "cash": 0.2}
+        )
+
+        rebalancing = self.portfolio_controller.rebalance(
+            "asset class", cash=to_fixed(20)
+        )
+
+        self.assertEqual(
+            [("SELL", "AAA", 30), ("BUY", "CCC", 26)],
+            [
+                (trade["type"], trade["code"], trade["amount"])
+                for trade in rebalancing["trades"]
+            ],
+        )
+        self.assertEqual({"cash": to_fixed(24)}, rebalancing["unallocated"])
+
+        self.portfolio_controller.apply_transactions(
+            rebalancing["trades"], save=False
+        )
+        self.assertEqual(
+            {"stocks": to_fixed(60), "bonds": to_fixed(36)},
+            self.portfolio_controller.category_allocation("asset class"),
+        )
+
+    def tearDown(self) -> None:
+        rm_tree(TESTING_PATH)
+        return super().tearDown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+import random
+import unittest
+
+from pathlib import Path
+
+from src.controllers.file_handler import FileHandler
+from src.controllers.portfolio_controller import PortfolioController
+from src.controllers.storage import JsonStorage
+from tests.utility import rm_tree
+
+TESTING_PATH = Path("tests/test_data")
+
+
+class TestBatchTransactions(unittest.TestCase):
+    def setUp(self) -> None:
+        TESTING_PATH.mkdir(exist_ok=True)
+
+        self.storage = JsonStorage(journaled=True)
+        file_handler = FileHandler(
+            TESTING_PATH, portfolios={}, storage=self.storage
+        )
+        file_handler.create_empty_portfolio("test")
+        self.test_file_path = file_handler.get_portfolio_path("test")
+        self.portfolio_controller = PortfolioController(
+            self.test_file_path, "test", storage=self.storage
+        )
+
+        rng = random.Random(0)
+        held = {}
+        self.batch = []
+        for day in range(1, 29):
+            code = rng.choice(("AAA", "BBB", "CCC"))
+            if held.get(code, 0) > 0 and rng.random() < 0.4:
+                trade_type, amount = "SELL", rng.randint(1, held[code])
+                held[code] -= amount
+            else:
+                trade_type, amount = "BUY", rng.randint(1, 10)
+                held[code] = held.get(code, 0) + amount
+            self.batch.append(
+                {
+                    "date": f"2022-01-{day:02d}T10:00:00",
+                    "type": trade_type,
+                    "code": code,
+                    "unit_price": rng.randint(1, 100),
+                    "amount": amount,
+                    "currency": "USD" if code != "CCC" else "EUR",
+                }
+            )
+
+        return super().setUp()
+
+    def test_equal_to_single_trades(self) -> None:
+        """apply batch of trades and the same trades one by one
+
+        should result in equal assets, currencies and positions
+        """
+
+        expected = PortfolioController(Path("/"), "expected")
+        for trade in self.batch:
+            operation = (
+                expected.buy_asset
+                if trade["type"] == "BUY"
+                else expected.sell_asset
+            )
+            operation(
+                trade["code"],
+                trade["unit_price"],
+                trade["amount"],
+                trade["currency"],
+            )
+
+        report = self.portfolio_controller.apply_transactions(self.batch)
+
+        self.assertEqual(len(self.batch), report["transactions"])
+        self.assertGreater(report["per_second"], 0)
+        for section in ("assets", "currencies", "positions"):
+            self.assertEqual(
+                expected.portfolio_data[section],
+                self.portfolio_controller.portfolio_data[section],
+            )
+        self.assertEqual(
+            [trade["date"] for trade in self.batch],
+            [
+                t["date"]
+                for t in self.portfolio_controller.portfolio_transactions
+            ],
+        )
+
+    def test_single_write(self) -> None:
+        """apply batch of trades to journaled portfolio
+
+        should save all of the trades in one journal record
+        """
+
+        self.portfolio_controller.apply_transactions(self.batch)
+
+        self.assertEqual(1, self.storage.journal(self.test_file_path).records)
+        loaded = PortfolioController(
+            self.test_file_path, "test", storage=self.storage
+        )
+        self.assertEqual(
+            self.portfolio_controller.portfolio_data, loaded.portfolio_data
+        )
+
+    def test_large_batch(self) -> None:
+        """apply batch with more trades than one journal record keeps
+
+        should write whole portfolio to file and leave the journal empty
+        """
+
+        storage = JsonStorage(journaled=True, record_transactions=10)
+        self.portfolio_controller = PortfolioController(
+            self.test_file_path, "test", storage=storage
+        )
+        self.portfolio_controller.apply_transactions(self.batch)
+
+        self.assertEqual(0, storage.journal(self.test_file_path).records)
+        loaded = PortfolioController(
+            self.test_file_path, "test", storage=JsonStorage(journaled=True)
+        )
+        self.assertEqual(
+            self.portfolio_controller.portfolio_data, loaded.portfolio_data
+        )
+
+    def test_offset_dates(self) -> None:
+        """apply trades with dates with UTC offset
+
+        should save the dates converted to UTC
+        """
+
+        self.batch[0]["date"] = "2022-01-01T23:00:00-05:00"
+        self.batch[1]["date"] = "2022-01-02T01:00:00+02:00"
+        self.portfolio_controller.apply_transactions(self.batch)
+
+        transactions = self.portfolio_controller.portfolio_transactions
+        self.assertEqual(
+            ["2022-01-02T04:00:00", "2022-01-01T23:00:00"],
+            [transaction.date for transaction in transactions[:2]],
+        )
+
+    def test_invalid_batch(self) -> None:
+        """apply batch with one trade selling more than held
+
+        should raise ValueError and leave portfolio unchanged
+        """
+
+        self.batch.append(
+            {
+                "type": "SELL",
+                "code": "AAA",
+                "unit_price": 1,
+                "amount": 10**6,
+                "currency": "USD",
+            }
+        )
+
+        self.assertRaises(
+            ValueError,
+            self.portfolio_controller.apply_transactions,
+            self.batch,
+        )
+        self.assertEqual({}, self.portfolio_controller.portfolio_assets)
+        self.assertEqual([], self.portfolio_controller.portfolio_transactions)
+        self.assertEqual(0, self.storage.journal(self.test_file_path).records)
+
+    def test_sell_lot_of_batch(self) -> None:
+        """sell lot bought in the same batch, then more than is left of it
+
+        should apply the first batch and reject the second one
+        """
+
+        trade = {"code": "AAA", "unit_price": 1, "currency": "USD"}
+        self.portfolio_controller.apply_transactions(
+            [
+                {**trade, "type": "BUY", "amount": 5},
+                {**trade, "type": "BUY", "amount": 5},
+                {**trade, "type": "SELL", "amount": 3, "lot": 1},
+            ]
+        )
+        self.assertEqual(
+            [5, 2],
+            [lot.amount for lot in self.portfolio_controller.open_lots("AAA")],
+        )
+
+        self.assertRaises(
+            ValueError,
+            self.portfolio_controller.apply_transactions,
+            [{**trade, "type": "SELL", "amount": 3, "lot": 1}],
+        )
+
+    def tearDown(self) -> None:
+        rm_tree(TESTING_PATH)
+        return super().tearDown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+import matplotlib.pyplot as plt
+
+from src.views.charts import (
+    ChartCache,
+    data_hash,
+    render_pie_png,
+    render_pie_spec,
+)
+
+
+class TestCharts(unittest.TestCase):
+    def test_chart_cache(self) -> None:
+        """get more charts than the cache keeps and one of them again
+
+        should render every chart once and drop least recently used ones
+        """
+
+        cache = ChartCache(max_size=2)
+        renders = []
+
+        def render(key):
+            renders.append(key)
+            return key
+
+        for key in ("a", "b", "a", "c", "a", "b"):
+            cache.get(key, lambda key=key: render(key))
+
+        self.assertEqual(["a", "b", "c", "b"], renders)
+        self.assertEqual(2, len(cache))
+
+    def test_render_pie(self) -> None:
+        """render pie chart as PNG image and as Vega-Lite spec
+
+        should close the figure and serialize data in the spec
+        """
+
+        png = render_pie_png(["USD", "EUR"], [3.0, 1.0])
+        self.assertTrue(png.startswith(b"\x89PNG"))
+        self.assertEqual([], plt.get_fignums())
+
+        spec = render_pie_spec(["USD", "EUR"], [3.0, 1.0])
+        self.assertEqual("arc", spec["mark"])
+        self.assertEqual(
+            [0.75, 0.25], [row["share"] for row in spec["data"]["values"]]
+        )
+
+        self.assertEqual(data_hash(["USD"], [1.0]), data_hash(["USD"], [1.0]))
+        self.assertNotEqual(
+            data_hash(["USD"], [1.0]), data_hash(["EUR"], [1.0])
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
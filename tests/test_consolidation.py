@@ -0,0 +1,132 @@
+import unittest
+
+from pathlib import Path
+
+from src.controllers.consolidation import Consolidator, allocation
+from src.controllers.file_handler import FileHandler
+from src.controllers.portfolio_controller import PortfolioController
+from src.controllers.storage import JsonStorage, SqliteStorage
+from src.models.fx_rates import FxRates
+from src.models.money import to_fixed
+from tests.utility import rm_tree
+
+TESTING_PATH = Path("tests/test_data")
+
+
+class TestConsolidation(unittest.TestCase):
+    def setUp(self) -> None:
+        TESTING_PATH.mkdir(exist_ok=True)
+        self.storage = JsonStorage()
+        self.file_handler = FileHandler(
+            TESTING_PATH, portfolios={}, storage=self.storage
+        )
+        for i in range(10):
+            name = f"test{i}"
+            self.file_handler.create_empty_portfolio(name)
+            portfolio_contr = PortfolioController(
+                self.file_handler.get_portfolio_path(name),
+                name,
+                storage=self.storage,
+            )
+            portfolio_contr.update_balance(to_fixed(100), "USD")
+            portfolio_contr.add_asset("AAA", to_fixed(2), i + 1, "USD")
+            if i % 2 == 0:
+                portfolio_contr.add_asset("BBB", to_fixed(1), 1, "EUR")
+            portfolio_contr._save_file_data()
+        return super().setUp()
+
+    def test_consolidate(self) -> None:
+        """consolidate portfolios in worker processes and in main one
+
+        should sum amounts, values and balances of all portfolios
+        """
+
+        portfolios = self.file_handler.portfolios
+        pooled = Consolidator(workers=2, chunk_size=3).consolidate(
+            portfolios, self.storage
+        )
+        inline = Consolidator(workers=0).consolidate(portfolios, self.storage)
+
+        self.assertEqual(pooled, inline)
+        self.assertEqual(10, pooled["portfolios"])
+        self.assertEqual({}, pooled["errors"])
+        self.assertEqual(
+            {"amount": 55, "values": {"USD": to_fixed(110)}},
+            pooled["assets"]["AAA"],
+        )
+        self.assertEqual(
+            {"amount": 5, "values": {"EUR": to_fixed(5)}},
+            pooled["assets"]["BBB"],
+        )
+        self.assertEqual({"USD": to_fixed(1000)}, pooled["currencies"])
+
+        fx_rates = FxRates([("2022-01-01", "EUR", "USD", 2.0)])
+        self.assertEqual(
+            {"AAA": to_fixed(110), "BBB": to_fixed(10), "USD": to_fixed(1000)},
+            allocation(pooled, "USD", fx_rates),
+        )
+
+    def test_reload_changed(self) -> None:
+        """consolidate portfolios again after changing and removing some
+
+        should load only changed portfolios and report invalid ones
+        """
+
+        consolidator = Consolidator(workers=0, chunk_size=3)
+        loads = []
+
+        def progress(done, total):
+            loads.append((done, total))
+
+        consolidator.consolidate(self.file_handler.portfolios, self.storage)
+        consolidator.consolidate(
+            self.file_handler.portfolios, self.storage, progress
+        )
+        self.assertEqual([], loads)
+
+        path = self.file_handler.get_portfolio_path("test1")
+        portfolio_contr = PortfolioController(
+            path, "test1", storage=self.storage
+        )
+        portfolio_contr.add_asset("CCC", to_fixed(1), 7, "USD")
+        portfolio_contr._save_file_data()
+        with open(self.file_handler.get_portfolio_path("test2"), "w") as file:
+            file.write("{")
+        del self.file_handler.portfolios["test3"]
+
+        consolidated = consolidator.consolidate(
+            self.file_handler.portfolios, self.storage, progress
+        )
+
+        self.assertEqual([(2, 2)], loads)
+        self.assertEqual(8, consolidated["portfolios"])
+        self.assertEqual(["test2"], list(consolidated["errors"]))
+        self.assertEqual(7, consolidated["assets"]["CCC"]["amount"])
+        self.assertEqual(55 - 3 - 4, consolidated["assets"]["AAA"]["amount"])
+
+    def test_sqlite_holdings(self) -> None:
+        """consolidate portfolio stored in sqlite database
+
+        should load its assets and currencies
+        """
+
+        storage = SqliteStorage()
+        path = TESTING_PATH / "test.sqlite3"
+        storage.write(
+            path, self.storage.load(self.file_handler.portfolios["test4"])
+        )
+
+        consolidated = Consolidator(workers=0).consolidate(
+            {"test": path}, storage
+        )
+
+        self.assertEqual(5, consolidated["assets"]["AAA"]["amount"])
+        self.assertEqual({"USD": to_fixed(100)}, consolidated["currencies"])
+
+    def tearDown(self) -> None:
+        rm_tree(TESTING_PATH)
+        return super().tearDown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import unittest
+
+from pathlib import Path
+
+from src.controllers.csv_importer import CsvImporter
+from src.controllers.file_handler import FileHandler
+from src.controllers.portfolio_controller import PortfolioController
+from src.controllers.storage import JsonStorage
+from src.settings import MAX_DECIMAL
+from tests.utility import rm_tree
+
+TESTING_PATH = Path("tests/test_data")
+
+
+class TestCsvImporter(unittest.TestCase):
+    def setUp(self) -> None:
+        TESTING_PATH.mkdir(exist_ok=True)
+
+        self.storage = JsonStorage(journaled=True)
+        self.file_handler = FileHandler(
+            TESTING_PATH, portfolios={}, storage=self.storage
+        )
+        self.file_handler.create_empty_portfolio("test")
+        self.test_file_path = self.file_handler.get_portfolio_path("test")
+        self.portfolio_controller = PortfolioController(
+            self.test_file_path, "test", storage=self.storage
+        )
+        self.csv_path = TESTING_PATH / "statement.csv"
+
+        return super().setUp()
+
+    def _write_csv(self, lines) -> None:
+        with open(self.csv_path, "w") as file:
+            file.write("\n".join(lines) + "\n")
+
+    def _import(self, importer: CsvImporter):
+        with open(self.csv_path, "rb") as file:
+            return importer.import_file(file, self.portfolio_controller)
+
+    def test_import(self) -> None:
+        """import statement with trades in many chunks
+
+        should apply all trades and save portfolio once
+        """
+
+        lines = ["date,type,code,unit_price,amount,currency"]
+        for day in range(1, 29):
+            lines.append(f"2022-01-{day:02d}T10:00:00,BUY,AAA,10.5,2,usd")
+            lines.append(f"2022-02-{day:02d} 10:00:00,SELL,AAA,11.25,1,usd")
+        self._write_csv(lines)
+
+        for workers in (0, 2):
+            self.file_handler.create_empty_portfolio(f"test{workers}")
+            self.portfolio_controller = PortfolioController(
+                self.file_handler.get_portfolio_path(f"test{workers}"),
+                f"test{workers}",
+                storage=self.storage,
+            )
+            report = self._import(CsvImporter(chunk_size=5, workers=workers))
+
+            self.assertEqual(56, report["imported"])
+            self.assertEqual([], report["errors"])
+            self.assertEqual(
+                28, self.portfolio_controller.portfolio_assets["AAA"].amount
+            )
+            self.assertEqual(
+                int(28 * (11.25 - 21) * 10**MAX_DECIMAL),
+                self.portfolio_controller.portfolio_currencies["USD"],
+            )
+            self.assertEqual(
+                "2022-02-28T10:00:00",
+                self.portfolio_controller.portfolio_transactions[-1].date,
+            )
+
+    def test_offset_dates(self) -> None:
+        """import statement with dates with UTC offset
+
+        should save the dates converted to UTC
+        """
+
+        self._write_csv(
+            [
+                "date,type,code,unit_price,amount,currency",
+                "2022-01-01T23:00:00-05:00,BUY,AAA,10,2,USD",
+                "2022-01-02 09:30:00+09:00,BUY,AAA,10,2,USD",
+            ]
+        )
+        report = self._import(CsvImporter(workers=0))
+
+        transactions = self.portfolio_controller.portfolio_transactions
+        self.assertEqual([], report["errors"])
+        self.assertEqual(
+            ["2022-01-02T04:00:00", "2022-01-02T00:30:00"],
+            [transaction.date for transaction in transactions],
+        )
+
+    def test_column_mapping(self) -> None:
+        """import statement with custom columns, types and date format
+
+        should map the columns to transaction fields
+        """
+
+        self._write_csv(
+            [
+                "Trade Date;Side;Ticker;Qty;Price;Ccy",
+                "03/01/2022;B;XYZ;3;100;EUR",
+            ]
+        )
+        importer = CsvImporter(
+            columns={
+                "date": "Trade Date",
+                "type": "Side",
+                "code": "Ticker",
+                "amount": "Qty",
+                "unit_price": "Price",
+                "currency": "Ccy",
+            },
+            date_format="%d/%m/%Y",
+            delimiter=";",
+            workers=0,
+        )
+
+        self.assertEqual(1, self._import(importer)["imported"])
+        transaction = self.portfolio_controller.portfolio_transactions[0]
+        self.assertEqual("2022-01-03T00:00:00", transaction.date)
+        self.assertEqual(100 * 10**MAX_DECIMAL, transaction.unit_price)
+
+    def test_error_report(self) -> None:
+        """import statement with invalid rows
+
+        should import valid rows and report lines of invalid ones
+        """
+
+        self._write_csv(
+            [
+                "date,type,code,unit_price,amount,currency",
+                "2022-01-01,BUY,AAA,10,5,USD",
+                "2022-01-02,GIFT,AAA,10,5,USD",
+                "2022-01-03,SELL,AAA,10,7,USD",
+                "2022-01-04,BUY,AAA,ten,5,USD",
+                "2022-01-05,SELL,AAA,10,5,USD",
+            ]
+        )
+
+        report = self._import(CsvImporter(workers=0))
+
+        self.assertEqual(2, report["imported"])
+        self.assertEqual(3, report["failed"])
+        self.assertEqual([3, 4, 5], [line for line, _ in report["errors"]])
+        self.assertEqual({}, self.portfolio_controller.portfolio_assets)
+
+        loaded = PortfolioController(
+            self.test_file_path, "test", storage=self.storage
+        )
+        self.assertEqual(2, len(loaded.portfolio_transactions))
+
+    def test_missing_column(self) -> None:
+        """import statement without required column
+
+        should raise ValueError
+        """
+
+        self._write_csv(["date,type,code,amount,currency"])
+
+        self.assertRaises(ValueError, self._import, CsvImporter(workers=0))
+
+    def tearDown(self) -> None:
+        rm_tree(TESTING_PATH)
+        return super().tearDown()
+
+
+if __name__ == "__main__":
+    unittest.main()
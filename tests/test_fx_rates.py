@@ -0,0 +1,109 @@
+import json
+import os
+import unittest
+
+import numpy as np
+from pathlib import Path
+
+from src.controllers.portfolio_controller import PortfolioController
+from src.models.fx_rates import FxRates, get_fx_rates
+from src.models.money import to_fixed
+from tests.utility import rm_tree
+
+TESTING_PATH = Path("tests/test_data")
+
+
+class TestFxRates(unittest.TestCase):
+    def setUp(self) -> None:
+        TESTING_PATH.mkdir(exist_ok=True)
+        self.rows = [
+            ("2022-01-01", "EUR", "USD", 1.2),
+            ("2022-02-01", "EUR", "USD", 1.1),
+            ("2022-01-01", "GBP", "USD", 1.5),
+        ]
+        self.fx_rates = FxRates(self.rows)
+        self.portfolio_controller = PortfolioController(Path("/"), "test")
+        return super().setUp()
+
+    def test_historical_rate(self) -> None:
+        """get rates at dates between rates of the table
+
+        should return last rate known at the date
+        """
+
+        self.assertEqual(1.2, self.fx_rates.rate("EUR", "USD", "2022-01-31"))
+        self.assertEqual(1.1, self.fx_rates.rate("EUR", "USD", "2022-02-01"))
+        self.assertEqual(1.1, self.fx_rates.rate("EUR", "USD"))
+        self.assertRaises(
+            ValueError, self.fx_rates.rate, "EUR", "USD", "2021-12-31"
+        )
+
+    def test_derived_rates(self) -> None:
+        """get rates of inverse pair and pair without common rate
+
+        should convert through inverse and common currency
+        """
+
+        self.assertAlmostEqual(1 / 1.1, self.fx_rates.rate("USD", "EUR"))
+        self.assertAlmostEqual(
+            1.5 / 1.2, self.fx_rates.rate("GBP", "EUR", "2022-01-15")
+        )
+        self.assertRaises(ValueError, self.fx_rates.rate, "PLN", "USD")
+
+    def test_lower_case_currencies(self) -> None:
+        """get rates and series of rates of currencies in lower case
+
+        should return rates of the same currencies in upper case
+        """
+
+        self.assertEqual(1.1, self.fx_rates.rate("eur", "Usd"))
+        self.assertEqual(1.0, self.fx_rates.rate("usd", "USD"))
+        self.assertEqual(
+            [1.2, 1.1],
+            self.fx_rates.rate_series(
+                "eur", "usd", np.array([19000, 19100])
+            ).tolist(),
+        )
+
+    def test_load_files(self) -> None:
+        """load rates from csv and json files
+
+        should load equal rates and reload changed file
+        """
+
+        csv_path = TESTING_PATH / "rates.csv"
+        with open(csv_path, "w") as file:
+            file.write("date,base,quote,rate\n")
+            for row in self.rows:
+                file.write(",".join(map(str, row)) + "\n")
+
+        json_path = TESTING_PATH / "rates.json"
+        with open(json_path, "w") as file:
+            json.dump(
+                [
+                    dict(zip(("date", "base", "quote", "rate"), row))
+                    for row in self.rows
+                ],
+                file,
+            )
+
+        for path in (csv_path, json_path):
+            self.assertEqual(
+                1.2, FxRates.load(path).rate("EUR", "USD", "2022-01-02")
+            )
+
+        loaded = get_fx_rates(csv_path)
+        self.assertIs(loaded, get_fx_rates(csv_path))
+
+        with open(csv_path, "a") as file:
+            file.write("2022-03-01,EUR,USD,1.0\n")
+        os.utime(csv_path, ns=(0, 0))
+        self.assertEqual(1.0, get_fx_rates(csv_path).rate("EUR", "USD"))
+
+    def tearDown(self) -> None:
+        rm_tree(TESTING_PATH)
+        return super().tearDown()
+
+
+if __name__ == "__main__":
+    unittest.main()
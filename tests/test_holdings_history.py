@@ -0,0 +1,143 @@
+import random
+import unittest
+
+from pathlib import Path
+
+from src.controllers.portfolio_controller import PortfolioController
+from src.models.holdings_history import HoldingsHistory
+from src.models.portfolio import Transaction
+
+
+def replay(transactions, date: str):
+    """compute holdings at the end of date by replaying whole history"""
+
+    assets, currencies, prices = {}, {}, {}
+    for t in sorted(transactions, key=lambda t: t["date"]):
+        if t["date"] > date + "T23:59:59":
+            break
+        sign = 1 if t["type"] == "BUY" else -1
+        assets[t["code"]] = assets.get(t["code"], 0) + sign * t["amount"]
+        currencies[t["currency"]] = (
+            currencies.get(t["currency"], 0)
+            - sign * t["amount"] * t["unit_price"]
+        )
+        prices[t["code"]] = t["unit_price"]
+
+    return (
+        {
+            code: (prices[code], amount)
+            for code, amount in assets.items()
+            if amount != 0
+        },
+        {c: balance for c, balance in currencies.items() if balance != 0},
+    )
+
+
+class TestHoldingsHistory(unittest.TestCase):
+    def setUp(self) -> None:
+        self.portfolio_controller = PortfolioController(Path("/"), "test")
+        self.random = random.Random(0)
+        return super().setUp()
+
+    def _transactions(self, count: int, shuffle: bool = False):
+        days = list(range(count))
+        if shuffle:
+            self.random.shuffle(days)
+
+        return [
+            Transaction(
+                date=f"2022-{1 + day // 280:02d}-{1 + day // 10 % 28:02d}"
+                + f"T{day % 10:02d}:00:00",
+                type=self.random.choice(("BUY", "SELL")),
+                code=self.random.choice(("AAA", "BBB", "CCC")),
+                unit_price=self.random.randint(1, 100),
+                amount=self.random.randint(1, 10),
+                currency=self.random.choice(("USD", "EUR")),
+            )
+            for day in days
+        ]
+
+    def _check(self, history: HoldingsHistory, transactions) -> None:
+        for date in ("2021-12-31", "2022-01-01", "2022-01-15", "2022-02-07"):
+            holdings = history.as_of(date)
+            assets, currencies = replay(transactions, date)
+
+            self.assertEqual(
+                assets,
+                {
+                    code: (asset.unit_price, asset.amount)
+                    for code, asset in holdings["assets"].items()
+                },
+            )
+            self.assertEqual(currencies, holdings["currencies"])
+
+    def test_as_of(self) -> None:
+        """reconstruct holdings at past dates
+
+        should be equal to replay of history until the dates
+        """
+
+        for portfolio_transaction in self._transactions(500):
+            self.portfolio_controller._portfolio.append_transaction(
+                portfolio_transaction
+            )
+
+        portfolio = self.portfolio_controller._portfolio
+        history = HoldingsHistory(portfolio.transaction_columns, 64)
+
+        self._check(history, portfolio.transactions)
+
+    def test_unordered_history(self) -> None:
+        """reconstruct holdings of history not ordered by date
+
+        should be equal to replay of history sorted by date
+        """
+
+        transactions = self._transactions(500, shuffle=True)
+        portfolio = self.portfolio_controller._portfolio
+        portfolio.transactions = transactions
+        history = HoldingsHistory(portfolio.transaction_columns, 64)
+
+        self._check(history, transactions)
+
+    def test_extend(self) -> None:
+        """append transactions after history was built
+
+        should add checkpoints and reconstruct holdings with them
+        """
+
+        transactions = self._transactions(500)
+        portfolio = self.portfolio_controller._portfolio
+        portfolio.transactions = transactions[:100]
+        history = HoldingsHistory(portfolio.transaction_columns, 64)
+
+        for transaction in transactions[100:]:
+            portfolio.append_transaction(transaction)
+        history.extend()
+
+        self.assertEqual(500, len(history))
+        self._check(history, transactions)
+
+    def test_controller_as_of(self) -> None:
+        """buy and sell assets and get holdings of today
+
+        should return current amounts and balances
+        """
+
+        self.portfolio_controller.buy_asset("TEST", 10, 5, "USD")
+        self.portfolio_controller.as_of("2100-01-01")
+        self.portfolio_controller.sell_asset("TEST", 20, 2, "USD")
+
+        holdings = self.portfolio_controller.as_of("2100-01-01")
+
+        self.assertEqual(3, holdings["assets"]["TEST"].amount)
+        self.assertEqual(20, holdings["assets"]["TEST"].unit_price)
+        self.assertEqual({"USD": -10}, holdings["currencies"])
+        self.assertEqual(
+            {"assets": {}, "currencies": {}},
+            self.portfolio_controller.as_of("2000-01-01"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import subprocess
+import sys
+import unittest
+
+from pathlib import Path
+from typing import Dict, Tuple
+
+from src.settings import IMPORT_TIME_BUDGET
+from tests.utility import rm_tree
+
+TESTING_PATH = Path("tests/test_data")
+SCRIPT_PATH = Path("portfolio_tracker.py").resolve()
+
+
+def import_times(script: Path, cwd: Path) -> Tuple[int, Dict[str, int]]:
+    """run script with -X importtime, return total time of imports
+    and cumulative time of every imported module in microseconds"""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", str(script)],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total, modules = 0, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if not name[1:].startswith(" "):
+            total += int(cumulative)
+        modules.setdefault(name.strip(), int(cumulative))
+    return total, modules
+
+
+class TestImportTime(unittest.TestCase):
+    def setUp(self) -> None:
+        TESTING_PATH.mkdir(exist_ok=True)
+        return super().setUp()
+
+    def test_import_time(self) -> None:
+        """start the application without chosen operation
+
+        should import application modules within the budget,
+        without libraries of operations which weren't used
+        """
+
+        runs = [import_times(SCRIPT_PATH, TESTING_PATH) for _ in range(3)]
+        # streamlit is already imported by the server running the script
+        seconds = min(
+            (total - modules.get("streamlit", 0)) / 10**6
+            for total, modules in runs
+        )
+
+        self.assertNotIn("matplotlib", runs[0][1])
+        self.assertNotIn("src.views.display_data", runs[0][1])
+        self.assertLessEqual(seconds, IMPORT_TIME_BUDGET)
+
+    def tearDown(self) -> None:
+        rm_tree(TESTING_PATH)
+        return super().tearDown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import json
+import unittest
+
+from unittest import mock
+
+from pathlib import Path
+
+from src.controllers.journal import Journal
+from src.controllers.portfolio_controller import PortfolioController
+from src.controllers.storage import JsonStorage
+from tests.utility import create_empty_portfolio, rm_tree
+
+TEST_DATA_PATH = "tests/test_data"
+TESTING_PATH = Path(TEST_DATA_PATH)
+
+
+class TestJournaledPortfolio(unittest.TestCase):
+    def setUp(self) -> None:
+        # create directory if does not exist
+        TESTING_PATH.mkdir(exist_ok=True)
+
+        self.test_file_path = Path(TEST_DATA_PATH + "/test.json")
+        create_empty_portfolio(self.test_file_path)
+
+        self.storage = JsonStorage(journaled=True)
+        self.portfolio_controller = PortfolioController(
+            self.test_file_path, "test", storage=self.storage
+        )
+
+        return super().setUp()
+
+    def _reload(self) -> PortfolioController:
+        return PortfolioController(
+            self.test_file_path, "test", storage=JsonStorage(journaled=True)
+        )
+
+    def test_save_appends_record(self) -> None:
+        """buy an asset and save the portfolio
+
+        should append a record to the journal and keep portfolio file intact
+        """
+
+        with open(self.test_file_path, "r") as file:
+            checkpoint = file.read()
+
+        self.portfolio_controller.update_balance(1000, "USD")
+        self.portfolio_controller.buy_asset("TEST", 10, 5, "USD")
+        self.portfolio_controller._save_file_data()
+
+        with open(self.test_file_path, "r") as file:
+            self.assertEqual(checkpoint, file.read())
+
+        self.assertEqual(1, self.storage.journal(self.test_file_path).records)
+
+    def test_replay_journal(self) -> None:
+        """save multiple changes and load the portfolio again
+
+        should restore data equal to the saved one
+        """
+
+        self.portfolio_controller.update_balance(1000, "USD")
+        self.portfolio_controller._save_file_data()
+        self.portfolio_controller.buy_asset("TEST", 10, 5, "USD")
+        self.portfolio_controller._save_file_data()
+        self.portfolio_controller.sell_asset("TEST", 20, 5, "USD")
+        self.portfolio_controller._save_file_data()
+
+        loaded = self._reload()
+
+        self.assertEqual(
+            self.portfolio_controller.portfolio_data, loaded.portfolio_data
+        )
+        self.assertNotIn("TEST", loaded.portfolio_assets)
+        self.assertEqual(2, len(loaded.portfolio_transactions))
+
+    def test_torn_record(self) -> None:
+        """load portfolio with incomplete last journal record
+
+        should skip the record and remove it from the journal
+        """
+
+        self.portfolio_controller.buy_asset("TEST", 10, 5, "USD")
+        self.portfolio_controller._save_file_data()
+
+        journal_path = Journal(self.test_file_path).path
+        with open(journal_path, "a") as file:
+            file.write('{"currencies":{"USD"')
+
+        loaded = self._reload()
+
+        self.assertIn("TEST", loaded.portfolio_assets)
+        self.assertEqual(
+            1, loaded.storage.journal(self.test_file_path).records
+        )
+        with open(journal_path, "r") as file:
+            self.assertTrue(file.read().endswith("\n"))
+
+    def test_checkpoint(self) -> None:
+        """save portfolio and create a checkpoint
+
+        should write changes to portfolio file and clear the journal
+        """
+
+        self.portfolio_controller.buy_asset("TEST", 10, 5, "USD")
+        self.portfolio_controller._save_file_data()
+        self.portfolio_controller.checkpoint()
+
+        with open(self.test_file_path, "r") as file:
+            data = json.load(file)
+
+        self.assertIn("TEST", data["assets"])
+        self.assertEqual(0, Journal(self.test_file_path).records)
+        self.assertEqual(0, len(list(Journal(self.test_file_path).read())))
+
+    def test_replay_after_checkpoint(self) -> None:
+        """replay journal already contained in portfolio file
+
+        should not duplicate transactions records
+        """
+
+        self.portfolio_controller.buy_asset("TEST", 10, 5, "USD")
+        self.portfolio_controller._save_file_data()
+        records = self.test_file_path.with_suffix(".journal").read_text()
+
+        self.portfolio_controller.checkpoint()
+        # simulate crash between writing checkpoint and clearing journal
+        self.test_file_path.with_suffix(".journal").write_text(records)
+
+        loaded = self._reload()
+        self.assertEqual(1, len(loaded.portfolio_transactions))
+
+    def test_records_counted_once(self) -> None:
+        """save changes with journals created again, as on every rerun
+
+        should count records without reading the journal, unless it was
+        changed outside of the journal
+        """
+
+        self.portfolio_controller.update_balance(1000, "USD")
+        self.portfolio_controller._save_file_data()
+        self.portfolio_controller.buy_asset("TEST", 10, 5, "USD")
+        self.portfolio_controller._save_file_data()
+
+        journal_path = self.test_file_path.with_suffix(".journal")
+        with mock.patch("builtins.open", side_effect=AssertionError):
+            self.assertEqual(2, Journal(self.test_file_path).records)
+
+        with open(journal_path, "a") as file:
+            file.write("{}\n")
+        self.assertEqual(3, Journal(self.test_file_path).records)
+
+        journal_path.unlink()
+        self.assertEqual(0, Journal(self.test_file_path).records)
+
+    def tearDown(self) -> None:
+        if TESTING_PATH.exists():
+            rm_tree(TESTING_PATH)
+
+        return super().tearDown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+
+from pathlib import Path
+
+from src.controllers.portfolio_controller import PortfolioController
+from src.models.lots import LotEngine
+
+
+class TestLots(unittest.TestCase):
+    def setUp(self) -> None:
+        self.portfolio_controller = PortfolioController(Path("/"), "test")
+        self.portfolio_controller.buy_asset("TEST", 10, 5, "USD")
+        self.portfolio_controller.buy_asset("TEST", 20, 5, "USD")
+        self.portfolio_controller.buy_asset("TEST", 30, 5, "USD")
+        return super().setUp()
+
+    def _gains(self):
+        return [
+            (gain.lot, gain.amount, gain.gain)
+            for gain in self.portfolio_controller.realized_gains("TEST")
+        ]
+
+    def test_fifo(self) -> None:
+        """sell asset bought in three lots with FIFO method
+
+        should match the sell with the oldest lots
+        """
+
+        self.portfolio_controller.sell_asset("TEST", 40, 7, "USD", "FIFO")
+
+        self.assertEqual([(0, 5, 150), (1, 2, 40)], self._gains())
+        self.assertEqual(
+            [3, 5],
+            [
+                lot.amount
+                for lot in self.portfolio_controller.open_lots("TEST")
+            ],
+        )
+
+    def test_lifo(self) -> None:
+        """sell asset bought in three lots with LIFO method
+
+        should match the sell with the newest lots
+        """
+
+        self.portfolio_controller.sell_asset("TEST", 40, 7, "USD", "LIFO")
+
+        self.assertEqual([(2, 5, 50), (1, 2, 40)], self._gains())
+
+    def test_specific_lot(self) -> None:
+        """sell asset from the middle lot and then with FIFO method
+
+        should close the middle lot and skip it later
+        """
+
+        self.portfolio_controller.sell_asset("TEST", 40, 5, "USD", lot=1)
+        self.portfolio_controller.sell_asset("TEST", 40, 7, "USD", "FIFO")
+
+        self.assertEqual([(1, 5, 100), (0, 5, 150), (2, 2, 20)], self._gains())
+        self.assertEqual(
+            [2],
+            [lot.id for lot in self.portfolio_controller.open_lots("TEST")],
+        )
+
+    def test_invalid_lot(self) -> None:
+        """sell more than amount of the lot or from unknown lot
+
+        should raise ValueError
+        """
+
+        self.assertRaises(
+            ValueError,
+            self.portfolio_controller.sell_asset,
+            "TEST",
+            40,
+            6,
+            "USD",
+            lot=1,
+        )
+        self.assertRaises(
+            ValueError,
+            self.portfolio_controller.sell_asset,
+            "TEST",
+            40,
+            1,
+            "USD",
+            lot=5,
+        )
+
+    def test_replay(self) -> None:
+        """replay history of sells after lots were updated incrementally
+
+        should give the same realized gains
+        """
+
+        self.portfolio_controller.sell_asset("TEST", 40, 2, "USD", lot=2)
+        self.portfolio_controller.sell_asset("TEST", 40, 4, "USD", "LIFO")
+        self.portfolio_controller.sell_asset("TEST", 40, 4, "USD")
+
+        replayed = LotEngine(self.portfolio_controller.portfolio_transactions)
+
+        self.assertEqual(
+            self.portfolio_controller.realized_gains(), replayed.gains
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import json
+import unittest
+
+from pathlib import Path
+from unittest import mock
+
+from src.controllers.file_handler import FileHandler
+from src.controllers.manifest import Manifest
+from tests.utility import create_empty_portfolio, rm_tree
+
+TEST_DATA_PATH = "tests/test_data"
+TESTING_PATH = Path(TEST_DATA_PATH)
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self) -> None:
+        # create directory if does not exist
+        TESTING_PATH.mkdir(exist_ok=True)
+
+        self.file_handler = FileHandler(TESTING_PATH, portfolios={})
+        self.file_handler.create_empty_portfolio("test")
+
+        return super().setUp()
+
+    def test_create_updates_manifest(self) -> None:
+        """create portfolio
+
+        should add fresh summary of the portfolio to the manifest
+        """
+
+        manifest = Manifest(TESTING_PATH)
+
+        self.assertTrue(manifest.load())
+        self.assertFalse(manifest.is_stale())
+        self.assertEqual(0, manifest.entries["test"]["transactions"])
+
+    def test_load_from_manifest(self) -> None:
+        """load portfolios with fresh manifest
+
+        should list portfolios recorded in the manifest
+        """
+
+        file_handler = FileHandler(TESTING_PATH, portfolios={})
+        file_handler.load_portfolios()
+
+        self.assertEqual(["test"], list(file_handler.portfolios))
+
+    def test_rebuild_stale_manifest(self) -> None:
+        """add portfolio file bypassing file handler and load portfolios
+
+        should rebuild the manifest with the new portfolio
+        """
+
+        create_empty_portfolio(Path(TEST_DATA_PATH + "/other.json"))
+
+        file_handler = FileHandler(TESTING_PATH, portfolios={})
+        file_handler.load_portfolios()
+
+        self.assertEqual(["other", "test"], sorted(file_handler.portfolios))
+
+        manifest = Manifest(TESTING_PATH)
+        manifest.load()
+        self.assertIn("other", manifest.entries)
+        self.assertFalse(manifest.is_stale())
+
+    def test_remove_updates_manifest(self) -> None:
+        """remove portfolio
+
+        should remove summary of the portfolio from the manifest
+        """
+
+        self.file_handler.remove_portfolio("test")
+
+        manifest = Manifest(TESTING_PATH)
+        manifest.load()
+        self.assertNotIn("test", manifest.entries)
+        self.assertFalse(manifest.is_stale())
+
+    def test_update_summary(self) -> None:
+        """update summary with new number of transactions
+
+        should store the number in the manifest
+        """
+
+        self.file_handler.update_portfolio_summary("test", 5)
+
+        self.assertEqual(
+            5, self.file_handler.get_portfolio_summary("test")["transactions"]
+        )
+
+    def test_load_unchanged_manifest(self) -> None:
+        """load portfolios again with unchanged manifest, as on every rerun
+
+        should not parse the manifest again, unless the file changed
+        """
+
+        with mock.patch("json.load", side_effect=AssertionError):
+            file_handler = FileHandler(TESTING_PATH, portfolios={})
+            file_handler.load_portfolios()
+        self.assertEqual(["test"], list(file_handler.portfolios))
+
+        manifest_path = TESTING_PATH / Manifest.FILE_NAME
+        with open(manifest_path, "r") as file:
+            manifest = json.load(file)
+        manifest["portfolios"]["test"]["transactions"] = 7
+        with open(manifest_path, "w") as file:
+            json.dump(manifest, file)
+
+        file_handler = FileHandler(TESTING_PATH, portfolios={})
+        self.assertEqual(
+            7, file_handler.get_portfolio_summary("test")["transactions"]
+        )
+
+    def test_search_portfolios(self) -> None:
+        """search portfolios by part of the name
+
+        should return names starting with query first
+        """
+
+        for name in ("atest", "testb", "other"):
+            self.file_handler.create_empty_portfolio(name)
+
+        self.assertEqual(
+            ["test", "testb", "atest"],
+            self.file_handler.search_portfolios("test", 10),
+        )
+        self.assertEqual(
+            ["test"], self.file_handler.search_portfolios("test", 1)
+        )
+
+    def tearDown(self) -> None:
+        if TESTING_PATH.exists():
+            rm_tree(TESTING_PATH)
+
+        return super().tearDown()
+
+
+if __name__ == "__main__":
+    unittest.main()
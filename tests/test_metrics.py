@@ -0,0 +1,161 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+
+from src.controllers.portfolio_controller import PortfolioController
+from src.models.metrics import (
+    daily_returns,
+    max_drawdown,
+    performance,
+    sharpe_ratio,
+    time_weighted_return,
+    volatility,
+    xirr,
+)
+from src.models.money import to_fixed
+from src.models.price_history import PriceHistory
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self) -> None:
+        self.days = pd.date_range("2022-01-01", periods=5)
+        self.values = pd.DataFrame(
+            {
+                "AAA": [100.0, 110, 99, 218.8, 240.68],
+                "BBB": [0.0, 0, 50, 40, 50],
+            },
+            index=self.days,
+        )
+        self.flows = pd.DataFrame(
+            {"AAA": [100.0, 0, 0, 100, 0], "BBB": [0.0, 0, 50, 0, 0]},
+            index=self.days,
+        )
+        return super().setUp()
+
+    def test_returns(self) -> None:
+        """compute returns of values with flows
+
+        should exclude flows from returns and chain daily returns
+        """
+
+        returns = daily_returns(self.values, self.flows)
+
+        np.testing.assert_allclose([0, 0.1, -0.1, 0.2, 0.1], returns[:, 0])
+        np.testing.assert_allclose([0, 0, 0, -0.2, 0.25], returns[:, 1])
+        np.testing.assert_allclose(
+            [1.1 * 0.9 * 1.2 * 1.1 - 1, 0.0], time_weighted_return(returns)
+        )
+        np.testing.assert_allclose([-0.1, -0.2], max_drawdown(returns))
+
+    def test_risk(self) -> None:
+        """compute volatility and Sharpe ratio of returns
+
+        should annualize standard deviation and mean excess return
+        """
+
+        returns = np.array([0.01, -0.01, 0.02, 0.0])
+
+        self.assertAlmostEqual(
+            np.std(returns, ddof=1) * np.sqrt(365), volatility(returns)
+        )
+        self.assertAlmostEqual(
+            np.mean(returns) * 365 / volatility(returns),
+            sharpe_ratio(returns),
+        )
+        self.assertTrue(np.isnan(sharpe_ratio(np.zeros(4))))
+
+    def test_xirr(self) -> None:
+        """solve rates of return of many series of cash flows
+
+        should return rates with zero net present value, equal to
+        rates solved one by one and NaN for flows of one sign
+        """
+
+        days = np.array([0, 100, 365, 730])
+        flows = np.array(
+            [
+                [-100.0, -100, -100, 100],
+                [0, -50, 0, 0],
+                [0, 0, 0, 0],
+                [121, 200, 1e6, 0],
+            ]
+        )
+
+        rates = xirr(flows, days)
+
+        self.assertAlmostEqual(0.1, rates[0])
+        for i in range(3):
+            self.assertAlmostEqual(
+                0,
+                np.sum(flows[:, i] * (1 + rates[i]) ** (-days / 365)),
+                places=6,
+            )
+            self.assertAlmostEqual(rates[i], xirr(flows[:, i], days))
+        self.assertTrue(np.isnan(rates[3]))
+
+    def test_performance(self) -> None:
+        """compute metrics of assets and their total
+
+        should return metrics of every asset and of the portfolio
+        """
+
+        metrics = performance(self.values, self.flows, window=2)
+
+        self.assertEqual(["AAA", "BBB"], list(metrics["assets"].index))
+        self.assertAlmostEqual(
+            1.1 * 0.9 * 1.2 * 1.1 - 1, metrics["assets"].loc["AAA", "twr"]
+        )
+        self.assertEqual(set(metrics["assets"].columns), set(metrics["total"]))
+        self.assertEqual(5, len(metrics["rolling_volatility"]))
+
+    def test_portfolio_metrics_cache(self) -> None:
+        """get metrics of portfolio twice and after a new trade
+
+        should compute them again only after the trade
+        """
+
+        portfolio_contr = PortfolioController(Path("/"), "test")
+        portfolio_contr.update_balance(to_fixed(1000), "USD")
+        prices = PriceHistory(
+            pd.DataFrame(
+                {
+                    "date": ["2022-01-02", "2022-01-03"],
+                    "code": ["AAA", "AAA"],
+                    "close": [11.0, 12.1],
+                }
+            )
+        )
+        trade = {
+            "date": "2022-01-01T10:00:00",
+            "type": "BUY",
+            "code": "AAA",
+            "unit_price": to_fixed(10),
+            "amount": 1,
+            "currency": "USD",
+        }
+        portfolio_contr.apply_transactions([trade], save=False)
+
+        first = portfolio_contr.performance_metrics(prices)
+        self.assertIs(first, portfolio_contr.performance_metrics(prices))
+        self.assertAlmostEqual(0.21, first["total"]["twr"])
+
+        portfolio_contr.apply_transactions(
+            [
+                {
+                    **trade,
+                    "date": "2022-01-03T10:00:00",
+                    "unit_price": to_fixed(12.1),
+                }
+            ],
+            save=False,
+        )
+        second = portfolio_contr.performance_metrics(prices)
+        self.assertIsNot(first, second)
+        self.assertAlmostEqual(0.21, second["total"]["twr"])
+
+
+if __name__ == "__main__":
+    unittest.main()
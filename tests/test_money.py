@@ -0,0 +1,209 @@
+import unittest
+
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+
+from src.controllers.portfolio_controller import PortfolioController
+from src.models.money import (
+    SCALE,
+    Money,
+    divide,
+    fixed,
+    format_money,
+    to_fixed,
+)
+from src.models.money_kernels import (
+    checked_multiply,
+    convert,
+    exact_reduceat,
+    exact_sum,
+    round_divide,
+)
+from src.models.portfolio import Portfolio
+
+
+class TestMoney(unittest.TestCase):
+    def test_to_fixed(self) -> None:
+        """convert decimal numbers to fixed-point units
+
+        should convert exactly and round half to even
+        """
+
+        self.assertEqual(SCALE // 10, to_fixed(0.1))
+        self.assertEqual(123456789, to_fixed("1.23456789"))
+        self.assertEqual(0, to_fixed("0.000000005"))
+        self.assertEqual(2, to_fixed("0.000000015"))
+        self.assertEqual(-SCALE, to_fixed(Decimal("-1")))
+        self.assertRaises(ValueError, to_fixed, "ten")
+        self.assertRaises(ValueError, to_fixed, float("nan"))
+
+    def test_format_money(self) -> None:
+        """format fixed-point units
+
+        should show exact decimal number without trailing zeros
+        """
+
+        self.assertEqual("1.5", format_money(150000000))
+        self.assertEqual("-0.00000001", format_money(-1))
+        self.assertEqual("100", format_money(100 * SCALE))
+
+    def test_money_arithmetic(self) -> None:
+        """add, multiply and divide money
+
+        should give exact results
+        """
+
+        price = Money.from_decimal("0.1")
+        self.assertEqual(Money.from_decimal("0.3"), price * 3)
+        self.assertEqual(Money.from_decimal("0.3"), price + price + price)
+        self.assertEqual(Money(2), Money(5) // 2)
+        self.assertEqual(Money(4), Money(7) // 2)
+        self.assertLess(price, price * 2)
+        self.assertEqual("0.1", str(price))
+
+    def test_fixed(self) -> None:
+        """check fixed-point values
+
+        should accept integers and reject fractions
+        """
+
+        self.assertEqual(10, fixed(10.0))
+        self.assertEqual(10, fixed(Money(10)))
+        self.assertRaises(ValueError, fixed, 10.5)
+        self.assertRaises(ValueError, fixed, True)
+
+    def test_divide(self) -> None:
+        """divide integers with remainders of half of divisor
+
+        should round half to even
+        """
+
+        self.assertEqual([0, 2, 2, -2], [divide(n, 4) for n in (2, 6, 7, -6)])
+
+
+class TestMoneyKernels(unittest.TestCase):
+    def test_checked_multiply(self) -> None:
+        """multiply values with products exceeding int64
+
+        should raise OverflowError
+        """
+
+        a = np.array([10**10, 3], dtype=np.int64)
+        self.assertEqual(
+            [10**12, 300], checked_multiply(a, np.array([100, 100])).tolist()
+        )
+        self.assertRaises(
+            OverflowError, checked_multiply, a, np.array([10**9, 1])
+        )
+        self.assertRaises(
+            OverflowError, checked_multiply, np.array([2**32]), [2**31]
+        )
+
+    def test_exact_sum(self) -> None:
+        """sum values with total exceeding int64
+
+        should return exact python int
+        """
+
+        values = np.full(1000, 2**62, dtype=np.int64)
+        values[0] = -7
+
+        self.assertEqual(999 * 2**62 - 7, exact_sum(values))
+
+    def test_exact_reduceat(self) -> None:
+        """sum groups of values
+
+        should return exact sums and raise OverflowError on overflow
+        """
+
+        values = np.array([2**40, -(2**40), 5, 2**62, 2**62 - 1])
+        self.assertEqual(
+            [0, 5, 2**63 - 1],
+            exact_reduceat(values, np.array([0, 2, 3])).tolist(),
+        )
+        self.assertRaises(
+            OverflowError,
+            exact_reduceat,
+            np.array([2**62, 2**62]),
+            np.array([0]),
+        )
+
+    def test_convert(self) -> None:
+        """convert values at rates with halves of units and large products
+
+        should round half to even and raise OverflowError
+        if a value does not fit in int64
+        """
+
+        self.assertEqual(
+            [110000000, 99999999, -2, 8, 12, 25 * 10**17],
+            convert(
+                np.array([SCALE, 3 * SCALE, -5, 15, 25, 10**14]),
+                np.array([1.1, 1 / 3, 0.5, 0.5, 0.5, 25000.0]),
+            ).tolist(),
+        )
+        self.assertRaises(
+            OverflowError, convert, np.array([10**17]), np.array([1000.0])
+        )
+
+    def test_round_divide(self) -> None:
+        """divide arrays with remainders of half of divisor
+
+        should round half to even like python divide
+        """
+
+        numerators = np.arange(-20, 21)
+        self.assertEqual(
+            [divide(n, 4) for n in range(-20, 21)],
+            round_divide(numerators, np.full(41, 4)).tolist(),
+        )
+
+
+class TestControllerMoney(unittest.TestCase):
+    def setUp(self) -> None:
+        self.portfolio_controller = PortfolioController(Path("/"), "test")
+        return super().setUp()
+
+    def test_exact_balance(self) -> None:
+        """buy asset for 0.1 ten times
+
+        should decrease balance by exactly 1
+        """
+
+        self.portfolio_controller.update_balance(to_fixed("1"), "USD")
+        for _ in range(10):
+            self.portfolio_controller.buy_asset(
+                "TEST", to_fixed(0.1), 1, "USD"
+            )
+
+        self.assertEqual(
+            0, self.portfolio_controller.portfolio_currencies["USD"]
+        )
+
+    def test_fraction_of_unit(self) -> None:
+        """update balance with fraction of fixed-point unit
+
+        should raise ValueError
+        """
+
+        self.assertRaises(
+            ValueError, self.portfolio_controller.update_balance, 0.5, "USD"
+        )
+
+    def test_float_balances(self) -> None:
+        """load portfolio with balances saved as floats
+
+        should convert balances to integers
+        """
+
+        portfolio = Portfolio(
+            "test", {"currencies": {"USD": 10000000.000000002}}
+        )
+        self.assertEqual({"USD": 10000000}, portfolio.currencies)
+        self.assertIsInstance(portfolio.currencies["USD"], int)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import unittest
+
+from src.parallel import run_tasks
+
+
+def square(value: int) -> int:
+    return value * value
+
+
+def process_id(_: int) -> int:
+    return os.getpid()
+
+
+class TestParallel(unittest.TestCase):
+    def test_run_tasks(self) -> None:
+        """run tasks in a pool, in order and as they complete
+
+        should yield results of every task, in order of tasks if ordered
+        """
+
+        tasks = ((value,) for value in range(20))
+        self.assertEqual(
+            [square(value) for value in range(20)],
+            list(run_tasks(square, tasks, workers=2, ordered=True)),
+        )
+        self.assertEqual(
+            sorted(square(value) for value in range(20)),
+            sorted(run_tasks(square, [(value,) for value in range(20)], 3)),
+        )
+
+    def test_inline(self) -> None:
+        """run tasks without workers and a single task with workers
+
+        should run the tasks in the calling process
+        """
+
+        self.assertEqual(
+            [os.getpid()] * 3,
+            list(run_tasks(process_id, [(i,) for i in range(3)], 0)),
+        )
+        self.assertEqual(
+            [os.getpid()], list(run_tasks(process_id, [(0,)], workers=2))
+        )
+        self.assertNotIn(
+            os.getpid(), run_tasks(process_id, [(0,), (1,)], workers=2)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import threading
+import unittest
+
+from pathlib import Path
+
+from src.controllers.portfolio_cache import PortfolioCache
+from src.controllers.portfolio_controller import PortfolioController
+from src.controllers.storage import JsonStorage
+from src.models.portfolio import Portfolio
+from tests.utility import create_empty_portfolio, rm_tree
+
+TEST_DATA_PATH = "tests/test_data"
+TESTING_PATH = Path(TEST_DATA_PATH)
+
+
+class TestPortfolioCache(unittest.TestCase):
+    def setUp(self) -> None:
+        # create directory if does not exist
+        TESTING_PATH.mkdir(exist_ok=True)
+
+        self.test_file_path = Path(TEST_DATA_PATH + "/test.json")
+        create_empty_portfolio(self.test_file_path)
+
+        self.storage = JsonStorage()
+        self.cache = PortfolioCache()
+
+        return super().setUp()
+
+    def _load(self) -> PortfolioController:
+        return PortfolioController(
+            self.test_file_path, "test", storage=self.storage, cache=self.cache
+        )
+
+    def test_hit_unchanged_file(self) -> None:
+        """load the same unchanged portfolio twice
+
+        should parse the file once and reuse loaded portfolio
+        """
+
+        first = self._load()
+        second = self._load()
+
+        self.assertIs(first._portfolio, second._portfolio)
+        self.assertEqual(1, self.cache.misses)
+        self.assertEqual(1, self.cache.hits)
+
+    def test_save_updates_entry(self) -> None:
+        """save portfolio and load it again in the same process
+
+        should return saved portfolio from the cache
+        """
+
+        controller = self._load()
+        controller.buy_asset("TEST", 10, 5, "USD")
+        controller._save_file_data()
+
+        loaded = self._load()
+
+        self.assertIn("TEST", loaded.portfolio_assets)
+        self.assertEqual(1, self.cache.hits)
+
+    def test_external_modification(self) -> None:
+        """modify portfolio file with other controller without cache
+
+        should reload portfolio from the file
+        """
+
+        self._load()
+
+        writer = PortfolioController(
+            self.test_file_path, "test", storage=JsonStorage()
+        )
+        writer.buy_asset("TEST", 10, 5, "USD")
+        writer._save_file_data()
+
+        loaded = self._load()
+
+        self.assertIn("TEST", loaded.portfolio_assets)
+        self.assertEqual(2, self.cache.misses)
+
+    def test_unsaved_modification(self) -> None:
+        """modify cached portfolio without saving it
+
+        should not return modified portfolio from the cache
+        """
+
+        controller = self._load()
+        controller.update_balance(100, "USD")
+
+        loaded = self._load()
+
+        self.assertNotIn("USD", loaded.portfolio_currencies)
+
+    def test_shared_portfolio(self) -> None:
+        """trade in many sessions sharing one cached portfolio
+
+        should apply trades one at a time, holding the portfolio lock,
+        and keep positions and indexes consistent with transactions
+        """
+
+        first, second = self._load(), self._load()
+        self.assertIs(first._portfolio, second._portfolio)
+
+        with first._portfolio.lock:
+            update = threading.Thread(
+                target=second.update_balance, args=(10, "USD")
+            )
+            update.start()
+            update.join(0.1)
+            self.assertTrue(update.is_alive())
+        update.join()
+        self.assertEqual(10, first.portfolio_currencies["USD"])
+
+        second._save_file_data()
+        controllers = [self._load() for _ in range(4)]
+        for controller in controllers:
+            self.assertIs(first._portfolio, controller._portfolio)
+
+        def trade(controller: PortfolioController) -> None:
+            for _ in range(200):
+                controller.buy_asset("TEST", 1, 1, "USD")
+                controller.transaction_positions(codes=["TEST"])
+
+        sessions = [
+            threading.Thread(target=trade, args=(controller,))
+            for controller in controllers
+        ]
+        for session in sessions:
+            session.start()
+        for session in sessions:
+            session.join()
+
+        portfolio = first._portfolio
+        self.assertEqual(800, len(portfolio.transactions))
+        self.assertEqual(800, portfolio.positions["TEST"].amount)
+        self.assertEqual(800, len(portfolio.transaction_index))
+        self.assertEqual(800, len(first.transaction_positions(["TEST"])))
+
+    def test_lru_eviction(self) -> None:
+        """put more portfolios than the cache limit
+
+        should evict least recently used portfolio
+        """
+
+        cache = PortfolioCache(max_entries=2)
+        for name in ("a", "b", "c"):
+            cache.put(Path(name), (), Portfolio(name, {}), 1)
+
+        self.assertEqual(2, len(cache))
+        self.assertEqual(1, cache.evictions)
+        self.assertIsNone(cache.get(Path("a"), ()))
+        self.assertIsNotNone(cache.get(Path("c"), ()))
+
+    def test_size_limit(self) -> None:
+        """put portfolios with total size over the cache limit
+
+        should evict portfolios until total size fits the limit
+        """
+
+        cache = PortfolioCache(max_bytes=10)
+        cache.put(Path("a"), (), Portfolio("a", {}), 6)
+        cache.put(Path("b"), (), Portfolio("b", {}), 6)
+
+        self.assertEqual(1, len(cache))
+        self.assertEqual(6, cache.stats["bytes"])
+
+    def tearDown(self) -> None:
+        if TESTING_PATH.exists():
+            rm_tree(TESTING_PATH)
+
+        return super().tearDown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,10 @@
 import unittest
 
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List
 
 from src.controllers.portfolio_controller import PortfolioController
+from src.models.portfolio import Transaction
 
 
 class TestAddAsset(unittest.TestCase):
@@ -686,5 +687,120 @@ class TestPortfolioBalance(unittest.TestCase):
             )
 
 
+class TestQueryTransactions(unittest.TestCase):
+    def setUp(self) -> None:
+        self.portfolio_controller = PortfolioController(Path("/"), "test")
+
+        # transactions on days 1-30 of January, every third one is a sell
+        for day in range(1, 31):
+            self.portfolio_controller._portfolio.append_transaction(
+                Transaction(
+                    date=f"2022-01-{day:02d}T12:00:00",
+                    type="SELL" if day % 3 == 0 else "BUY",
+                    code="AAA" if day % 2 == 0 else "BBB",
+                    unit_price=10,
+                    amount=day,
+                    currency="USD",
+                )
+            )
+
+        return super().setUp()
+
+    def _amounts(self, **query) -> List[int]:
+        return [
+            t["amount"]
+            for t in self.portfolio_controller.query_transactions(**query)
+        ]
+
+    def test_query_code(self) -> None:
+        """query transactions of one asset
+
+        should return only transactions with the code
+        """
+
+        self.assertEqual(list(range(2, 31, 2)), self._amounts(code="AAA"))
+
+    def test_query_date_range(self) -> None:
+        """query transactions between two dates
+
+        should return transactions from the whole start and end days
+        """
+
+        self.assertEqual(
+            [10, 11, 12], self._amounts(start="2022-01-10", end="2022-01-12")
+        )
+
+    def test_query_combined(self) -> None:
+        """query transactions by code, type and date range
+
+        should return transactions matching all of the filters
+        """
+
+        self.assertEqual(
+            [6, 12],
+            self._amounts(
+                code="AAA", type="SELL", start="2022-01-01", end="2022-01-15"
+            ),
+        )
+
+    def test_select_many_values(self) -> None:
+        """select transactions of many codes and types in the index
+
+        should return positions of transactions matching any
+        of the values of every filter in order of history
+        """
+
+        index = self.portfolio_controller._portfolio.transaction_index
+
+        self.assertEqual(
+            [2, 5, 8, 11],
+            index.select(
+                codes=["AAA", "BBB"], types=["SELL"], end="2022-01-12"
+            ),
+        )
+        self.assertEqual([], index.select(codes=["CCC"], types=["BUY"]))
+        self.assertEqual([], index.select(codes=[]))
+
+    def test_query_updated_index(self) -> None:
+        """add transaction after index was built and query it
+
+        should return the new transaction
+        """
+
+        self.assertEqual([], self._amounts(code="CCC"))
+        self.portfolio_controller.buy_asset("CCC", 10, 5, "USD")
+        self.assertEqual([5], self._amounts(code="CCC"))
+
+    def test_query_unordered_dates(self) -> None:
+        """add transaction older than the last one and query by dates
+
+        should find the transaction in the date range
+        """
+
+        self.portfolio_controller._portfolio.append_transaction(
+            Transaction("2021-12-31T12:00:00", "BUY", "AAA", 1, 99, "USD")
+        )
+
+        self.assertEqual([99], self._amounts(end="2021-12-31"))
+
+    def test_query_history_order(self) -> None:
+        """add transactions older than the last ones and query by dates
+
+        should return transactions in order of history from any index
+        """
+
+        for amount in (98, 99):
+            self.portfolio_controller._portfolio.append_transaction(
+                Transaction(
+                    "2021-12-31T12:00:00", "BUY", "AAA", 1, amount, "USD"
+                )
+            )
+
+        self.assertEqual([1, 2, 98, 99], self._amounts(end="2022-01-02"))
+        self.assertEqual(
+            [2, 98, 99], self._amounts(code="AAA", end="2022-01-02")
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,115 @@
+import time
+import unittest
+
+from pathlib import Path
+from typing import Callable
+
+from src.controllers.portfolio_cache import PortfolioCache
+from src.controllers.portfolio_controller import PortfolioController
+from src.controllers.portfolio_watcher import PortfolioWatcher
+from src.controllers.storage import JsonStorage
+from tests.utility import create_empty_portfolio, rm_tree
+
+TEST_DATA_PATH = "tests/test_data"
+TESTING_PATH = Path(TEST_DATA_PATH)
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 5.0) -> bool:
+    """wait until condition is true or timeout passes"""
+
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+class TestPortfolioWatcher(unittest.TestCase):
+    def setUp(self) -> None:
+        # create directory if does not exist
+        TESTING_PATH.mkdir(exist_ok=True)
+
+        self.test_file_path = Path(TEST_DATA_PATH + "/test.json").resolve()
+        create_empty_portfolio(self.test_file_path)
+
+        self.cache = PortfolioCache()
+        self.watcher = PortfolioWatcher(
+            TESTING_PATH, JsonStorage(), self.cache
+        )
+        self.watcher.start()
+
+        return super().setUp()
+
+    def test_initial_scan(self) -> None:
+        """start watcher in directory with portfolio
+
+        should list the existing portfolio
+        """
+
+        self.assertEqual(
+            {"test": self.test_file_path}, self.watcher.portfolios
+        )
+        self.assertTrue(self.cache.watched)
+
+    def test_created_and_removed(self) -> None:
+        """create and remove portfolio file in watched directory
+
+        should add and remove portfolio from the dictionary
+        """
+
+        new_path = Path(TEST_DATA_PATH + "/other.json")
+        create_empty_portfolio(new_path)
+        self.assertTrue(wait_for(lambda: "other" in self.watcher.portfolios))
+
+        new_path.unlink()
+        self.assertTrue(
+            wait_for(lambda: "other" not in self.watcher.portfolios)
+        )
+
+    def test_external_modification(self) -> None:
+        """modify cached portfolio with other writer
+
+        should drop the portfolio from the cache
+        """
+
+        PortfolioController(
+            self.test_file_path, "test", JsonStorage(), self.cache
+        )
+        self.assertEqual(1, len(self.cache))
+
+        writer = PortfolioController(
+            self.test_file_path, "test", JsonStorage()
+        )
+        writer.buy_asset("TEST", 10, 5, "USD")
+        writer._save_file_data()
+
+        self.assertTrue(wait_for(lambda: len(self.cache) == 0))
+
+    def test_own_modification(self) -> None:
+        """save cached portfolio in this process
+
+        should keep the saved portfolio in the cache
+        """
+
+        controller = PortfolioController(
+            self.test_file_path, "test", JsonStorage(), self.cache
+        )
+        controller.buy_asset("TEST", 10, 5, "USD")
+        controller._save_file_data()
+
+        # give the watcher time to process events of the write
+        time.sleep(0.2)
+
+        self.assertIsNotNone(self.cache.get(self.test_file_path))
+
+    def tearDown(self) -> None:
+        self.watcher.stop()
+        if TESTING_PATH.exists():
+            rm_tree(TESTING_PATH)
+
+        return super().tearDown()
+
+
+if __name__ == "__main__":
+    unittest.main()
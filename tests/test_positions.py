@@ -0,0 +1,156 @@
+import json
+import unittest
+
+from pathlib import Path
+
+from src.controllers.file_handler import FileHandler
+from src.controllers.portfolio_controller import PortfolioController
+from src.controllers.storage import JsonStorage, SqliteStorage
+from tests.utility import rm_tree
+
+TESTING_PATH = Path("tests/test_data")
+
+
+class TestPositions(unittest.TestCase):
+    def setUp(self) -> None:
+        self.portfolio_controller = PortfolioController(Path("/"), "test")
+        return super().setUp()
+
+    def test_buy_and_sell(self) -> None:
+        """buy asset twice and sell part of it
+
+        should keep amount, average cost and realized profit of the asset
+        """
+
+        self.portfolio_controller.buy_asset("TEST", 10, 4, "USD")
+        self.portfolio_controller.buy_asset("TEST", 20, 6, "USD")
+        self.portfolio_controller.sell_asset("TEST", 30, 5, "USD")
+
+        position = self.portfolio_controller.portfolio_positions["TEST"]
+        self.assertEqual(5, position.amount)
+        self.assertEqual(16, position.average_cost)
+        self.assertEqual(80, position.total_cost)
+        self.assertEqual(150 - 80, position.realized)
+        self.assertEqual(3, position.trades)
+
+    def test_consistent_positions(self) -> None:
+        """rebuild positions updated by buys and sells
+
+        should find no inconsistent positions
+        """
+
+        for i in range(1, 50):
+            self.portfolio_controller.buy_asset("AAA", i, i, "USD")
+            self.portfolio_controller.buy_asset("BBB", 2 * i, 3, "EUR")
+            self.portfolio_controller.sell_asset(
+                "AAA", i + 1, i // 2 + 1, "USD"
+            )
+
+        positions = dict(self.portfolio_controller.portfolio_positions)
+
+        self.assertEqual([], self.portfolio_controller.rebuild_positions())
+        self.assertEqual(
+            positions, self.portfolio_controller.portfolio_positions
+        )
+
+    def test_repair_positions(self) -> None:
+        """rebuild positions after they were modified
+
+        should return modified codes and restore positions
+        """
+
+        self.portfolio_controller.buy_asset("AAA", 10, 4, "USD")
+        self.portfolio_controller.buy_asset("BBB", 10, 4, "USD")
+        self.portfolio_controller.portfolio_positions["AAA"].trades = 5
+        del self.portfolio_controller.portfolio_positions["BBB"]
+
+        self.assertEqual(
+            ["AAA", "BBB"], self.portfolio_controller.rebuild_positions()
+        )
+        self.assertEqual(
+            1, self.portfolio_controller.portfolio_positions["AAA"].trades
+        )
+        self.assertEqual(
+            4, self.portfolio_controller.portfolio_positions["BBB"].amount
+        )
+
+
+class TestPositionsStorage(unittest.TestCase):
+    def setUp(self) -> None:
+        TESTING_PATH.mkdir(exist_ok=True)
+        return super().setUp()
+
+    def _save_and_load(self, storage) -> PortfolioController:
+        file_handler = FileHandler(
+            TESTING_PATH, portfolios={}, storage=storage
+        )
+        file_handler.create_empty_portfolio("test")
+        path = file_handler.get_portfolio_path("test")
+
+        portfolio_controller = PortfolioController(
+            path, "test", storage=storage
+        )
+        portfolio_controller.buy_asset("TEST", 10, 4, "USD")
+        portfolio_controller.sell_asset("TEST", 20, 1, "USD")
+        portfolio_controller._save_file_data()
+
+        return PortfolioController(path, "test", storage=storage)
+
+    def test_json_storage(self) -> None:
+        """save portfolio with positions in json storage and load it
+
+        should restore positions
+        """
+
+        for journaled in (True, False):
+            loaded = self._save_and_load(JsonStorage(journaled=journaled))
+            position = loaded.portfolio_positions["TEST"]
+            self.assertEqual(3, position.amount)
+            self.assertEqual(10, position.realized)
+
+    def test_sqlite_storage(self) -> None:
+        """save portfolio with positions in sqlite storage and load it
+
+        should restore positions
+        """
+
+        loaded = self._save_and_load(SqliteStorage())
+        self.assertEqual(3, loaded.portfolio_positions["TEST"].amount)
+
+    def test_portfolio_without_positions(self) -> None:
+        """load portfolio saved without positions
+
+        should rebuild positions from transactions
+        """
+
+        path = TESTING_PATH / "test.json"
+        with open(path, "w") as file:
+            json.dump(
+                {
+                    "assets": {},
+                    "transactions": [
+                        {
+                            "date": "2022-01-01T10:00:00",
+                            "type": "BUY",
+                            "code": "TEST",
+                            "unit_price": 10,
+                            "amount": 4,
+                            "currency": "USD",
+                        }
+                    ],
+                    "currencies": {},
+                    "categories": {},
+                },
+                file,
+            )
+
+        loaded = PortfolioController(path, "test", storage=JsonStorage())
+        self.assertEqual(4, loaded.portfolio_positions["TEST"].amount)
+
+    def tearDown(self) -> None:
+        rm_tree(TESTING_PATH)
+        return super().tearDown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+
+from src.controllers.portfolio_controller import PortfolioController
+from src.models.fx_rates import FxRates
+from src.models.money import to_fixed
+from src.models.price_history import PriceHistory, get_price_history
+from tests.utility import rm_tree
+
+TESTING_PATH = Path("tests/test_data")
+
+
+class TestPriceHistory(unittest.TestCase):
+    def setUp(self) -> None:
+        TESTING_PATH.mkdir(exist_ok=True)
+        self.frame = pd.DataFrame(
+            {
+                "date": ["2022-01-02", "2022-01-04", "2022-01-03"],
+                "code": ["AAA", "AAA", "BBB"],
+                "close": [10.0, 12.0, 5.0],
+            }
+        )
+        self.price_history = PriceHistory(self.frame)
+        self.portfolio_controller = PortfolioController(Path("/"), "test")
+        return super().setUp()
+
+    def trade(self, date, trade_type, code, unit_price, amount, currency):
+        return {
+            "date": date,
+            "type": trade_type,
+            "code": code,
+            "unit_price": to_fixed(unit_price),
+            "amount": amount,
+            "currency": currency,
+        }
+
+    def test_prices(self) -> None:
+        """get prices of codes on days with and without close prices
+
+        should carry last price forward and leave NaN before first price
+        """
+
+        days = pd.date_range("2022-01-01", "2022-01-05")
+        prices = self.price_history.prices(["AAA", "BBB", "CCC"], days)
+
+        np.testing.assert_array_equal([np.nan, 10, 10, 12, 12], prices[:, 0])
+        np.testing.assert_array_equal([np.nan, np.nan, 5, 5, 5], prices[:, 1])
+        self.assertTrue(np.isnan(prices[:, 2]).all())
+
+    def test_memoize(self) -> None:
+        """memoize values of more keys than are kept
+
+        should compute values again only for dropped keys
+        """
+
+        history = PriceHistory()
+        computed = []
+        for key in ("a", "b", "a", "c", "b", "a"):
+            history.memoize("test", key, lambda key=key: computed.append(key))
+
+        self.assertEqual(["a", "b", "c", "b", "a"], computed)
+
+    def test_load_and_update(self) -> None:
+        """save prices to parquet and csv files and update them
+
+        should load equal prices, replace prices of the same day
+        and reload changed file
+        """
+
+        for name in ("prices.parquet", "prices.csv"):
+            path = TESTING_PATH / name
+            self.price_history.save(path)
+            loaded = PriceHistory.load(path)
+            pd.testing.assert_frame_equal(
+                self.price_history.wide, loaded.wide, check_freq=False
+            )
+
+        path = TESTING_PATH / "prices.parquet"
+        self.assertIs(get_price_history(path), get_price_history(path))
+
+        updated = get_price_history(path).update(
+            pd.DataFrame(
+                {"date": ["2022-01-04"], "code": ["aaa"], "close": [13.0]}
+            )
+        )
+        updated.save(path)
+        os.utime(path, ns=(0, 0))
+        self.assertEqual(3, len(get_price_history(path)))
+        self.assertEqual(
+            13.0, get_price_history(path).wide.loc["2022-01-04", "AAA"]
+        )
+
+        self.assertEqual(0, len(get_price_history(TESTING_PATH / "no.csv")))
+
+    def test_value_series(self) -> None:
+        """compute daily values of portfolio with trades and prices
+
+        should value holdings at close prices or last trade prices
+        and report net value invested on every day
+        """
+
+        self.portfolio_controller.update_balance(to_fixed(1000), "USD")
+        self.portfolio_controller.apply_transactions(
+            [
+                self.trade("2022-01-01T10:00:00", "BUY", "AAA", 9, 2, "USD"),
+                self.trade("2022-01-03T10:00:00", "BUY", "CCC", 3, 4, "USD"),
+                self.trade("2022-01-04T10:00:00", "SELL", "AAA", 12, 1, "USD"),
+            ],
+            save=False,
+        )
+
+        series = self.portfolio_controller.value_series(
+            self.price_history, end="2022-01-05"
+        )
+
+        self.assertEqual(
+            list(pd.date_range("2022-01-01", "2022-01-05")),
+            list(series.index),
+        )
+        np.testing.assert_allclose([18, 20, 32, 24, 24], series["value"])
+        np.testing.assert_allclose([18, 0, 12, -12, 0], series["flow"])
+        self.assertIs(
+            series,
+            self.portfolio_controller.value_series(
+                self.price_history, end="2022-01-05"
+            ),
+        )
+
+    def test_value_series_in_base_currency(self) -> None:
+        """compute daily values of assets in another currency
+
+        should convert values with rates of every day
+        """
+
+        fx_rates = FxRates(
+            [
+                ("2022-01-01", "EUR", "USD", 2.0),
+                ("2022-01-03", "EUR", "USD", 3.0),
+            ]
+        )
+        self.portfolio_controller.update_balance(to_fixed(1000), "EUR")
+        self.portfolio_controller.apply_transactions(
+            [self.trade("2022-01-02T10:00:00", "BUY", "AAA", 10, 1, "EUR")],
+            save=False,
+        )
+
+        series = self.portfolio_controller.value_series(
+            self.price_history, "USD", fx_rates, "2022-01-01", "2022-01-04"
+        )
+
+        np.testing.assert_allclose([0, 20, 30, 36], series["value"])
+        np.testing.assert_allclose([0, 20, 0, 0], series["flow"])
+
+    def tearDown(self) -> None:
+        rm_tree(TESTING_PATH)
+        return super().tearDown()
+
+
+if __name__ == "__main__":
+    unittest.main()
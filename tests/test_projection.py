@@ -0,0 +1,196 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+
+from src.controllers.portfolio_controller import PortfolioController
+from src.models.money import to_fixed
+from src.models.price_history import PriceHistory
+from src.models.projection import (
+    histogram_percentiles,
+    project,
+    return_model,
+    simulate_paths,
+    value_bins,
+)
+
+
+class TestProjection(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        shocks = rng.standard_normal((500, 2))
+        self.returns = np.column_stack(
+            [0.01 * shocks[:, 0], 0.01 * shocks[:, 0] + 0.02 * shocks[:, 1]]
+        )
+        self.portfolio_controller = PortfolioController(Path("/"), "test")
+        return super().setUp()
+
+    def test_return_model(self) -> None:
+        """model correlated returns of assets
+
+        should keep mean and covariance of returns
+        """
+
+        mean, loadings = return_model(self.returns)
+
+        np.testing.assert_allclose(self.returns.mean(axis=0), mean)
+        np.testing.assert_allclose(
+            np.cov(self.returns, rowvar=False), loadings @ loadings.T
+        )
+        self.assertRaises(ValueError, return_model, self.returns[:1])
+
+    def test_project(self) -> None:
+        """project value in worker processes and in main one
+
+        should refine bands up to all paths with equal final bands
+        """
+
+        mean, loadings = return_model(self.returns)
+        args = (np.array([100.0, 50.0]), 10.0, mean, loadings, 4, 21)
+
+        inline = list(project(*args, paths=4000, chunk_paths=500, workers=0))
+        pooled = list(
+            project(
+                *args,
+                paths=4000,
+                chunk_paths=500,
+                workers=2,
+                update_seconds=0,
+            )
+        )
+
+        self.assertEqual(4000, inline[-1]["paths"])
+        self.assertEqual(
+            list(range(500, 4001, 500)),
+            [update["paths"] for update in pooled],
+        )
+        for percentile, band in inline[-1]["bands"].items():
+            np.testing.assert_allclose(
+                band, pooled[-1]["bands"][percentile], rtol=1e-6
+            )
+        self.assertEqual(160, inline[-1]["bands"][50][0])
+        self.assertTrue(
+            (inline[-1]["bands"][5] < inline[-1]["bands"][95])[1:].all()
+        )
+
+    def test_histogram_percentiles(self) -> None:
+        """simulate paths reduced to histograms of values
+
+        should keep counts of all paths and percentiles close
+        to the ones of values of the paths
+        """
+
+        mean, loadings = return_model(self.returns)
+        values = np.array([100.0, 50.0])
+        summary = simulate_paths(
+            values,
+            mean,
+            loadings,
+            3,
+            21,
+            20000,
+            np.random.SeedSequence(1),
+        )
+        self.assertEqual([20000] * 4, summary["counts"].sum(axis=1).tolist())
+
+        rng = np.random.default_rng(2)
+        samples = 160 * np.exp(0.1 * rng.standard_normal((2, 50000)))
+        counts = np.array(
+            [
+                np.bincount(
+                    value_bins(values, 160.0),
+                    minlength=summary["counts"].shape[1],
+                )
+                for values in samples
+            ]
+        )
+        bands = histogram_percentiles(
+            counts, samples.min(axis=1), samples.max(axis=1), 160.0, (5, 50)
+        )
+        for percentile, band in bands.items():
+            np.testing.assert_allclose(
+                np.percentile(samples, percentile, axis=1), band, rtol=1e-3
+            )
+
+    def test_negative_cash(self) -> None:
+        """project value of assets with negative cash balance
+
+        should shift bands of value of assets by the cash
+        and reject portfolio without value of assets
+        """
+
+        mean, loadings = return_model(self.returns)
+        args = (np.array([100.0, 50.0]), mean, loadings, 4, 21)
+
+        assets = list(project(args[0], 0.0, *args[1:], 4000, 500, 0))[-1]
+        for cash in (-140.0, -150.0, -1000.0):
+            bands = list(project(args[0], cash, *args[1:], 4000, 500, 0))[-1]
+            self.assertEqual(150 + cash, bands["bands"][50][0])
+            for percentile, band in bands["bands"].items():
+                np.testing.assert_allclose(
+                    assets["bands"][percentile] + cash, band
+                )
+            self.assertTrue((bands["bands"][5] < bands["bands"][95])[1:].all())
+
+        self.assertRaises(
+            ValueError, next, project(np.zeros(2), 10.0, *args[1:], 10, 5, 0)
+        )
+
+        rng = np.random.default_rng(3)
+        samples = 150 * np.exp(0.1 * rng.standard_normal(50000))
+        counts = np.bincount(value_bins(samples, 150.0), minlength=4096)
+        band = (
+            histogram_percentiles(
+                counts[None],
+                samples.min(keepdims=True),
+                samples.max(keepdims=True),
+                150.0,
+                (5,),
+            )[5]
+            - 1000
+        )
+        np.testing.assert_allclose(
+            np.percentile(samples - 1000, 5), band, rtol=1e-4
+        )
+
+    def test_portfolio_projection(self) -> None:
+        """project portfolio with assets without volatility
+
+        should grow values of assets with price history by their
+        returns and keep other holdings constant
+        """
+
+        days = pd.bdate_range("2022-01-03", periods=30)
+        prices = PriceHistory(
+            pd.DataFrame(
+                {
+                    "date": days,
+                    "code": "AAA",
+                    "close": 10 * np.exp(0.001 * np.arange(30)),
+                }
+            )
+        )
+        self.portfolio_controller.update_balance(to_fixed(100), "USD")
+        self.portfolio_controller.add_asset("AAA", to_fixed(9), 2, "USD")
+        self.portfolio_controller.add_asset("BBB", to_fixed(5), 4, "USD")
+
+        self.assertRaises(
+            ValueError,
+            self.portfolio_controller.projection,
+            PriceHistory(),
+        )
+
+        *_, last = self.portfolio_controller.projection(
+            prices, paths=1000, workers=0
+        )
+
+        value = 2 * 10 * np.exp(0.029) * np.exp(0.001 * 252)
+        self.assertAlmostEqual(
+            1, last["bands"][50][-1] / to_fixed(value + 120), places=5
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
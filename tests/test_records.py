@@ -0,0 +1,113 @@
+import json
+import sys
+import unittest
+
+from src.models.portfolio import (
+    Asset,
+    Portfolio,
+    Transaction,
+    record_to_dict,
+)
+
+
+class TestRecords(unittest.TestCase):
+    def setUp(self) -> None:
+        self.transaction_dict = {
+            "date": "2022-01-01T10:00:00",
+            "type": "BUY",
+            "code": "TEST",
+            "unit_price": 10**10,
+            "amount": 200,
+            "currency": "USD",
+        }
+        return super().setUp()
+
+    def test_dict_access(self) -> None:
+        """access transaction fields as dictionary keys
+
+        should return the same values as the dictionary
+        """
+
+        transaction = Transaction.from_dict(self.transaction_dict)
+
+        for key, value in self.transaction_dict.items():
+            self.assertEqual(value, transaction[key])
+        self.assertEqual(self.transaction_dict, transaction)
+
+    def test_extra_fields(self) -> None:
+        """create transaction with field without a slot
+
+        should keep the field and serialize it
+        """
+
+        self.transaction_dict["lot"] = "1"
+        transaction = Transaction.from_dict(self.transaction_dict)
+
+        self.assertEqual("1", transaction["lot"])
+        self.assertIn("lot", transaction)
+        self.assertEqual(self.transaction_dict, transaction.to_dict())
+
+    def test_invalid_record(self) -> None:
+        """create transaction from dictionary without required field
+
+        should raise ValueError
+        """
+
+        del self.transaction_dict["code"]
+        self.assertRaises(
+            ValueError, Transaction.from_dict, self.transaction_dict
+        )
+
+    def test_json_roundtrip(self) -> None:
+        """serialize portfolio data with records and load it again
+
+        should restore equal data
+        """
+
+        data = {
+            "assets": {
+                "TEST": {"unit_price": 1, "amount": 2, "currency": "USD"}
+            },
+            "transactions": [self.transaction_dict],
+            "currencies": {},
+            "categories": {},
+        }
+        portfolio = Portfolio("test", json.loads(json.dumps(data)))
+
+        self.assertIsInstance(portfolio.assets["TEST"], Asset)
+        self.assertIsInstance(portfolio.transactions[0], Transaction)
+        self.assertEqual(
+            data,
+            json.loads(json.dumps(portfolio.data, default=record_to_dict)),
+        )
+
+    def test_interned_strings(self) -> None:
+        """load transactions with equal codes and currencies
+
+        should share one string object between records
+        """
+
+        first = Transaction.from_dict(
+            json.loads(json.dumps(self.transaction_dict))
+        )
+        second = Transaction.from_dict(
+            json.loads(json.dumps(self.transaction_dict))
+        )
+
+        self.assertIs(first.code, second.code)
+        self.assertIs(first.currency, second.currency)
+
+    def test_record_size(self) -> None:
+        """compare size of transaction record and dictionary
+
+        record should be smaller than the dictionary
+        """
+
+        transaction = Transaction.from_dict(self.transaction_dict)
+        self.assertLess(
+            sys.getsizeof(transaction), sys.getsizeof(self.transaction_dict)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
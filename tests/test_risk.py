@@ -0,0 +1,95 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+
+from src.controllers.portfolio_controller import PortfolioController
+from src.models.money import to_fixed
+from src.models.price_history import PriceHistory
+from src.models.risk import RiskModel, value_at_risk
+
+
+class TestRisk(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        shocks = rng.standard_normal((1000, 2))
+        self.returns = np.column_stack(
+            [0.01 * shocks[:, 0], 0.01 * shocks[:, 0] + 0.02 * shocks[:, 1]]
+        )
+        self.portfolio_controller = PortfolioController(Path("/"), "test")
+        return super().setUp()
+
+    def test_value_at_risk(self) -> None:
+        """measure risk of holdings of two correlated assets
+
+        should return quantile of historical losses and contributions
+        summing to parametric VaR without the mean return
+        """
+
+        model = RiskModel(self.returns)
+        values = np.array([300.0, 100.0])
+        risk = value_at_risk(model, values, 0.95, horizon=4)
+        losses = -(self.returns @ values)
+
+        self.assertEqual(400, risk["value"])
+        self.assertAlmostEqual(
+            2 * np.quantile(losses, 0.95), risk["historical_var"]
+        )
+        self.assertGreater(risk["historical_es"], risk["historical_var"])
+        self.assertGreater(risk["parametric_es"], risk["parametric_var"])
+        self.assertAlmostEqual(
+            risk["parametric_var"] + 4 * (model.mean @ values),
+            risk["contributions"].sum(),
+        )
+        self.assertAlmostEqual(
+            1.645, risk["contributions"].sum() / risk["volatility"], places=3
+        )
+        self.assertRaises(ValueError, RiskModel, self.returns[:1])
+
+    def test_portfolio_risk(self) -> None:
+        """measure risk of portfolio twice and after a change
+
+        should compute risk once per version of the portfolio
+        of assets with price history only
+        """
+
+        days = pd.bdate_range("2022-01-03", periods=len(self.returns) + 1)
+        closes = 10 * np.exp(
+            np.vstack([np.zeros(2), np.cumsum(self.returns, axis=0)])
+        )
+        prices = PriceHistory(
+            pd.concat(
+                [
+                    pd.DataFrame(
+                        {"date": days, "code": code, "close": closes[:, i]}
+                    )
+                    for i, code in enumerate(("BBB", "AAA"))
+                ]
+            )
+        )
+        self.assertRaises(ValueError, self.portfolio_controller.risk, prices)
+
+        self.portfolio_controller.add_asset("AAA", to_fixed(9), 2, "USD")
+        self.portfolio_controller.add_asset("BBB", to_fixed(5), 4, "USD")
+        self.portfolio_controller.add_asset("CCC", to_fixed(5), 4, "USD")
+
+        risk = self.portfolio_controller.risk(prices)
+        self.assertIs(risk, self.portfolio_controller.risk(prices))
+        self.assertEqual(["AAA", "BBB"], risk["codes"])
+        self.assertAlmostEqual(
+            1, risk["value"] / to_fixed(2 * closes[-1, 1] + 4 * closes[-1, 0])
+        )
+
+        self.portfolio_controller.add_asset("BBB", to_fixed(5), 4, "USD")
+        changed = self.portfolio_controller.risk(prices)
+        self.assertIsNot(risk, changed)
+        self.assertGreater(changed["value"], risk["value"])
+        self.assertIs(
+            changed, self.portfolio_controller.risk(prices, confidence=0.99)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
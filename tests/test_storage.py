@@ -0,0 +1,163 @@
+import sqlite3
+import unittest
+
+from contextlib import closing
+from pathlib import Path
+
+from src.controllers.file_handler import FileHandler
+from src.controllers.portfolio_controller import PortfolioController
+from src.controllers.storage import (
+    JsonStorage,
+    SqliteStorage,
+    get_storage,
+    migrate_portfolios,
+)
+from tests.utility import create_empty_portfolio, rm_tree
+
+TEST_DATA_PATH = "tests/test_data"
+TESTING_PATH = Path(TEST_DATA_PATH)
+
+
+class TestSqliteStorage(unittest.TestCase):
+    def setUp(self) -> None:
+        # create directory if does not exist
+        TESTING_PATH.mkdir(exist_ok=True)
+
+        self.storage = SqliteStorage()
+        self.file_handler = FileHandler(
+            TESTING_PATH, portfolios={}, storage=self.storage
+        )
+        self.file_handler.create_empty_portfolio("test")
+        self.test_file_path = self.file_handler.get_portfolio_path("test")
+
+        self.portfolio_controller = PortfolioController(
+            self.test_file_path, "test", storage=self.storage
+        )
+
+        return super().setUp()
+
+    def _reload(self) -> PortfolioController:
+        return PortfolioController(
+            self.test_file_path, "test", storage=self.storage
+        )
+
+    def test_create_portfolio(self) -> None:
+        """create portfolio with sqlite storage
+
+        should create database file with sqlite suffix
+        """
+
+        self.assertTrue(Path(TEST_DATA_PATH + "/test.sqlite3").is_file())
+
+    def test_save_and_load(self) -> None:
+        """save changes of portfolio and load it again
+
+        should restore data equal to the saved one
+        """
+
+        self.portfolio_controller.update_balance(1000, "USD")
+        self.portfolio_controller.buy_asset("TEST", 10, 5, "USD")
+        self.portfolio_controller._save_file_data()
+        self.portfolio_controller.sell_asset("TEST", 20, 5, "USD")
+        self.portfolio_controller.buy_asset("OTHER", 1, 1, "EUR")
+        self.portfolio_controller._save_file_data()
+
+        loaded = self._reload()
+
+        self.assertEqual(
+            self.portfolio_controller.portfolio_data, loaded.portfolio_data
+        )
+
+    def test_transaction_indexes(self) -> None:
+        """save and load portfolio stored in sqlite database
+
+        should keep indexes of transactions on code, date and type
+        used by queries of history
+        """
+
+        self.portfolio_controller.buy_asset("TEST", 10, 5, "USD")
+        self.portfolio_controller._save_file_data()
+        self._reload()
+
+        with closing(sqlite3.connect(self.test_file_path)) as connection:
+            indexes = connection.execute(
+                "SELECT name, sql FROM sqlite_master "
+                "WHERE type = 'index' AND tbl_name = 'transactions'"
+            ).fetchall()
+            plan = connection.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM transactions WHERE code = ?",
+                ("TEST",),
+            ).fetchall()
+
+        self.assertEqual(
+            ["transactions_code", "transactions_date", "transactions_type"],
+            sorted(name for name, sql in indexes if sql is not None),
+        )
+        self.assertIn("transactions_code", str(plan))
+
+    def test_remove_portfolio(self) -> None:
+        """remove portfolio stored in sqlite database
+
+        should remove database file
+        """
+
+        self.file_handler.remove_portfolio("test")
+        self.assertFalse(self.test_file_path.exists())
+
+    def tearDown(self) -> None:
+        if TESTING_PATH.exists():
+            rm_tree(TESTING_PATH)
+
+        return super().tearDown()
+
+
+class TestMigratePortfolios(unittest.TestCase):
+    def setUp(self) -> None:
+        # create directory if does not exist
+        TESTING_PATH.mkdir(exist_ok=True)
+
+        self.test_file_path = Path(TEST_DATA_PATH + "/test.json")
+        create_empty_portfolio(self.test_file_path)
+
+        portfolio_controller = PortfolioController(
+            self.test_file_path, "test", storage=JsonStorage()
+        )
+        portfolio_controller.buy_asset("TEST", 10, 5, "USD")
+        portfolio_controller._save_file_data()
+        self.data = portfolio_controller.portfolio_data
+
+        return super().setUp()
+
+    def test_migrate_to_sqlite(self) -> None:
+        """migrate json portfolios to sqlite storage
+
+        should create sqlite portfolio with the same data
+        """
+
+        migrated = migrate_portfolios(
+            TESTING_PATH, JsonStorage(), SqliteStorage()
+        )
+
+        self.assertEqual(["test"], migrated)
+        self.assertEqual(
+            self.data,
+            SqliteStorage().load(self.test_file_path.with_suffix(".sqlite3")),
+        )
+
+    def test_unknown_backend(self) -> None:
+        """get storage with not registered name
+
+        should raise ValueError
+        """
+
+        self.assertRaises(ValueError, get_storage, "unknown")
+
+    def tearDown(self) -> None:
+        if TESTING_PATH.exists():
+            rm_tree(TESTING_PATH)
+
+        return super().tearDown()
+
+
+if __name__ == "__main__":
+    unittest.main()
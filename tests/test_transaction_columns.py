@@ -0,0 +1,157 @@
+import unittest
+
+import numpy as np
+
+from pathlib import Path
+
+from src.controllers.portfolio_controller import PortfolioController
+from src.models.transaction_columns import TransactionColumns
+
+
+class TestTransactionColumns(unittest.TestCase):
+    def setUp(self) -> None:
+        self.portfolio_controller = PortfolioController(Path("/"), "test")
+        self.transactions = [
+            {
+                "date": "2022-01-01T10:00:00",
+                "type": "BUY",
+                "code": "AAA",
+                "unit_price": 100,
+                "amount": 10,
+                "currency": "USD",
+            },
+            {
+                "date": "2022-01-15T10:00:00",
+                "type": "BUY",
+                "code": "BBB",
+                "unit_price": 50,
+                "amount": 4,
+                "currency": "EUR",
+            },
+            {
+                "date": "2022-02-01T10:00:00",
+                "type": "SELL",
+                "code": "AAA",
+                "unit_price": 120,
+                "amount": 3,
+                "currency": "USD",
+            },
+        ]
+        return super().setUp()
+
+    def test_build_columns(self) -> None:
+        """build columns from transaction records
+
+        should keep every field in columns of equal length
+        """
+
+        columns = TransactionColumns(self.transactions)
+
+        self.assertEqual(3, len(columns))
+        self.assertEqual([100, 50, 120], columns.unit_prices.tolist())
+        self.assertEqual(["AAA", "BBB"], columns.codes.names)
+        self.assertEqual([0, 1, 0], columns.code_ids.tolist())
+        self.assertEqual(1641031200, columns.dates[0])
+
+    def test_aggregations(self) -> None:
+        """aggregate transactions per code, currency and month
+
+        should return sums equal to the ones computed by hand
+        """
+
+        columns = TransactionColumns(self.transactions)
+
+        self.assertEqual({"AAA": 7, "BBB": 4}, columns.holdings_by_code())
+        self.assertEqual({"AAA": 1360, "BBB": 200}, columns.value_by_code())
+        self.assertEqual(
+            {"USD": -640, "EUR": -200}, columns.cash_flow_by_currency()
+        )
+        self.assertEqual(
+            {"2022-01": 1200, "2022-02": 360}, columns.value_by_month()
+        )
+
+    def test_grow_columns(self) -> None:
+        """append more transactions than initial capacity
+
+        should keep all of the appended transactions
+        """
+
+        columns = TransactionColumns()
+        for _ in range(1000):
+            columns.extend(self.transactions)
+
+        self.assertEqual(3000, len(columns))
+        self.assertEqual(
+            {"AAA": 7000, "BBB": 4000}, columns.holdings_by_code()
+        )
+
+    def test_extended_by_controller(self) -> None:
+        """add transaction record after columns were built
+
+        should extend existing columns in place
+        """
+
+        columns = self.portfolio_controller._portfolio.transaction_columns
+        self.portfolio_controller.buy_asset("TEST", 10, 5, "USD")
+
+        self.assertIs(
+            columns, self.portfolio_controller._portfolio.transaction_columns
+        )
+        self.assertEqual(1, len(columns))
+        self.assertEqual({"TEST": 5}, columns.holdings_by_code())
+
+    def test_sort(self) -> None:
+        """sort transactions by fields
+
+        should return positions in order of the field
+        with ties in order of history
+        """
+
+        columns = TransactionColumns(self.transactions)
+        positions = np.arange(len(columns))
+
+        self.assertEqual([0, 2, 1], columns.sort(positions, "code").tolist())
+        self.assertEqual(
+            [1, 2, 0], columns.sort(positions, "code", True).tolist()
+        )
+        self.assertEqual(
+            [1, 0, 2], columns.sort(positions, "currency").tolist()
+        )
+        self.assertEqual(
+            [2, 0, 1], columns.sort(positions, "unit_price", True).tolist()
+        )
+        self.assertRaises(ValueError, columns.sort, positions, "value")
+
+    def test_transaction_page(self) -> None:
+        """take pages of filtered transactions from the controller
+
+        should compute positions once per version of the portfolio
+        and return frames of rows of the page only
+        """
+
+        for code in ("AAA", "BBB", "CCC"):
+            self.portfolio_controller.buy_asset(code, 10, 5, "USD")
+        self.portfolio_controller.sell_asset("AAA", 10, 2, "USD")
+
+        positions = self.portfolio_controller.transaction_positions()
+        self.assertIs(
+            positions, self.portfolio_controller.transaction_positions()
+        )
+        self.assertEqual([3, 2, 1, 0], positions.tolist())
+
+        page = self.portfolio_controller.transaction_page(positions, 1, 3)
+        self.assertEqual([0], page.index.tolist())
+        self.assertEqual(["AAA"], page["code"].tolist())
+        self.assertEqual([5], page["amount"].tolist())
+
+        self.portfolio_controller.buy_asset("DDD", 10, 5, "USD")
+        positions = self.portfolio_controller.transaction_positions(
+            codes=["AAA"], sort="type", descending=False
+        )
+        self.assertEqual([0, 3], positions.tolist())
+        page = self.portfolio_controller.transaction_page(positions)
+        self.assertEqual(["BUY", "SELL"], page["type"].tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+
+import pandas as pd
+
+from pathlib import Path
+
+from src.controllers.portfolio_controller import PortfolioController
+from src.models.fx_rates import FxRates
+from src.models.money import to_fixed
+from src.models.price_history import PriceHistory
+
+
+class TestValuation(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fx_rates = FxRates(
+            [
+                ("2022-01-01", "EUR", "USD", 1.2),
+                ("2022-02-01", "EUR", "USD", 1.1),
+                ("2022-01-01", "GBP", "USD", 1.5),
+            ]
+        )
+        self.portfolio_controller = PortfolioController(Path("/"), "test")
+        return super().setUp()
+
+    def test_holdings_tables(self) -> None:
+        """build tables of holdings in currencies of assets and in base one
+
+        should compute values, weights and profits of all holdings
+        once per version of the portfolio
+        """
+
+        self.portfolio_controller.update_balance(to_fixed(100), "GBP")
+        self.portfolio_controller.update_balance(to_fixed(10), "USD")
+        self.portfolio_controller.buy_asset("AAA", to_fixed(2), 5, "GBP")
+        self.portfolio_controller.buy_asset("AAA", to_fixed(4), 5, "GBP")
+        self.portfolio_controller.add_asset("BBB", to_fixed(1), 10, "USD")
+
+        tables = self.portfolio_controller.holdings_tables()
+        assets = tables["assets"]
+        self.assertEqual([10, 10], assets["amount"].tolist())
+        self.assertEqual([40, 10], assets["market_value"].tolist())
+        self.assertEqual(10, assets.loc["AAA", "profit"])
+        self.assertTrue(assets["return"].isna()["BBB"])
+        self.assertAlmostEqual(40 / 130, assets.loc["AAA", "weight"])
+        self.assertAlmostEqual(
+            1, assets["weight"].sum() + tables["currencies"]["weight"].sum()
+        )
+
+        tables = self.portfolio_controller.holdings_tables(
+            "USD", self.fx_rates
+        )
+        self.assertIs(
+            tables,
+            self.portfolio_controller.holdings_tables("USD", self.fx_rates),
+        )
+        self.assertEqual(60, tables["assets"].loc["AAA", "value (USD)"])
+        self.assertEqual(
+            [105, 10], tables["currencies"]["value (USD)"].tolist()
+        )
+        self.assertAlmostEqual(60 / 185, tables["assets"].loc["AAA", "weight"])
+        self.assertEqual(to_fixed(185), tables["total"])
+
+        self.portfolio_controller.sell_asset("AAA", to_fixed(4), 5, "GBP")
+        tables = self.portfolio_controller.holdings_tables(
+            "USD", self.fx_rates
+        )
+        self.assertEqual(5, tables["assets"].loc["AAA", "profit"])
+
+        # amount added without transactions costs the average cost
+        self.portfolio_controller.add_asset("AAA", to_fixed(4), 5, "GBP")
+        prices = PriceHistory(
+            pd.DataFrame(
+                {"date": ["2022-01-03"], "code": ["AAA"], "close": [6.0]}
+            )
+        )
+        assets = self.portfolio_controller.holdings_tables(
+            "USD", self.fx_rates, prices
+        )["assets"]
+        self.assertEqual([6, 1], assets["unit_price"].tolist())
+        self.assertEqual(30, assets.loc["AAA", "cost"])
+        self.assertEqual(30, assets.loc["AAA", "profit"])
+        self.assertEqual(90, assets.loc["AAA", "value (USD)"])
+
+    def test_negative_balance(self) -> None:
+        """build tables of holdings bought with negative cash balance
+
+        should weight holdings by their shares of gross value
+        """
+
+        self.portfolio_controller.buy_asset("AAA", to_fixed(5), 10, "USD")
+        self.portfolio_controller.buy_asset("BBB", to_fixed(1), 10, "USD")
+        self.portfolio_controller.update_balance(to_fixed(48), "USD")
+
+        tables = self.portfolio_controller.holdings_tables(
+            "USD", self.fx_rates
+        )
+        self.assertEqual([-12], tables["currencies"]["value (USD)"].tolist())
+        self.assertEqual(
+            [50 / 72, 10 / 72], tables["assets"]["weight"].tolist()
+        )
+        self.assertEqual([-12 / 72], tables["currencies"]["weight"].tolist())
+        self.assertEqual(to_fixed(48), tables["total"])
+
+        # net value of holdings is zero
+        self.portfolio_controller.update_balance(to_fixed(-48), "USD")
+        tables = self.portfolio_controller.holdings_tables(
+            "USD", self.fx_rates
+        )
+        self.assertEqual(0, tables["total"])
+        self.assertAlmostEqual(
+            0.5, tables["assets"]["weight"].sum(), places=12
+        )
+        self.assertAlmostEqual(
+            -0.5, tables["currencies"]["weight"].sum(), places=12
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()